@@ -0,0 +1,46 @@
+"""
+Size and speed of GameState.to_bytes / from_bytes compared to pickle.
+
+Run with: python -m benchmarks.bench_encoding
+"""
+
+from benchmarks.game_stages import GAME_STAGES, build_game_state
+from src.innovation.game.gamestate import GameState
+import pickle
+import timeit
+
+
+def round_trips_per_second(dumps, loads, game_state, number: int) -> float:
+    seconds = min(
+        timeit.repeat(lambda: loads(dumps(game_state)), number=number, repeat=3)
+    )
+    return number / seconds
+
+
+def main(number: int = 2000):
+    print(
+        f"{'players':>7} {'stage':>8} {'bytes':>7} {'pickle':>7} "
+        f"{'bytes/s':>10} {'pickle/s':>10} {'speedup':>8}"
+    )
+
+    for num_players in (2, 3, 4):
+        for stage in GAME_STAGES:
+            game_state = build_game_state(num_players, stage)
+            encoded_size = len(game_state.to_bytes())
+            pickled_size = len(pickle.dumps(game_state))
+            bytes_rate = round_trips_per_second(
+                GameState.to_bytes, GameState.from_bytes, game_state, number
+            )
+            pickle_rate = round_trips_per_second(
+                pickle.dumps, pickle.loads, game_state, number // 10
+            )
+
+            print(
+                f"{num_players:>7} {stage:>8} {encoded_size:>7} {pickled_size:>7} "
+                f"{bytes_rate:>10,.0f} {pickle_rate:>10,.0f} "
+                f"{bytes_rate / pickle_rate:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Forks per second of GameState.fork compared to copy.deepcopy.
+
+Run with: python -m benchmarks.bench_fork
+"""
+
+from benchmarks.game_stages import GAME_STAGES, build_game_state
+from copy import deepcopy
+import timeit
+
+
+def forks_per_second(copy_function, game_state, number: int) -> float:
+    seconds = min(
+        timeit.repeat(lambda: copy_function(game_state), number=number, repeat=3)
+    )
+    return number / seconds
+
+
+def main(number: int = 2000):
+    print(
+        f"{'players':>7} {'stage':>8} {'fork/s':>12} {'deepcopy/s':>12} {'speedup':>8}"
+    )
+
+    for num_players in (2, 3, 4):
+        for stage in GAME_STAGES:
+            game_state = build_game_state(num_players, stage)
+            fork_rate = forks_per_second(lambda state: state.fork(), game_state, number)
+            deepcopy_rate = forks_per_second(deepcopy, game_state, number // 10)
+
+            print(
+                f"{num_players:>7} {stage:>8} {fork_rate:>12,.0f} "
+                f"{deepcopy_rate:>12,.0f} {fork_rate / deepcopy_rate:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Complete games per second played by random choosers through the effect interpreter.
+
+Run with: python -m benchmarks.bench_games
+"""
+
+from src.innovation.game.choosers import RandomChooser
+from src.innovation.game.game_loop import play_game
+from src.innovation.game.game_setup import initialize_gamestate
+from random import Random
+import random
+import time
+
+
+def games_per_second(num_players: int, num_games: int, seed: int = 0) -> float:
+    rng = Random(seed)
+    random.seed(seed)
+    start = time.perf_counter()
+
+    for _ in range(num_games):
+        game_state = initialize_gamestate(num_players)
+        choosers = [RandomChooser(Random(rng.random())) for _ in range(num_players)]
+        play_game(game_state, choosers)
+
+    return num_games / (time.perf_counter() - start)
+
+
+def main(num_games: int = 1000):
+    print(f"{'players':>7} {'games/s':>10}")
+
+    for num_players in (2, 3, 4):
+        print(f"{num_players:>7} {games_per_second(num_players, num_games):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
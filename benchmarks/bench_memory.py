@@ -0,0 +1,87 @@
+"""
+Memory held by the card registry, forked game states and effect objects, which search trees keep
+alive in large numbers.
+
+Run with: python -m benchmarks.bench_memory
+"""
+
+from benchmarks.game_stages import GAME_STAGES, build_game_state
+from src.innovation.cards.card_effects import Draw, Meld, Splay
+from src.innovation.cards.cards import Card, CardLocation, CardSet, Symbol
+from src.innovation.game.game_setup import initialize_gamestate
+import tracemalloc
+
+
+def allocated_bytes(build) -> int:
+    tracemalloc.start()
+    kept = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return allocated
+
+
+def build_registry():
+    # The cards as card_registry builds them, sharing the effects and derived tables
+    cards = []
+
+    for card in CardSet.members:
+        copy = Card(
+            card.name,
+            card.color,
+            card.age,
+            [Symbol(symbol.symbol_type, symbol.position) for symbol in card.symbols],
+            card.effects,
+        )
+        copy.symbol_contributions = card.symbol_contributions
+        copy.dogma_table = card.dogma_table
+        cards.append(copy)
+
+    return cards
+
+
+def to_hand(cards) -> CardLocation:
+    return CardLocation.HAND
+
+
+def no_cards(game_state, activating_player, target_player):
+    return set()
+
+
+def main(num_forks: int = 500, num_effects: int = 10000):
+    cards = CardSet.members
+    symbols = [symbol for card in cards for symbol in card.symbols]
+    registry_bytes = allocated_bytes(build_registry)
+
+    print(
+        f"registry: {len(cards)} cards, {len(symbols)} symbols "
+        f"({len(set(map(id, symbols)))} distinct objects), {registry_bytes:,} B"
+    )
+
+    print(f"\n{'players':>7} {'stage':>8} {'B/fork':>8}")
+    for num_players in (2, 3, 4):
+        for stage in GAME_STAGES:
+            game_state = build_game_state(num_players, stage)
+            fork_bytes = allocated_bytes(
+                lambda: [game_state.fork() for _ in range(num_forks)]
+            )
+            print(f"{num_players:>7} {stage:>8} {fork_bytes / num_forks:>8,.0f}")
+
+    player = next(iter(initialize_gamestate(2).players))
+    colors, directions = frozenset(), frozenset()
+    effects = {
+        "Draw": lambda: Draw(player, to_hand),
+        "Meld": lambda: Meld(no_cards),
+        "Splay": lambda: Splay(player, colors, directions),
+    }
+
+    print(f"\n{'effect':>7} {'B/object':>9}")
+    for name, build_effect in effects.items():
+        effect_bytes = allocated_bytes(
+            lambda: [build_effect() for _ in range(num_effects)]
+        )
+        print(f"{name:>7} {effect_bytes / num_effects:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
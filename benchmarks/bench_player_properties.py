@@ -0,0 +1,85 @@
+"""
+Speed of the memoized Player properties compared to recomputing them on every access: single
+property reads, legal_actions and complete games, which read them on every dogma and draw.
+
+Run with: python -m benchmarks.bench_player_properties
+"""
+
+from benchmarks.bench_games import games_per_second
+from benchmarks.game_stages import build_game_state
+from src.innovation.game.game_loop import legal_actions
+from src.innovation.players.players import Player
+from contextlib import contextmanager
+from operator import attrgetter
+import timeit
+
+MEMOIZED_PROPERTIES = (
+    "top_cards",
+    "max_age_top_card",
+    "colors_with_cards",
+    "splayable_colors",
+    "symbol_vector",
+    "symbol_count",
+)
+
+
+@contextmanager
+def without_memoization():
+    originals = {name: getattr(Player, name) for name in MEMOIZED_PROPERTIES}
+
+    for name, memoized in originals.items():
+        setattr(Player, name, property(memoized.fget.__wrapped__))
+    try:
+        yield
+    finally:
+        for name, memoized in originals.items():
+            setattr(Player, name, memoized)
+
+
+def calls_per_second(function, number: int) -> float:
+    return number / min(timeit.repeat(function, number=number, repeat=3))
+
+
+def compare(function, number: int):
+    memoized_rate = function(number)
+    with without_memoization():
+        recomputed_rate = function(number)
+
+    return memoized_rate, recomputed_rate
+
+
+def print_row(name: str, memoized_rate: float, recomputed_rate: float):
+    print(
+        f"{name:>20} {memoized_rate:>12,.0f} {recomputed_rate:>12,.0f} "
+        f"{memoized_rate / recomputed_rate:>7.1f}x"
+    )
+
+
+def main(number: int = 20000, num_games: int = 200):
+    game_state = build_game_state(3, "late")
+    players = sorted(game_state.players, key=lambda player: player.id)
+    player = max(players, key=lambda player: len(player.board))
+
+    print(f"{'per second':>20} {'memoized':>12} {'recomputed':>12} {'speedup':>8}")
+
+    for name in MEMOIZED_PROPERTIES:
+        read = attrgetter(name)
+        print_row(
+            name,
+            *compare(lambda n: calls_per_second(lambda: read(player), n), number),
+        )
+
+    print_row(
+        "legal_actions",
+        *compare(
+            lambda n: calls_per_second(lambda: legal_actions(game_state, player), n),
+            number // 10,
+        ),
+    )
+    print_row(
+        "games (3 players)", *compare(lambda n: games_per_second(3, n), num_games)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Memory per game of the players of many games, as Player objects compared to a PlayerStore.
+
+Run with: python -m benchmarks.bench_player_store
+"""
+
+from benchmarks.game_stages import GAME_STAGES, build_game_state
+from src.innovation.players.player_store import PlayerStore
+import tracemalloc
+
+
+def allocated_bytes(build) -> int:
+    tracemalloc.start()
+    kept = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return allocated
+
+
+def main(num_games: int = 2000):
+    print(
+        f"{'players':>7} {'stage':>8} {'Player B/game':>14} {'store B/game':>13} {'ratio':>7}"
+    )
+
+    for num_players in (2, 3, 4):
+        for stage in GAME_STAGES:
+            players = build_game_state(num_players, stage).players
+
+            def build_players():
+                return [[player.fork() for player in players] for _ in range(num_games)]
+
+            def build_store():
+                store = PlayerStore(num_games, num_players)
+                for game_index in range(num_games):
+                    for player in players:
+                        store.store(game_index, player)
+                return store
+
+            player_bytes = allocated_bytes(build_players) / num_games
+            store_bytes = allocated_bytes(build_store) / num_games
+
+            print(
+                f"{num_players:>7} {stage:>8} {player_bytes:>14,.0f} "
+                f"{store_bytes:>13,.0f} {player_bytes / store_bytes:>6.1f}x"
+            )
+
+    print(
+        "\nThe store is a fixed size per game. At the opening, Players hold little more than"
+        "\ntheir starting hands, so the ratio there is below 10x."
+    )
+
+
+if __name__ == "__main__":
+    main()
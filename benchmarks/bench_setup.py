@@ -0,0 +1,40 @@
+"""
+Games set up per second, one at a time with initialize_gamestate and in batches with
+initialize_gamestates.
+
+Run with: python -m benchmarks.bench_setup
+"""
+
+from src.innovation.game.game_setup import initialize_gamestate, initialize_gamestates
+from src.innovation.utils.rng import RngStream
+import timeit
+
+
+def setups_per_second(setup, num_games: int) -> float:
+    seconds = min(timeit.repeat(setup, number=1, repeat=3))
+    return num_games / seconds
+
+
+def main(num_games: int = 10000):
+    print(f"{'players':>7} {'single/s':>10} {'batch/s':>10} {'speedup':>8}")
+
+    for num_players in (2, 3, 4):
+        single_rate = setups_per_second(
+            lambda: [
+                initialize_gamestate(num_players, RngStream(0, game_index))
+                for game_index in range(num_games)
+            ],
+            num_games,
+        )
+        batch_rate = setups_per_second(
+            lambda: list(initialize_gamestates(num_games, num_players)), num_games
+        )
+
+        print(
+            f"{num_players:>7} {single_rate:>10,.0f} {batch_rate:>10,.0f} "
+            f"{batch_rate / single_rate:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
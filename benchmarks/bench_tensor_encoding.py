@@ -0,0 +1,83 @@
+"""
+Game states per second encoded by encode_game_states, and by encode_player_store from the
+players of the same games kept in a PlayerStore, compared to filling the same arrays player by
+player and card by card.
+
+Run with: python -m benchmarks.bench_tensor_encoding
+"""
+
+from benchmarks.game_stages import GAME_STAGES, build_game_state
+from src.innovation.cards.cards import Color, SplayDirection
+from src.innovation.game.tensor_encoding import (
+    BOARD_ZONE,
+    GameStateTensors,
+    HAND_ZONE,
+    SCORE_PILE_ZONE,
+    encode_game_states,
+    encode_player_store,
+)
+from src.innovation.game.zobrist import MAX_PLAYERS
+from src.innovation.players.player_store import PlayerStore
+import timeit
+
+SPLAY_INDEX = {splay: index for index, splay in enumerate(SplayDirection)}
+
+
+def encode_player_by_player(game_states, tensors: GameStateTensors):
+    for game, game_state in enumerate(game_states):
+        for player in game_state.players:
+            tensors.player_mask[game, player.id] = True
+
+            for card in player.hand:
+                tensors.card_presence[game, player.id, HAND_ZONE, card.index] = 1
+
+            for card_stack in player.board.values():
+                for card in card_stack.stack:
+                    tensors.card_presence[game, player.id, BOARD_ZONE, card.index] = 1
+
+            for card in player.score_pile:
+                tensors.card_presence[game, player.id, SCORE_PILE_ZONE, card.index] = 1
+
+            for color_index, color in enumerate(Color):
+                splay = (
+                    player.board[color].splay
+                    if color in player.board
+                    else SplayDirection.NONE
+                )
+                tensors.splays[game, player.id, color_index, SPLAY_INDEX[splay]] = 1
+
+            tensors.symbol_counts[game, player.id] = player.symbol_vector
+            tensors.scores[game, player.id] = player.score
+
+            for achievement in player.achievements:
+                tensors.achievements[game, player.id, achievement.index] = 1
+
+
+def main(batch_size: int = 1024):
+    game_states = [
+        build_game_state(2 + index % 3, stage, seed=index)
+        for index in range(batch_size // len(GAME_STAGES))
+        for stage in GAME_STAGES
+    ]
+    tensors = GameStateTensors.allocate(len(game_states))
+    # Games of fewer players leave their last slots empty
+    store = PlayerStore(len(game_states), MAX_PLAYERS)
+    for game_index, game_state in enumerate(game_states):
+        for player in game_state.players:
+            store.store(game_index, player)
+
+    rates = {
+        "batched": lambda: encode_game_states(game_states, tensors),
+        "player store": lambda: encode_player_store(store, tensors),
+        "player by player": lambda: encode_player_by_player(game_states, tensors),
+    }
+    for name, encode in rates.items():
+        rates[name] = len(game_states) / min(timeit.repeat(encode, number=1))
+
+    print(f"{'encoder':>18} {'states/s':>12} {'speedup':>8}")
+    for name, rate in rates.items():
+        print(f"{name:>18} {rate:>12,.0f} {rate / rates['player by player']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from src.innovation.cards.cards import CardLocation, SplayDirection
+from src.innovation.game.game_setup import initialize_gamestate
+from src.innovation.game.gamestate import GameState
+import random
+
+# Number of cards drawn into play after setup for each benchmarked game stage
+GAME_STAGES = {"opening": 0, "early": 8, "mid": 16, "late": 28}
+
+
+def build_game_state(num_players: int, stage: str, seed: int = 0) -> GameState:
+    """Deal a game forward by randomly drawing cards into hands, boards and score piles."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    game_state = initialize_gamestate(num_players)
+    players = sorted(game_state.players, key=lambda player: player.id)
+
+    for turn in range(GAME_STAGES[stage]):
+        player = players[turn % num_players]
+        destination = rng.choice(
+            (CardLocation.HAND, CardLocation.BOARD, CardLocation.SCORE_PILE)
+        )
+        # Draws from the lowest non-empty deck
+        card = game_state.draw(player, 1, destination)
+        if card is None:
+            break
+
+        if destination == CardLocation.BOARD:
+            card_stack = player.board[card.color]
+            if card_stack.can_splay and rng.random() < 0.5:
+                game_state.splay(player, card.color, rng.choice(list(SplayDirection)))
+
+    return game_state
@@ -1,27 +1,74 @@
-from src.innovation.cards.achievements import Achievement
+from src.innovation.cards.achievements import Achievement, AchievementSet
+from src.innovation.cards.cards import SplayDirection, SymbolType
 from src.innovation.utils.registry import ImmutableRegistry
 from src.innovation.players.players import Player
 from functools import partial
 
+# Thresholds of the automatic achievements
+MONUMENT_CARDS = 6
+EMPIRE_SYMBOLS = 3
+WORLD_CLOCKS = 12
+WONDER_COLORS = 5
+UNIVERSE_TOP_CARDS = 5
+UNIVERSE_MIN_AGE = 8
+WONDER_SPLAYS = (SplayDirection.RIGHT, SplayDirection.UP)
+
 
 def scoring_achievement_condition_met(player: Player, level: int) -> bool:
     return player.score >= level * 5 and player.max_age_top_card >= level
 
 
+# Board scans for the automatic achievements, game.achievement_tracker keeps them up to date
+# incrementally. Monument depends on the cards tucked and scored during the current turn, which
+# only the tracker counts.
+
+
+def empire_condition_met(player: Player) -> bool:
+    return min(player.symbol_vector) >= EMPIRE_SYMBOLS
+
+
+def world_condition_met(player: Player) -> bool:
+    return player.symbol_count[SymbolType.CLOCK] >= WORLD_CLOCKS
+
+
+def wonder_condition_met(player: Player) -> bool:
+    splayed_colors = sum(
+        1
+        for card_stack in player.board.values()
+        if not card_stack.is_empty and card_stack.splay in WONDER_SPLAYS
+    )
+    return splayed_colors >= WONDER_COLORS
+
+
+def universe_condition_met(player: Player) -> bool:
+    high_top_cards = sum(1 for card in player.top_cards if card.age >= UNIVERSE_MIN_AGE)
+    return high_top_cards >= UNIVERSE_TOP_CARDS
+
+
+MONUMENT = Achievement("Monument", True, lambda player: False)
+EMPIRE = Achievement("Empire", True, empire_condition_met)
+WONDER = Achievement("Wonder", True, wonder_condition_met)
+WORLD = Achievement("World", True, world_condition_met)
+UNIVERSE = Achievement("Universe", True, universe_condition_met)
+
+# Indexed by level - 1
+SCORING_ACHIEVEMENTS = [
+    Achievement(
+        name=f"Scoring Achievement {n}",
+        is_automatic=False,
+        condition_met=partial(scoring_achievement_condition_met, level=n),
+    )
+    for n in range(1, 10)
+]
+
 GLOBAL_ACHIEVEMENTS_REGISTRY = ImmutableRegistry(
     [
-        Achievement("Monument", True, lambda player: False),
-        Achievement("Empire", True, lambda player: False),
-        Achievement("Wonder", True, lambda player: False),
-        Achievement("World", True, lambda player: False),
-        Achievement("Universe", True, lambda player: False),
-    ]
-    + [
-        Achievement(
-            name=f"Scoring Achievement {n}",
-            is_automatic=False,
-            condition_met=partial(scoring_achievement_condition_met, level=n),
-        )
-        for n in range(1, 10)
+        MONUMENT,
+        EMPIRE,
+        WONDER,
+        WORLD,
+        UNIVERSE,
     ]
+    + SCORING_ACHIEVEMENTS
 )
+AchievementSet.index_members(GLOBAL_ACHIEVEMENTS_REGISTRY.registry.values())
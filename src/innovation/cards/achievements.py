@@ -1,3 +1,4 @@
+from src.innovation.utils.indexed_set import IndexedSet
 from src.innovation.utils.registry import Registerable
 from dataclasses import dataclass
 from functools import partial
@@ -9,3 +10,15 @@ class Achievement(Registerable):
     name: str
     is_automatic: bool
     condition_met: Union[Callable[[Any], bool], partial]
+
+    def __eq__(self, other):
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
+
+
+class AchievementSet(IndexedSet):
+    __slots__ = ()
+
+    member_type = Achievement
@@ -1,11 +1,32 @@
-from src.innovation.cards.cards import Card, SymbolType, Color, SplayDirection
+from src.innovation.cards.cards import (
+    Card,
+    CardLocation,
+    SymbolType,
+    Color,
+    SplayDirection,
+)
 from src.innovation.cards.achievements import Achievement
 from src.innovation.players.players import Player
 from src.innovation.game.gamestate import GameState
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Set, Union, Callable
-from enum import Enum, unique
+from enum import IntEnum
+from typing import Callable, ClassVar, Iterable, List, NamedTuple, Set, Tuple, Union
+
+
+class Opcode(IntEnum):
+    """Dense small-int tag of every building block, used to dispatch execution."""
+
+    DRAW = 0
+    RETURN = 1
+    SCORE = 2
+    MELD = 3
+    ACHIEVE = 4
+    TUCK = 5
+    SPLAY = 6
+    TRANSFER_CARD = 7
+    EXCHANGE_CARDS = 8
+    OPTIONAL = 9
 
 
 class BaseEffect(ABC):
@@ -16,15 +37,15 @@ class BaseEffect(ABC):
 
 
 class Primitive:
-    pass
+    __slots__ = ()
 
 
 class SequenceOperator:
-    pass
+    __slots__ = ()
 
 
 class Prompt:
-    pass
+    __slots__ = ()
 
 
 effect_building_blocks = Union[Primitive, SequenceOperator, Prompt, None]
@@ -60,21 +81,17 @@ class BaseDemand(BaseEffect):
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Optional(Prompt):
-    operation: effect_building_blocks
+    opcode: ClassVar[Opcode] = Opcode.OPTIONAL
 
-
-@unique
-class CardLocation(Enum):
-    HAND = 1
-    BOARD = 2
-    SCORE_PILE = 3
-    DECK = 4
+    operation: effect_building_blocks
 
 
-@dataclass
+@dataclass(slots=True)
 class Draw(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.DRAW
+
     target_player: Player
     draw_location: Callable[[Set[Card]], CardLocation]
     repeat_effect: Callable[[Set[Card]], bool] = None
@@ -85,8 +102,10 @@ class Draw(Primitive):
     tuck: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Return(Prompt):
+    opcode: ClassVar[Opcode] = Opcode.RETURN
+
     allowed_cards: game_state_to_card_set_func
     min_cards: int = 1
     max_cards: int = 1
@@ -95,8 +114,10 @@ class Return(Prompt):
     card_destination: CardLocation = CardLocation.DECK
 
 
-@dataclass
+@dataclass(slots=True)
 class Score(Prompt):
+    opcode: ClassVar[Opcode] = Opcode.SCORE
+
     allowed_cards: game_state_to_card_set_func
     min_cards: int = 1
     max_cards: int = 1
@@ -104,8 +125,10 @@ class Score(Prompt):
     card_location: CardLocation = CardLocation.HAND
 
 
-@dataclass
+@dataclass(slots=True)
 class Meld(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.MELD
+
     allowed_cards: game_state_to_card_set_func
     min_cards: int = 1
     max_cards: int = 1
@@ -114,28 +137,36 @@ class Meld(Primitive):
     card_destination: CardLocation = CardLocation.BOARD
 
 
-@dataclass
+@dataclass(slots=True)
 class Achieve(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.ACHIEVE
+
     achievement: Achievement
 
 
-@dataclass
+@dataclass(slots=True)
 class Tuck(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.TUCK
+
     allowed_cards: game_state_to_card_set_func
     min_cards: int = 1
     max_cards: int = 1
     on_completion: card_set_to_effect_func = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Splay(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.SPLAY
+
     target_player: Player
     allowed_colors: Set[Color]
     allowed_directions: Set[SplayDirection]
 
 
-@dataclass
+@dataclass(slots=True)
 class TransferCard(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.TRANSFER_CARD
+
     giving_player: Player
     allowed_receiving_players: Set[Player]
     # function mapping (game_state, activating_player, target_player) -> set of cards that can be transferred
@@ -146,8 +177,10 @@ class TransferCard(Primitive):
     num_cards: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class ExchangeCards(Primitive):
+    opcode: ClassVar[Opcode] = Opcode.EXCHANGE_CARDS
+
     allowed_giving_player: Set[Player]
     allowed_receiving_player: Set[Player]
     allowed_giving_cards: game_state_to_card_set_func
@@ -156,3 +189,49 @@ class ExchangeCards(Primitive):
     num_cards_receiving: int
     giving_location: CardLocation
     receiving_location: CardLocation
+
+
+class DogmaEntry(NamedTuple):
+    is_demand: bool
+    # Index of the featured symbol in SymbolType order
+    symbol_index: int
+    # dogma_effect or demand_effect
+    effect: Callable
+    chained_dogma: Callable = None
+
+
+DogmaTable = Tuple[DogmaEntry, ...]
+SYMBOL_INDEX = {symbol_type: index for index, symbol_type in enumerate(SymbolType)}
+
+
+def build_dogma_table(effects: Iterable[BaseEffect]) -> DogmaTable:
+    """
+    The dispatch table of a card's effects: per effect whether it is a demand, its featured
+    symbol and the functions to call, so activation does not look these up every time.
+
+    This is not a lowering of the effects. The dogma bodies stay python functions, and every
+    activation still calls them and walks the blocks they build.
+    """
+    table = []
+
+    for effect in effects:
+        if effect is None:
+            continue
+
+        symbol_index = SYMBOL_INDEX[effect.symbol]
+
+        if isinstance(effect, BaseDemand):
+            table.append(
+                DogmaEntry(
+                    True, symbol_index, effect.demand_effect, effect.chained_dogma
+                )
+            )
+        else:
+            table.append(DogmaEntry(False, symbol_index, effect.dogma_effect))
+
+    return tuple(table)
+
+
+def build_dogma_tables(cards: Iterable[Card]):
+    for card in cards:
+        card.dogma_table = build_dogma_table(card.effects or ())
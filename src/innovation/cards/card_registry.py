@@ -11,8 +11,12 @@ from src.innovation.cards.cards import (
     Position,
     SplayDirection,
     cards_with_symbol,
+    filter_cards_by_symbol,
     get_highest_cards,
     get_lowest_cards,
+    get_cards_of_age,
+    build_symbol_contribution_table,
+    CardSet,
 )
 from src.innovation.cards.card_effects import (
     BaseDemand,
@@ -28,8 +32,20 @@ from src.innovation.cards.card_effects import (
     Optional,
     Tuck,
     Splay,
+    build_dogma_tables,
     effect_building_blocks,
 )
+from src.innovation.cards.effect_rules import (
+    TO_BOARD,
+    TO_HAND,
+    TO_SCORE_PILE,
+    bind_rule,
+    constant,
+    fixed_cards,
+    player_hand,
+    player_score_pile,
+    register_rule,
+)
 from src.innovation.game.gamestate import GameState
 from src.innovation.players.players import Player
 from typing import List, Set, Union
@@ -399,17 +415,20 @@ class ArcheryDemand(BaseDemand):
 
     @staticmethod
     def transfer_card_rule(_, __, target_player: Player) -> Set[Card]:
-        if len(target_player.hand) == 0:
-            allowed_cards = set()
-        else:
-            max_age_in_target_hand = max(card.age for card in target_player.hand)
-            allowed_cards = {
-                card
-                for card in target_player.hand
-                if card.age == max_age_in_target_hand
-            }
+        return get_highest_cards(target_player.hand)
 
-        return allowed_cards
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, target_player: Player, _
+    ) -> TransferCard:
+        return TransferCard(
+            giving_player=target_player,
+            allowed_receiving_players={activating_player},
+            allowed_cards=ArcheryDemand.transfer_card_rule,
+            card_location=CardLocation.HAND,
+            card_destination=CardLocation.HAND,
+        )
 
     @staticmethod
     def demand_effect(
@@ -417,14 +436,10 @@ class ArcheryDemand(BaseDemand):
     ) -> Draw:
         return Draw(
             target_player=target_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=1,
-            on_completion=lambda _: TransferCard(
-                giving_player=target_player,
-                allowed_receiving_players={activating_player},
-                allowed_cards=ArcheryDemand.transfer_card_rule,
-                card_location=CardLocation.HAND,
-                card_destination=CardLocation.HAND,
+            on_completion=bind_rule(
+                ArcheryDemand.on_completion, activating_player, target_player
             ),
         )
 
@@ -473,13 +488,12 @@ class OarsDemand(BaseDemand):
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: transferable_cards,
+                allowed_cards=bind_rule(fixed_cards, transferable_cards),
                 card_location=CardLocation.HAND,
                 card_destination=CardLocation.SCORE_PILE,
-                on_completion=lambda _: Draw(
-                    target_player=target_player,
-                    draw_location=lambda _: CardLocation.HAND,
-                    level=1,
+                on_completion=bind_rule(
+                    constant,
+                    Draw(target_player=target_player, draw_location=TO_HAND, level=1),
                 ),
             )
 
@@ -492,7 +506,7 @@ class OarsDemand(BaseDemand):
         if all(result is None for result in demand_results):
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
+                draw_location=TO_HAND,
                 level=1,
             )
 
@@ -503,18 +517,25 @@ class AgricultureDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.LEAF
 
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Draw:
+        return Draw(
+            target_player=activating_player,
+            draw_location=TO_SCORE_PILE,
+            level=list(cards)[0].age + 1,
+        )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         if len(activating_player.hand) >= 1:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     min_cards=1,
                     max_cards=1,
-                    on_completion=lambda cards: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.SCORE_PILE,
-                        level=list(cards)[0].age + 1,
+                    on_completion=bind_rule(
+                        AgricultureDogma.on_completion, activating_player
                     ),
                 )
             )
@@ -528,17 +549,13 @@ class DomesticationDogma(BaseDogma):
 
     @staticmethod
     def allowed_cards(_, activating_player: Player, __) -> Set[Card]:
-        if not activating_player.hand:
-            return set()
-
-        min_age = min(card.age for card in activating_player.hand)
-        return {card for card in activating_player.hand if card.age == min_age}
+        return get_lowest_cards(activating_player.hand)
 
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Draw, Meld]:
         draw = Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=1,
         )
 
@@ -547,7 +564,7 @@ class DomesticationDogma(BaseDogma):
         else:
             return Meld(
                 allowed_cards=DomesticationDogma.allowed_cards,
-                on_completion=lambda _: draw,
+                on_completion=bind_rule(constant, draw),
             )
 
 
@@ -570,7 +587,7 @@ class MasonryDogma(BaseDogma):
                 Meld(
                     min_cards=1,
                     max_cards=len(meldable_cards),
-                    allowed_cards=lambda _, __, ___: meldable_cards,
+                    allowed_cards=bind_rule(fixed_cards, meldable_cards),
                     on_completion=MasonryDogma.on_completion,
                 )
             )
@@ -592,7 +609,7 @@ class ClothingDogma1(BaseDogma):
         }
 
         if allowed_cards:
-            return Meld(allowed_cards=lambda _, __, ___: allowed_cards)
+            return Meld(allowed_cards=bind_rule(fixed_cards, allowed_cards))
 
 
 @register_effect(registry=mutable_registry, card_name="Clothing", position=1)
@@ -619,7 +636,7 @@ class ClothingDogma2(BaseDogma):
         if num_unique_colors > 0:
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.SCORE_PILE,
+                draw_location=TO_SCORE_PILE,
                 level=1,
                 num_cards=num_unique_colors,
             )
@@ -635,7 +652,7 @@ class SailingDogma(BaseDogma):
     def dogma_effect(_, activating_player: Player) -> Draw:
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.BOARD,
+            draw_location=TO_BOARD,
             level=1,
         )
 
@@ -650,12 +667,11 @@ class WheelDogma(BaseDogma):
     def dogma_effect(_, activating_player: Player) -> Draw:
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=1,
-            on_completion=lambda _: Draw(
-                target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
-                level=1,
+            on_completion=bind_rule(
+                constant,
+                Draw(target_player=activating_player, draw_location=TO_HAND, level=1),
             ),
         )
 
@@ -666,18 +682,25 @@ class PotteryDogma1(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.LEAF
 
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Draw:
+        return Draw(
+            target_player=activating_player,
+            draw_location=TO_SCORE_PILE,
+            level=len(cards),
+        )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         if activating_player.hand:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     min_cards=1,
                     max_cards=3,
-                    on_completion=lambda cards: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.SCORE_PILE,
-                        level=len(cards),
+                    on_completion=bind_rule(
+                        PotteryDogma1.on_completion, activating_player
                     ),
                 )
             )
@@ -693,7 +716,7 @@ class PotteryDogma2(BaseDogma):
     def dogma_effect(_, activating_player: Player) -> Draw:
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=1,
         )
 
@@ -709,13 +732,16 @@ class ToolsDogma1(BaseDogma):
         if len(activating_player.hand) >= 3:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     min_cards=3,
                     max_cards=3,
-                    on_completion=lambda _: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.BOARD,
-                        level=3,
+                    on_completion=bind_rule(
+                        constant,
+                        Draw(
+                            target_player=activating_player,
+                            draw_location=TO_BOARD,
+                            level=3,
+                        ),
                     ),
                 )
             )
@@ -729,19 +755,22 @@ class ToolsDogma2(BaseDogma):
 
     @staticmethod
     def dogma_effect(_, activating_player: Player):
-        age_3_cards = {card for card in activating_player.hand if card.age == 3}
+        age_3_cards = get_cards_of_age(activating_player.hand, 3)
 
         if age_3_cards:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: age_3_cards,
+                    allowed_cards=bind_rule(fixed_cards, age_3_cards),
                     min_cards=1,
                     max_cards=1,
-                    on_completion=lambda _: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.HAND,
-                        level=1,
-                        num_cards=3,
+                    on_completion=bind_rule(
+                        constant,
+                        Draw(
+                            target_player=activating_player,
+                            draw_location=TO_HAND,
+                            level=1,
+                            num_cards=3,
+                        ),
                     ),
                 )
             )
@@ -757,7 +786,7 @@ class WritingDogma(BaseDogma):
     def dogma_effect(_, activating_player: Player):
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=2,
         )
 
@@ -768,6 +797,17 @@ class CodeOfLawsDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CROWN
 
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Optional:
+        return Optional(
+            Splay(
+                target_player=activating_player,
+                allowed_colors={card.color for card in cards},
+                allowed_directions={SplayDirection.LEFT},
+            )
+        )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         colors_on_board = activating_player.colors_with_cards
@@ -778,13 +818,9 @@ class CodeOfLawsDogma(BaseDogma):
         if allowed_cards:
             return Optional(
                 Tuck(
-                    allowed_cards=lambda _, __, ___: allowed_cards,
-                    on_completion=lambda cards: Optional(
-                        Splay(
-                            target_player=activating_player,
-                            allowed_colors={card.color for card in cards},
-                            allowed_directions={SplayDirection.LEFT},
-                        )
+                    allowed_cards=bind_rule(fixed_cards, allowed_cards),
+                    on_completion=bind_rule(
+                        CodeOfLawsDogma.on_completion, activating_player
                     ),
                 )
             )
@@ -800,11 +836,9 @@ class CityStatesDemand(BaseDemand):
     def demand_effect(
         _, activating_player: Player, target_player: Player
     ) -> Union[TransferCard, None]:
-        top_cards_with_castles = {
-            card
-            for card in target_player.top_cards
-            if any(symbol.symbol_type == SymbolType.CASTLE for symbol in card.symbols)
-        }
+        top_cards_with_castles = cards_with_symbol(
+            target_player.top_cards, SymbolType.CASTLE
+        )
 
         if (
             target_player.symbol_count.get(SymbolType.CASTLE, 0) >= 4
@@ -813,13 +847,12 @@ class CityStatesDemand(BaseDemand):
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: top_cards_with_castles,
+                allowed_cards=bind_rule(fixed_cards, top_cards_with_castles),
                 card_location=CardLocation.BOARD,
                 card_destination=CardLocation.BOARD,
-                on_completion=lambda _: Draw(
-                    target_player=target_player,
-                    draw_location=lambda _: CardLocation.HAND,
-                    level=1,
+                on_completion=bind_rule(
+                    constant,
+                    Draw(target_player=target_player, draw_location=TO_HAND, level=1),
                 ),
             )
 
@@ -830,23 +863,33 @@ class MysticismDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CASTLE
 
+    @staticmethod
+    @register_rule
+    def draw_location(colors_on_board: Set[Color], cards: Set[Card]) -> CardLocation:
+        if any(card.color in colors_on_board for card in cards):
+            return CardLocation.BOARD
+        else:
+            return CardLocation.HAND
+
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, colors_on_board: Set[Color], cards: Set[Card]
+    ) -> Union[Draw, None]:
+        if any(card.color in colors_on_board for card in cards):
+            return Draw(target_player=activating_player, draw_location=TO_HAND, level=1)
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Draw:
         colors_on_board = activating_player.colors_with_cards
 
         return Draw(
             target_player=activating_player,
-            draw_location=lambda cards: CardLocation.BOARD
-            if any(card.color in colors_on_board for card in cards)
-            else CardLocation.HAND,
+            draw_location=bind_rule(MysticismDogma.draw_location, colors_on_board),
             level=1,
-            on_completion=lambda cards: Draw(
-                target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
-                level=1,
-            )
-            if any(card.color in colors_on_board for card in cards)
-            else None,
+            on_completion=bind_rule(
+                MysticismDogma.on_completion, activating_player, colors_on_board
+            ),
         )
 
 
@@ -862,7 +905,7 @@ class ConstructionDemand(BaseDemand):
     ) -> Union[TransferCard, Draw]:
         draw = Draw(
             target_player=target_player,
-            draw_location=lambda _: CardLocation.HAND,
+            draw_location=TO_HAND,
             level=2,
         )
 
@@ -870,11 +913,11 @@ class ConstructionDemand(BaseDemand):
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: target_player.hand,
+                allowed_cards=bind_rule(player_hand, target_player),
                 card_location=CardLocation.HAND,
                 card_destination=CardLocation.HAND,
                 num_cards=min(2, len(target_player.hand)),
-                on_completion=lambda _: draw,
+                on_completion=bind_rule(constant, draw),
             )
         else:
             return draw
@@ -909,42 +952,54 @@ class RoadBuildingDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CASTLE
 
+    @staticmethod
+    def top_red_card(_, giving_player: Player, __) -> Set[Card]:
+        if Color.RED in giving_player.colors_with_cards:
+            return {giving_player.board.get(Color.RED).top_card}
+        else:
+            return {}
+
+    @staticmethod
+    def top_green_card(_, __, receiving_player: Player) -> Set[Card]:
+        if Color.GREEN in receiving_player.colors_with_cards:
+            return {receiving_player.board.get(Color.GREEN).top_card}
+        else:
+            return {}
+
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, other_players: Set[Player], cards: Set[Card]
+    ) -> Union[Optional, None]:
+        if len(cards) == 2:
+            return Optional(
+                ExchangeCards(
+                    allowed_giving_player={activating_player},
+                    allowed_receiving_player=other_players,
+                    allowed_giving_cards=RoadBuildingDogma.top_red_card,
+                    allowed_receiving_cards=RoadBuildingDogma.top_green_card,
+                    num_cards_giving=1,
+                    num_cards_receiving=1,
+                    giving_location=CardLocation.BOARD,
+                    receiving_location=CardLocation.BOARD,
+                )
+            )
+
     @staticmethod
     def dogma_effect(
         game_state: GameState, activating_player: Player
     ) -> Union[Meld, None]:
         if activating_player.hand:
+            other_players = {
+                player for player in game_state.players if player != activating_player
+            }
+
             return Meld(
-                allowed_cards=lambda _, __, ___: activating_player.hand,
+                allowed_cards=bind_rule(player_hand, activating_player),
                 min_cards=1,
                 max_cards=2,
-                on_completion=lambda cards: (
-                    Optional(
-                        ExchangeCards(
-                            allowed_giving_player={activating_player},
-                            allowed_receiving_player={
-                                player
-                                for player in game_state.players
-                                if player != activating_player
-                            },
-                            allowed_giving_cards=lambda _, giving_player, __: {
-                                giving_player.board.get(Color.RED).top_card
-                            }
-                            if Color.RED in giving_player.colors_with_cards
-                            else {},
-                            allowed_receiving_cards=lambda _, __, receiving_player: {
-                                receiving_player.board.get(Color.GREEN).top_card
-                            }
-                            if Color.GREEN in receiving_player.colors_with_cards
-                            else {},
-                            num_cards_giving=1,
-                            num_cards_receiving=1,
-                            giving_location=CardLocation.BOARD,
-                            receiving_location=CardLocation.BOARD,
-                        )
-                    )
-                    if len(cards) == 2
-                    else None
+                on_completion=bind_rule(
+                    RoadBuildingDogma.on_completion, activating_player, other_players
                 ),
             )
 
@@ -968,8 +1023,10 @@ class CanalBuildingDogma(BaseDogma):
                 ExchangeCards(
                     allowed_giving_player={activating_player},
                     allowed_receiving_player={activating_player},
-                    allowed_giving_cards=lambda _, __, ___: highest_cards_in_hand,
-                    allowed_receiving_cards=lambda _, __, ___: highest_cards_in_score_pile,
+                    allowed_giving_cards=bind_rule(fixed_cards, highest_cards_in_hand),
+                    allowed_receiving_cards=bind_rule(
+                        fixed_cards, highest_cards_in_score_pile
+                    ),
                     num_cards_giving=len(highest_cards_in_hand),
                     num_cards_receiving=len(highest_cards_in_score_pile),
                     giving_location=CardLocation.HAND,
@@ -992,7 +1049,7 @@ class FermentingDogma(BaseDogma):
         if draw_count:
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
+                draw_location=TO_HAND,
                 level=2,
                 num_cards=draw_count,
             )
@@ -1004,19 +1061,26 @@ class CurrencyDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CROWN
 
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Draw:
+        return Draw(
+            target_player=activating_player,
+            draw_location=TO_SCORE_PILE,
+            level=2,
+            num_cards=len({card.age for card in cards}),
+        )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         if activating_player.hand:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     min_cards=1,
                     max_cards=len(activating_player.hand),
-                    on_completion=lambda cards: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.SCORE_PILE,
-                        level=2,
-                        num_cards=len({card.age for card in cards}),
+                    on_completion=bind_rule(
+                        CurrencyDogma.on_completion, activating_player
                     ),
                 )
             )
@@ -1032,13 +1096,13 @@ class MapmakingDemand(BaseDemand):
     def demand_effect(
         _, activating_player: Player, target_player: Player
     ) -> Union[TransferCard, None]:
-        target_cards = {card for card in target_player.score_pile if card.age == 1}
+        target_cards = get_cards_of_age(target_player.score_pile, 1)
 
         if target_cards:
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: target_cards,
+                allowed_cards=bind_rule(fixed_cards, target_cards),
                 card_location=CardLocation.SCORE_PILE,
                 card_destination=CardLocation.SCORE_PILE,
             )
@@ -1052,7 +1116,7 @@ class MapmakingDemand(BaseDemand):
         if any(effect is not None for effect in demand_results):
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.SCORE_PILE,
+                draw_location=TO_SCORE_PILE,
                 level=1,
             )
 
@@ -1068,7 +1132,7 @@ class CalendarDogma(BaseDogma):
         if len(activating_player.score_pile) > len(activating_player.hand):
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
+                draw_location=TO_HAND,
                 level=3,
                 num_cards=2,
             )
@@ -1080,18 +1144,25 @@ class MathematicsDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.LIGHT_BULB
 
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Draw:
+        return Draw(
+            target_player=activating_player,
+            draw_location=TO_BOARD,
+            level=list(cards)[0].age + 1,
+        )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         if activating_player.hand:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     min_cards=1,
                     max_cards=1,
-                    on_completion=lambda cards: Draw(
-                        target_player=activating_player,
-                        draw_location=lambda _: CardLocation.BOARD,
-                        level=list(cards)[0].age + 1,
+                    on_completion=bind_rule(
+                        MathematicsDogma.on_completion, activating_player
                     ),
                 )
             )
@@ -1103,6 +1174,15 @@ class MonotheismDemand(BaseDemand):
     def symbol(self) -> SymbolType:
         return SymbolType.CASTLE
 
+    @staticmethod
+    @register_rule
+    def allowed_cards(
+        target_player: Player, allowed_colors: Set[Color], *_
+    ) -> Set[Card]:
+        return {
+            card for card in target_player.top_cards if card.color in allowed_colors
+        }
+
     @staticmethod
     def demand_effect(
         _, activating_player: Player, target_player: Player
@@ -1115,18 +1195,19 @@ class MonotheismDemand(BaseDemand):
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: {
-                    card
-                    for card in target_player.top_cards
-                    if card.color in allowed_colors
-                },
+                allowed_cards=bind_rule(
+                    MonotheismDemand.allowed_cards, target_player, allowed_colors
+                ),
                 card_location=CardLocation.BOARD,
                 card_destination=CardLocation.SCORE_PILE,
-                on_completion=lambda _: Draw(
-                    target_player=target_player,
-                    draw_location=lambda _: CardLocation.BOARD,
-                    level=1,
-                    tuck=True,
+                on_completion=bind_rule(
+                    constant,
+                    Draw(
+                        target_player=target_player,
+                        draw_location=TO_BOARD,
+                        level=1,
+                        tuck=True,
+                    ),
                 ),
             )
 
@@ -1141,7 +1222,7 @@ class MonotheismDogma(BaseDogma):
     def dogma_effect(_, activating_player: Player) -> Draw:
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.BOARD,
+            draw_location=TO_BOARD,
             level=1,
             tuck=True,
         )
@@ -1179,7 +1260,7 @@ class PhilosophyDogma2(BaseDogma):
                 TransferCard(
                     giving_player=activating_player,
                     allowed_receiving_players={activating_player},
-                    allowed_cards=lambda _, __, ___: activating_player.hand,
+                    allowed_cards=bind_rule(player_hand, activating_player),
                     card_location=CardLocation.HAND,
                     card_destination=CardLocation.SCORE_PILE,
                 )
@@ -1196,16 +1277,14 @@ class EngineeringDemand(BaseDemand):
     def demand_effect(
         _, activating_player: Player, target_player: Player
     ) -> Union[TransferCard, None]:
-        target_castle_cards = {
-            card
-            for card in target_player.top_cards
-            if card.has_symbol_type(SymbolType.CASTLE)
-        }
+        target_castle_cards = filter_cards_by_symbol(
+            target_player.top_cards, SymbolType.CASTLE
+        )
         if target_castle_cards:
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: target_castle_cards,
+                allowed_cards=bind_rule(fixed_cards, target_castle_cards),
                 card_location=CardLocation.BOARD,
                 card_destination=CardLocation.SCORE_PILE,
                 num_cards=len(target_castle_cards),
@@ -1236,6 +1315,22 @@ class OpticsDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CROWN
 
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player,
+        transfer_card: Union[TransferCard, None],
+        cards: Set[Card],
+    ) -> Union[Draw, TransferCard, None]:
+        if any(card.has_symbol_type(SymbolType.CROWN) for card in cards):
+            return Draw(
+                target_player=activating_player,
+                draw_location=TO_SCORE_PILE,
+                level=4,
+            )
+        else:
+            return transfer_card
+
     @staticmethod
     def dogma_effect(game_state: GameState, activating_player: Player) -> Draw:
         players_with_less_points = {
@@ -1247,7 +1342,7 @@ class OpticsDogma(BaseDogma):
             TransferCard(
                 giving_player=activating_player,
                 allowed_receiving_players=players_with_less_points,
-                allowed_cards=lambda _, __, ___: activating_player.score_pile,
+                allowed_cards=bind_rule(player_score_pile, activating_player),
                 card_location=CardLocation.SCORE_PILE,
                 card_destination=CardLocation.SCORE_PILE,
             )
@@ -1257,15 +1352,11 @@ class OpticsDogma(BaseDogma):
 
         return Draw(
             target_player=activating_player,
-            draw_location=lambda _: CardLocation.BOARD,
+            draw_location=TO_BOARD,
             level=3,
-            on_completion=lambda cards: Draw(
-                target_player=activating_player,
-                draw_location=lambda _: CardLocation.SCORE_PILE,
-                level=4,
-            )
-            if any(card.has_symbol_type(SymbolType.CROWN) for card in cards)
-            else transfer_card,
+            on_completion=bind_rule(
+                OpticsDogma.on_completion, activating_player, transfer_card
+            ),
         )
 
 
@@ -1286,8 +1377,12 @@ class MachineryDemand(BaseDemand):
             return ExchangeCards(
                 allowed_giving_player={activating_player},
                 allowed_receiving_player={target_player},
-                allowed_giving_cards=lambda _, __, ___: highest_activating_player_cards,
-                allowed_receiving_cards=lambda _, __, ___: highest_target_player_cards,
+                allowed_giving_cards=bind_rule(
+                    fixed_cards, highest_activating_player_cards
+                ),
+                allowed_receiving_cards=bind_rule(
+                    fixed_cards, highest_target_player_cards
+                ),
                 num_cards_giving=len(highest_activating_player_cards),
                 num_cards_receiving=len(highest_target_player_cards),
                 giving_location=CardLocation.HAND,
@@ -1305,11 +1400,9 @@ class MachineryDogma(BaseDogma):
     def dogma_effect(
         _, activating_player: Player
     ) -> Union[TransferCard, Optional, None]:
-        cards_with_castles = {
-            card
-            for card in activating_player.hand
-            if card.has_symbol_type(SymbolType.CASTLE)
-        }
+        cards_with_castles = filter_cards_by_symbol(
+            activating_player.hand, SymbolType.CASTLE
+        )
 
         splay = Optional(
             Splay(
@@ -1323,10 +1416,10 @@ class MachineryDogma(BaseDogma):
             return TransferCard(
                 giving_player=activating_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: cards_with_castles,
+                allowed_cards=bind_rule(fixed_cards, cards_with_castles),
                 card_location=CardLocation.HAND,
                 card_destination=CardLocation.SCORE_PILE,
-                on_completion=lambda _: splay,
+                on_completion=bind_rule(constant, splay),
             )
         elif Color.RED in activating_player.splayable_colors:
             return splay
@@ -1349,8 +1442,8 @@ class MedicineDemand(BaseDemand):
             return ExchangeCards(
                 allowed_giving_player={activating_player},
                 allowed_receiving_player={target_player},
-                allowed_giving_cards=lambda _, __, ___: lowest_activating_cards,
-                allowed_receiving_cards=lambda _, __, ___: highest_target_cards,
+                allowed_giving_cards=bind_rule(fixed_cards, lowest_activating_cards),
+                allowed_receiving_cards=bind_rule(fixed_cards, highest_target_cards),
                 num_cards_giving=min(1, len(activating_player.score_pile)),
                 num_cards_receiving=min(1, len(target_player.score_pile)),
                 giving_location=CardLocation.SCORE_PILE,
@@ -1366,11 +1459,22 @@ class CompassDemand(BaseDemand):
 
     @staticmethod
     def cards_without_leaf(_, activating_player: Player, __) -> Set[Card]:
-        return {
-            card
-            for card in activating_player.top_cards
-            if not card.has_symbol_type(SymbolType.LEAF)
-        }
+        return filter_cards_by_symbol(
+            activating_player.top_cards, SymbolType.LEAF, has_symbol=False
+        )
+
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, target_player: Player, _
+    ) -> TransferCard:
+        return TransferCard(
+            giving_player=activating_player,
+            allowed_receiving_players={target_player},
+            allowed_cards=CompassDemand.cards_without_leaf,
+            card_location=CardLocation.BOARD,
+            card_destination=CardLocation.BOARD,
+        )
 
     @staticmethod
     def demand_effect(
@@ -1378,35 +1482,29 @@ class CompassDemand(BaseDemand):
     ) -> Union[TransferCard, None]:
         target_transferable_cards = {
             card
-            for card in target_player.top_cards
-            if card.has_symbol_type(SymbolType.LEAF) and card.color != Color.GREEN
-        }
-        activating_transferable_cards = {
-            card
-            for card in activating_player.top_cards
-            if not card.has_symbol_type(SymbolType.LEAF)
+            for card in filter_cards_by_symbol(target_player.top_cards, SymbolType.LEAF)
+            if card.color != Color.GREEN
         }
+        activating_transferable_cards = CompassDemand.cards_without_leaf(
+            None, activating_player, None
+        )
 
         if target_transferable_cards:
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: target_transferable_cards,
+                allowed_cards=bind_rule(fixed_cards, target_transferable_cards),
                 card_location=CardLocation.BOARD,
                 card_destination=CardLocation.BOARD,
-                on_completion=lambda _: TransferCard(
-                    giving_player=activating_player,
-                    allowed_receiving_players={target_player},
-                    allowed_cards=CompassDemand.cards_without_leaf,
-                    card_location=CardLocation.BOARD,
-                    card_destination=CardLocation.BOARD,
+                on_completion=bind_rule(
+                    CompassDemand.on_completion, activating_player, target_player
                 ),
             )
         elif activating_transferable_cards:
             return TransferCard(
                 giving_player=activating_player,
                 allowed_receiving_players={target_player},
-                allowed_cards=lambda _, __, ___: activating_transferable_cards,
+                allowed_cards=bind_rule(fixed_cards, activating_transferable_cards),
                 card_location=CardLocation.BOARD,
                 card_destination=CardLocation.BOARD,
             )
@@ -1449,7 +1547,7 @@ class PaperDogma2(BaseDogma):
         if num_left_splays > 0:
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda _: CardLocation.HAND,
+                draw_location=TO_HAND,
                 level=4,
                 num_cards=num_left_splays,
             )
@@ -1461,6 +1559,29 @@ class AlchemyDogma1(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CASTLE
 
+    @staticmethod
+    def has_red(cards: Set[Card]) -> bool:
+        return any(card.color == Color.RED for card in cards)
+
+    @staticmethod
+    def draw_location(cards: Set[Card]) -> CardLocation:
+        if AlchemyDogma1.has_red(cards):
+            return CardLocation.DECK
+        else:
+            return CardLocation.HAND
+
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, cards: Set[Card]
+    ) -> Union[Return, None]:
+        if AlchemyDogma1.has_red(cards):
+            return Return(
+                allowed_cards=bind_rule(player_hand, activating_player),
+                min_cards=len(activating_player.hand),
+                max_cards=len(activating_player.hand),
+            )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Draw, None]:
         num_draws = activating_player.symbol_count.get(SymbolType.CASTLE, 0) // 3
@@ -1468,23 +1589,11 @@ class AlchemyDogma1(BaseDogma):
         if num_draws:
             return Draw(
                 target_player=activating_player,
-                draw_location=lambda cards: (
-                    CardLocation.HAND
-                    if not any(card.color == Color.RED for card in cards)
-                    else CardLocation.DECK
-                ),
+                draw_location=AlchemyDogma1.draw_location,
                 level=4,
                 num_cards=num_draws,
                 reveal=True,
-                on_completion=lambda cards: (
-                    Return(
-                        allowed_cards=lambda _, __, ___: activating_player.hand,
-                        min_cards=len(activating_player.hand),
-                        max_cards=len(activating_player.hand),
-                    )
-                    if any(card.color == Color.RED for card in cards)
-                    else None
-                ),
+                on_completion=bind_rule(AlchemyDogma1.on_completion, activating_player),
             )
 
 
@@ -1494,20 +1603,31 @@ class AlchemyDogma2(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.CASTLE
 
+    @staticmethod
+    @register_rule
+    def remaining_cards(
+        activating_player: Player, melded_cards: Set[Card], *_
+    ) -> Set[Card]:
+        return activating_player.hand - melded_cards
+
+    @staticmethod
+    @register_rule
+    def on_completion(
+        activating_player: Player, cards: Set[Card]
+    ) -> Union[Score, None]:
+        if activating_player.hand - cards:
+            return Score(
+                allowed_cards=bind_rule(
+                    AlchemyDogma2.remaining_cards, activating_player, cards
+                )
+            )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Meld, None]:
         if activating_player.hand:
             return Meld(
-                allowed_cards=lambda _, __, ___: activating_player.hand,
-                on_completion=lambda cards: (
-                    Score(
-                        allowed_cards=lambda _, __, ___: (
-                            activating_player.hand - cards
-                        )
-                    )
-                    if activating_player.hand - cards
-                    else None
-                ),
+                allowed_cards=bind_rule(player_hand, activating_player),
+                on_completion=bind_rule(AlchemyDogma2.on_completion, activating_player),
             )
 
 
@@ -1522,7 +1642,7 @@ class TranslationDogma1(BaseDogma):
         if activating_player.score_pile:
             return Optional(
                 Meld(
-                    allowed_cards=lambda _, __, ___: activating_player.score_pile,
+                    allowed_cards=bind_rule(player_score_pile, activating_player),
                     min_cards=len(activating_player.score_pile),
                     max_cards=len(activating_player.score_pile),
                     card_location=CardLocation.SCORE_PILE,
@@ -1538,9 +1658,8 @@ class TranslationDogma2(BaseDogma):
 
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Achieve, None]:
-        if all(
-            card.has_symbol_type(SymbolType.CROWN)
-            for card in activating_player.top_cards
+        if not filter_cards_by_symbol(
+            activating_player.top_cards, SymbolType.CROWN, has_symbol=False
         ):
             return Achieve(
                 achievement=GLOBAL_ACHIEVEMENTS_REGISTRY.registry.get("World")
@@ -1553,26 +1672,34 @@ class EducationDogma(BaseDogma):
     def symbol(self) -> SymbolType:
         return SymbolType.LIGHT_BULB
 
+    @staticmethod
+    @register_rule
+    def allowed_cards(activating_player: Player, *_) -> Set[Card]:
+        return get_highest_cards(activating_player.score_pile)
+
+    @staticmethod
+    @register_rule
+    def on_completion(activating_player: Player, cards: Set[Card]) -> Union[Draw, None]:
+        remaining_cards = activating_player.score_pile - cards
+
+        if remaining_cards:
+            return Draw(
+                target_player=activating_player,
+                draw_location=TO_HAND,
+                level=list(get_highest_cards(remaining_cards))[0].age + 2,
+            )
+
     @staticmethod
     def dogma_effect(_, activating_player: Player) -> Union[Optional, None]:
         if activating_player.score_pile:
             return Optional(
                 Return(
-                    allowed_cards=lambda _, __, ___: get_highest_cards(
-                        activating_player.score_pile
+                    allowed_cards=bind_rule(
+                        EducationDogma.allowed_cards, activating_player
                     ),
                     card_location=CardLocation.SCORE_PILE,
-                    on_completion=lambda cards: (
-                        Draw(
-                            target_player=activating_player,
-                            draw_location=lambda _: CardLocation.HAND,
-                            level=list(
-                                get_highest_cards(activating_player.score_pile - cards)
-                            )[0].age
-                            + 2,
-                        )
-                        if activating_player.score_pile - cards
-                        else None
+                    on_completion=bind_rule(
+                        EducationDogma.on_completion, activating_player
                     ),
                 )
             )
@@ -1588,17 +1715,15 @@ class FeudalismDemand(BaseDemand):
     def demand_effect(
         _, activating_player: Player, target_player: Player
     ) -> Union[TransferCard, None]:
-        target_transferable_cards = {
-            card
-            for card in target_player.hand
-            if card.has_symbol_type(SymbolType.CASTLE)
-        }
+        target_transferable_cards = filter_cards_by_symbol(
+            target_player.hand, SymbolType.CASTLE
+        )
 
         if target_transferable_cards:
             return TransferCard(
                 giving_player=target_player,
                 allowed_receiving_players={activating_player},
-                allowed_cards=lambda _, __, ___: target_transferable_cards,
+                allowed_cards=bind_rule(fixed_cards, target_transferable_cards),
                 card_location=CardLocation.HAND,
                 card_destination=CardLocation.HAND,
             )
@@ -1628,3 +1753,8 @@ class FeudalismDogma(BaseDogma):
 
 
 GLOBAL_CARD_REGISTRY = mutable_registry.to_immutable_registry()
+GLOBAL_SYMBOL_CONTRIBUTIONS = build_symbol_contribution_table(
+    GLOBAL_CARD_REGISTRY.registry.values()
+)
+CardSet.index_members(GLOBAL_CARD_REGISTRY.registry.values())
+build_dogma_tables(GLOBAL_CARD_REGISTRY.registry.values())
@@ -1,8 +1,21 @@
 from __future__ import annotations
+from src.innovation.utils.indexed_set import IndexedSet
 from src.innovation.utils.registry import Registerable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from collections import deque
 from enum import Enum, unique
-from typing import List, Deque, Dict, Set, TYPE_CHECKING
+import itertools
+import operator
+from typing import (
+    List,
+    Deque,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
 
 if TYPE_CHECKING:
     from src.innovation.cards.card_effects import BaseEffect
@@ -43,33 +56,148 @@ class SplayDirection(Enum):
     UP = 4
 
 
-@dataclass
+@unique
+class CardLocation(Enum):
+    HAND = 1
+    BOARD = 2
+    SCORE_PILE = 3
+    DECK = 4
+
+
+@dataclass(frozen=True, slots=True)
 class Symbol:
+    """
+    A symbol printed on a card. There are only len(SymbolType) * len(Position) distinct symbols,
+    so they are interned: constructing a symbol returns the shared instance from SYMBOLS.
+    """
+
     symbol_type: SymbolType
     position: Position
 
+    def __new__(cls, symbol_type: SymbolType, position: Position) -> Symbol:
+        symbol = SYMBOLS.get((symbol_type, position))
+
+        if symbol is None:
+            symbol = object.__new__(cls)
+
+        return symbol
+
+    def __reduce__(self):
+        return Symbol, (self.symbol_type, self.position)
+
+
+SYMBOLS: Dict[Tuple[SymbolType, Position], Symbol] = {}
+for symbol_type, position in itertools.product(SymbolType, Position):
+    SYMBOLS[(symbol_type, position)] = Symbol(symbol_type, position)
+
+
+# Mapping of splay direction to set of symbol positions which should be counted on covered cards
+VISIBLE_POSITIONS = {
+    SplayDirection.NONE: frozenset(),
+    SplayDirection.LEFT: frozenset({Position.BOTTOM_RIGHT}),
+    SplayDirection.RIGHT: frozenset({Position.TOP_LEFT, Position.BOTTOM_LEFT}),
+    SplayDirection.UP: frozenset(
+        {
+            Position.BOTTOM_LEFT,
+            Position.BOTTOM_MIDDLE,
+            Position.BOTTOM_RIGHT,
+        }
+    ),
+}
+
+
+SymbolVector = Tuple[int, ...]
+
+
+class SymbolContributions(NamedTuple):
+    # Number of each SymbolType (in SymbolType order) a card shows as the top card of a stack
+    top: SymbolVector
+    # Number of each SymbolType a card shows while covered, for every splay direction
+    covered: Dict[SplayDirection, SymbolVector]
+
+
+def compute_symbol_contributions(card: Card) -> SymbolContributions:
+    def symbol_vector(positions) -> SymbolVector:
+        return tuple(
+            sum(
+                1
+                for symbol in card.symbols
+                if symbol.symbol_type == symbol_type and symbol.position in positions
+            )
+            for symbol_type in SymbolType
+        )
+
+    return SymbolContributions(
+        top=symbol_vector(set(Position)),
+        covered={
+            splay: symbol_vector(positions)
+            for splay, positions in VISIBLE_POSITIONS.items()
+        },
+    )
+
+
+def build_symbol_contribution_table(
+    cards: Iterable[Card],
+) -> Dict[str, SymbolContributions]:
+    table = {}
+
+    for card in cards:
+        card.symbol_contributions = compute_symbol_contributions(card)
+        table[card.name] = card.symbol_contributions
+
+    return table
+
 
-@dataclass
+def get_symbol_contributions(card: Card) -> SymbolContributions:
+    contributions = card.symbol_contributions if isinstance(card, Card) else None
+
+    if contributions is None:
+        contributions = compute_symbol_contributions(card)
+
+    return contributions
+
+
+def symbol_vector_to_dict(symbol_vector: SymbolVector) -> Dict[SymbolType, int]:
+    return dict(zip(SymbolType, symbol_vector))
+
+
+@dataclass(slots=True)
 class Card(Registerable):
     color: Color
     age: int
     symbols: List[Symbol]
     effects: List[BaseEffect] = None
+    # Filled in from the card registry, see build_symbol_contribution_table
+    symbol_contributions: SymbolContributions = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Filled in from the card registry, see card_effects.build_dogma_tables
+    dogma_table: Tuple = field(default=None, init=False, repr=False, compare=False)
 
     def has_symbol_type(self, symbol_type: SymbolType) -> bool:
+        if self.index is not None:
+            return bool(CardSet.symbol_masks[symbol_type] >> self.index & 1)
+
         return any(symbol.symbol_type == symbol_type for symbol in self.symbols)
 
+    # Not super(): slots=True replaces the class, which breaks its zero argument form
     def __eq__(self, other):
-        return super().__eq__(other)
+        return Registerable.__eq__(self, other)
 
     def __hash__(self):
-        return super().__hash__()
+        return Registerable.__hash__(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class CardStack:
     stack: Deque[Card]
     splay: SplayDirection
+    # Running symbol tally of the covered cards for every splay direction, so that neither
+    # melding/tucking/popping nor changing the splay requires rescanning the stack.
+    # Built lazily on first use; the stack must then only be mutated through its methods.
+    _covered_symbol_counts: Dict[SplayDirection, List[int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def is_empty(self):
@@ -84,49 +212,252 @@ class CardStack:
     def can_splay(self) -> bool:
         return len(self.stack) >= 2
 
+    @property
+    def symbol_vector(self) -> SymbolVector:
+        if self._covered_symbol_counts is None:
+            self._rebuild_covered_symbol_counts()
+
+        covered = self._covered_symbol_counts[self.splay]
+
+        if self.is_empty:
+            return tuple(covered)
+
+        top = get_symbol_contributions(self.top_card).top
+        return tuple(map(operator.add, covered, top))
+
     @property
     def symbol_count(self) -> Dict[SymbolType, int]:
-        symbols_to_count = []
-
-        # Mapping of splay direction to set of symbol positions which should be counted
-        symbol_count_rules = {
-            SplayDirection.NONE: set(),
-            SplayDirection.LEFT: {Position.BOTTOM_RIGHT},
-            SplayDirection.RIGHT: {Position.TOP_LEFT, Position.BOTTOM_LEFT},
-            SplayDirection.UP: {
-                Position.BOTTOM_LEFT,
-                Position.BOTTOM_MIDDLE,
-                Position.BOTTOM_RIGHT,
-            },
-        }
+        return symbol_vector_to_dict(self.symbol_vector)
 
+    def fork(self) -> CardStack:
+        card_stack = CardStack(deque(self.stack), self.splay)
+
+        if self._covered_symbol_counts is not None:
+            card_stack._covered_symbol_counts = {
+                splay: counts.copy()
+                for splay, counts in self._covered_symbol_counts.items()
+            }
+
+        return card_stack
+
+    def meld(self, card: Card):
         if not self.is_empty:
-            symbols_to_count.extend(self.top_card.symbols)
-
-        for card in list(self.stack)[:-1]:
-            symbols_to_count.extend(
-                [
-                    symbol
-                    for symbol in card.symbols
-                    if symbol.position in symbol_count_rules.get(self.splay, set())
-                ]
-            )
+            self._update_covered_symbol_counts(self.top_card, 1)
 
-        return {
-            symbol_type: sum(
-                1 for symbol in symbols_to_count if symbol.symbol_type == symbol_type
-            )
+        self.stack.append(card)
+
+    def tuck(self, card: Card):
+        if not self.is_empty:
+            self._update_covered_symbol_counts(card, 1)
+
+        self.stack.appendleft(card)
+
+    def pop_top(self) -> Card:
+        card = self.stack.pop()
+
+        if not self.is_empty:
+            self._update_covered_symbol_counts(self.top_card, -1)
+
+        return card
+
+    def pop_bottom(self) -> Card:
+        if len(self.stack) > 1:
+            self._update_covered_symbol_counts(self.stack[0], -1)
+
+        return self.stack.popleft()
+
+    def _rebuild_covered_symbol_counts(self):
+        self._covered_symbol_counts = {
+            splay: [0] * len(SymbolType) for splay in SplayDirection
+        }
+
+        for card in itertools.islice(self.stack, max(len(self.stack) - 1, 0)):
+            self._update_covered_symbol_counts(card, 1)
+
+    def _update_covered_symbol_counts(self, card: Card, delta: int):
+        if self._covered_symbol_counts is None:
+            return
+
+        covered = get_symbol_contributions(card).covered
+        for splay, counts in self._covered_symbol_counts.items():
+            for index, count in enumerate(covered[splay]):
+                if count:
+                    counts[index] += delta * count
+
+
+MAX_AGE = 10
+
+
+class CardSet(IndexedSet):
+    __slots__ = ("_age_total", "_age_total_mask")
+
+    member_type = Card
+    # Bitmask of the card indices belonging to each age. Cards are indexed in age order,
+    # so every age occupies a contiguous run of bits.
+    age_masks: Dict[int, int] = {}
+    # Inverted indices from symbol type (and symbol type + position) to the cards showing it
+    symbol_masks: Dict[SymbolType, int] = {}
+    symbol_position_masks: Dict[Tuple[SymbolType, Position], int] = {}
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        super().__init__(cards)
+        self._invalidate_age_total()
+
+    @classmethod
+    def from_mask(cls, mask: int) -> CardSet:
+        # Inlined, decoding game states builds a few of these per player
+        card_set = cls.__new__(cls)
+        card_set.mask = mask
+        card_set._age_total = 0
+        card_set._age_total_mask = -1
+        return card_set
+
+    @classmethod
+    def index_members(cls, members: Iterable[Card]):
+        super().index_members(sorted(members, key=lambda card: card.age))
+
+        cls.age_masks = {age: 0 for age in range(1, MAX_AGE + 1)}
+        cls.symbol_masks = {symbol_type: 0 for symbol_type in SymbolType}
+        cls.symbol_position_masks = {
+            (symbol_type, position): 0
             for symbol_type in SymbolType
+            for position in Position
         }
 
+        for card in cls.members:
+            card_bit = 1 << card.index
+            cls.age_masks[card.age] |= card_bit
+
+            for symbol in card.symbols:
+                cls.symbol_masks[symbol.symbol_type] |= card_bit
+                cls.symbol_position_masks[
+                    (symbol.symbol_type, symbol.position)
+                ] |= card_bit
+
+    @classmethod
+    def all_with_symbol(
+        cls, symbol_type: SymbolType, position: Position = None
+    ) -> CardSet:
+        if position is None:
+            return cls.from_mask(cls.symbol_masks[symbol_type])
+
+        return cls.from_mask(cls.symbol_position_masks[(symbol_type, position)])
+
+    @property
+    def highest_age(self) -> int:
+        if self.mask:
+            return self.members[self.mask.bit_length() - 1].age
+
+    @property
+    def lowest_age(self) -> int:
+        if self.mask:
+            return self.members[(self.mask & -self.mask).bit_length() - 1].age
+
+    @property
+    def age_total(self) -> int:
+        if self._age_total_mask != self.mask:
+            self._age_total = sum(
+                age * (self.mask & age_mask).bit_count()
+                for age, age_mask in self.age_masks.items()
+            )
+            self._age_total_mask = self.mask
+
+        return self._age_total
+
+    def cards_of_age(self, age: int) -> CardSet:
+        return self.from_mask(self.mask & self.age_masks.get(age, 0))
+
+    def with_symbol(
+        self, symbol_type: SymbolType, position: Position = None
+    ) -> CardSet:
+        return self & self.all_with_symbol(symbol_type, position)
+
+    def without_symbol(self, symbol_type: SymbolType) -> CardSet:
+        return self - self.all_with_symbol(symbol_type)
+
+    def highest_cards(self) -> CardSet:
+        return self.cards_of_age(self.highest_age) if self.mask else self.copy()
+
+    def lowest_cards(self) -> CardSet:
+        return self.cards_of_age(self.lowest_age) if self.mask else self.copy()
+
+    def copy(self) -> CardSet:
+        card_set = super().copy()
+        card_set._age_total = self._age_total
+        card_set._age_total_mask = self._age_total_mask
+        return card_set
+
+    def add(self, card: Card):
+        is_running_total = self._age_total_mask == self.mask
+        is_new_card = card not in self
+        super().add(card)
+
+        if is_running_total:
+            self._age_total += card.age if is_new_card else 0
+            self._age_total_mask = self.mask
+
+    def discard(self, card: Card):
+        if card in self:
+            is_running_total = self._age_total_mask == self.mask
+            super().discard(card)
+
+            if is_running_total:
+                self._age_total -= card.age
+                self._age_total_mask = self.mask
+
+    def remove(self, card: Card):
+        if card not in self:
+            raise KeyError(card)
+
+        self.discard(card)
+
+    def _invalidate_age_total(self):
+        self._age_total = 0
+        self._age_total_mask = -1
+
 
 def cards_with_symbol(cards: Set[Card], symbol: SymbolType) -> Set[Card]:
+    if isinstance(cards, CardSet):
+        return cards.with_symbol(symbol)
+
     return {card for card in cards if symbol in (s.symbol_type for s in card.symbols)}
 
 
-def get_highest_cards(cards: Set[Card]):
-    return {card for card in cards if card.age == max(cards, key=lambda c: c.age).age}
+def filter_cards_by_symbol(
+    cards: Set[Card], symbol_type: SymbolType, has_symbol: bool = True
+) -> Set[Card]:
+    if isinstance(cards, CardSet):
+        if has_symbol:
+            return cards.with_symbol(symbol_type)
+        return cards.without_symbol(symbol_type)
+
+    return {card for card in cards if card.has_symbol_type(symbol_type) == has_symbol}
+
+
+def get_highest_cards(cards: Set[Card]) -> Set[Card]:
+    if isinstance(cards, CardSet):
+        return cards.highest_cards()
+
+    if not cards:
+        return set()
+
+    max_age = max(card.age for card in cards)
+    return {card for card in cards if card.age == max_age}
 
 
 def get_lowest_cards(cards: Set[Card]) -> Set[Card]:
-    return {card for card in cards if card.age == min(cards, key=lambda c: c.age).age}
+    if isinstance(cards, CardSet):
+        return cards.lowest_cards()
+
+    if not cards:
+        return set()
+
+    min_age = min(card.age for card in cards)
+    return {card for card in cards if card.age == min_age}
+
+
+def get_cards_of_age(cards: Set[Card], age: int) -> Set[Card]:
+    if isinstance(cards, CardSet):
+        return cards.cards_of_age(age)
+
+    return {card for card in cards if card.age == age}
@@ -0,0 +1,56 @@
+from src.innovation.cards.cards import Card, CardLocation
+from src.innovation.players.players import Player
+from typing import Any, Callable, Dict, NamedTuple, Set
+
+# Rule functions referenced from effect building blocks, by qualified name. Blocks hold Rules
+# (a registered name plus bound arguments) instead of closures, so a pending effect tree is plain
+# data that can be pickled, see src.innovation.game.effect_pickling.
+RULES: Dict[str, Callable] = {}
+
+
+def register_rule(function: Callable) -> Callable:
+    RULES[function.__qualname__] = function
+    return function
+
+
+class Rule(NamedTuple):
+    name: str
+    # Passed to the rule function ahead of the arguments of the call
+    args: tuple = ()
+
+    def __call__(self, *args):
+        return RULES[self.name](*self.args, *args)
+
+
+def bind_rule(function: Callable, *args) -> Rule:
+    name = function.__qualname__
+
+    if RULES.get(name) is not function:
+        raise ValueError(f"{name} is not a registered rule")
+
+    return Rule(name, args)
+
+
+@register_rule
+def constant(value: Any, *_) -> Any:
+    return value
+
+
+@register_rule
+def fixed_cards(cards: Set[Card], *_) -> Set[Card]:
+    return cards
+
+
+@register_rule
+def player_hand(player: Player, *_) -> Set[Card]:
+    return player.hand
+
+
+@register_rule
+def player_score_pile(player: Player, *_) -> Set[Card]:
+    return player.score_pile
+
+
+TO_HAND = bind_rule(constant, CardLocation.HAND)
+TO_BOARD = bind_rule(constant, CardLocation.BOARD)
+TO_SCORE_PILE = bind_rule(constant, CardLocation.SCORE_PILE)
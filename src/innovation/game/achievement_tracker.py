@@ -0,0 +1,319 @@
+from __future__ import annotations
+from src.innovation.cards.achievement_registry import (
+    EMPIRE,
+    EMPIRE_SYMBOLS,
+    MONUMENT,
+    MONUMENT_CARDS,
+    SCORING_ACHIEVEMENTS,
+    UNIVERSE,
+    UNIVERSE_MIN_AGE,
+    UNIVERSE_TOP_CARDS,
+    WONDER,
+    WONDER_COLORS,
+    WONDER_SPLAYS,
+    WORLD,
+    WORLD_CLOCKS,
+)
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.cards import Card, CardLocation, Color, SymbolType
+from src.innovation.players.players import Player
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+# Score needed per scoring achievement level
+POINTS_PER_LEVEL = 5
+MAX_SCORING_LEVEL = len(SCORING_ACHIEVEMENTS)
+CLOCK_INDEX = list(SymbolType).index(SymbolType.CLOCK)
+
+
+def _level_masks() -> List[int]:
+    # Indexed by level, the scoring achievements of that level or lower
+    masks = [0]
+    for achievement in SCORING_ACHIEVEMENTS:
+        masks.append(masks[-1] | 1 << achievement.index)
+
+    return masks
+
+
+LEVEL_MASKS = _level_masks()
+
+
+class StackSummary(NamedTuple):
+    # What a single board stack contributes to the automatic achievement conditions
+    symbol_vector: Tuple[int, ...]
+    wonder_splay: bool
+    universe_top_card: bool
+
+
+EMPTY_STACK = StackSummary((0,) * len(SymbolType), False, False)
+
+
+STATE_SLOTS = (
+    "scores",
+    "top_ages",
+    "levels",
+    "stacks",
+    "symbol_vectors",
+    "wonder_splays",
+    "universe_top_cards",
+    "turn_tucks",
+    "turn_scores",
+    "automatic_masks",
+)
+
+
+class AchievementTracker:
+    """
+    Which achievements every player meets the condition of, kept in sync by the GameState
+    primitives as cards move and stacks are splayed.
+
+    Scoring achievement n needs a score of at least 5n and a top card of at least age n, so a
+    player is eligible for every level up to min(score // 5, highest top card age).
+
+    The automatic achievements are decided on running per player counters: the symbol totals,
+    splays and high top cards of the board (updated from the one stack a primitive changes) and
+    the cards tucked and scored since the start of the turn.
+
+    A tracker made by deferred is only built from its players the first time it is queried.
+    Until then the board and score hooks have nothing to update, since the build reads the
+    players as they are by then, and only the turn counts are kept.
+    """
+
+    __slots__ = STATE_SLOTS + ("_deferred",)
+
+    def __init__(self, players: Iterable[Player]):
+        # Players and turn counts of a tracker that has not been built yet, see deferred
+        self._deferred: Tuple[List[Player], Dict[int, List[int]]] = None
+        self.scores: Dict[int, int] = {}
+        self.top_ages: Dict[int, int] = {}
+        self.levels: Dict[int, int] = {}
+        # Indexed by player id, then color
+        self.stacks: Dict[int, Dict[Color, StackSummary]] = {}
+        self.symbol_vectors: Dict[int, List[int]] = {}
+        self.wonder_splays: Dict[int, int] = {}
+        self.universe_top_cards: Dict[int, int] = {}
+        self.turn_tucks: Dict[int, int] = {}
+        self.turn_scores: Dict[int, int] = {}
+        # Mask of the automatic achievements each player meets the condition of
+        self.automatic_masks: Dict[int, int] = {}
+
+        for player in players:
+            self.scores[player.id] = player.score
+            self.top_ages[player.id] = player.max_age_top_card
+            self.stacks[player.id] = {}
+            self.symbol_vectors[player.id] = list(EMPTY_STACK.symbol_vector)
+            self.wonder_splays[player.id] = 0
+            self.universe_top_cards[player.id] = 0
+            self.turn_tucks[player.id] = 0
+            self.turn_scores[player.id] = 0
+
+            for color in player.board:
+                self._update_stack(player, color)
+
+            self._update_level(player.id)
+            self._update_automatic(player.id)
+
+    @classmethod
+    def deferred(
+        cls, players: Iterable[Player], turn_counts: Dict[int, Tuple[int, int]]
+    ) -> AchievementTracker:
+        """A tracker of the players with the given turn counts, built on first use."""
+        tracker = cls.__new__(cls)
+        tracker._deferred = (
+            list(players),
+            {player_id: list(counts) for player_id, counts in turn_counts.items()},
+        )
+        return tracker
+
+    def __getattr__(self, name: str):
+        # Only reached for the state of a deferred tracker, which is built now
+        if name == "_deferred" or self._deferred is None:
+            raise AttributeError(name)
+
+        players, turn_counts = self._deferred
+        self.__init__(players)
+        for player_id, (tucks, scores) in turn_counts.items():
+            self.set_turn_counts(player_id, tucks, scores)
+
+        return getattr(self, name)
+
+    def copy(self) -> AchievementTracker:
+        tracker = AchievementTracker.__new__(AchievementTracker)
+        tracker._deferred = None
+
+        for name in STATE_SLOTS:
+            setattr(tracker, name, getattr(self, name).copy())
+
+        tracker.stacks = {
+            player_id: stacks.copy() for player_id, stacks in self.stacks.items()
+        }
+        tracker.symbol_vectors = {
+            player_id: symbol_vector.copy()
+            for player_id, symbol_vector in self.symbol_vectors.items()
+        }
+        return tracker
+
+    def card_added(self, player: Player, card: Card, card_location: CardLocation):
+        if self._deferred is not None:
+            return
+
+        player_id = player.id
+
+        if card_location == CardLocation.SCORE_PILE:
+            self.scores[player_id] += card.age
+        elif card_location == CardLocation.BOARD:
+            self.top_ages[player_id] = player.max_age_top_card
+            self._update_stack(player, card.color)
+        else:
+            return
+
+        self._update_level(player_id)
+        self._update_automatic(player_id)
+
+    def card_removed(self, player: Player, card: Card, card_location: CardLocation):
+        if self._deferred is not None:
+            return
+
+        player_id = player.id
+
+        if card_location == CardLocation.SCORE_PILE:
+            self.scores[player_id] -= card.age
+        elif card_location == CardLocation.BOARD:
+            self.top_ages[player_id] = player.max_age_top_card
+            self._update_stack(player, card.color)
+        else:
+            return
+
+        self._update_level(player_id)
+        self._update_automatic(player_id)
+
+    def count_card(
+        self,
+        player: Player,
+        card_location: CardLocation,
+        tuck: bool,
+        scored: bool,
+        delta: int = 1,
+    ):
+        """
+        Count a card scored or tucked this turn, or take it back (delta -1) when undoing. Cards
+        transferred or exchanged into a score pile are not scored.
+        """
+        if self._deferred is not None:
+            tucks_and_scores = self._deferred[1][player.id]
+            if scored:
+                tucks_and_scores[1] += delta
+            elif card_location == CardLocation.BOARD and tuck:
+                tucks_and_scores[0] += delta
+            return
+
+        if scored:
+            self.turn_scores[player.id] += delta
+        elif card_location == CardLocation.BOARD and tuck:
+            self.turn_tucks[player.id] += delta
+        else:
+            return
+
+        self._update_automatic(player.id)
+
+    def splayed(self, player: Player, color: Color):
+        if self._deferred is not None:
+            return
+
+        self._update_stack(player, color)
+        self._update_automatic(player.id)
+
+    def turn_counts(self, player_id: int) -> Tuple[int, int]:
+        """Cards tucked and scored by the player since the start of the turn."""
+        if self._deferred is not None:
+            return tuple(self._deferred[1][player_id])
+
+        return self.turn_tucks[player_id], self.turn_scores[player_id]
+
+    def set_turn_counts(self, player_id: int, tucks: int, scores: int):
+        if self._deferred is not None:
+            self._deferred[1][player_id] = [tucks, scores]
+            return
+
+        self.turn_tucks[player_id] = tucks
+        self.turn_scores[player_id] = scores
+        self._update_automatic(player_id)
+
+    def start_turn(self):
+        player_ids = (
+            self._deferred[1] if self._deferred is not None else self.turn_tucks
+        )
+        for player_id in list(player_ids):
+            self.set_turn_counts(player_id, 0, 0)
+
+    def claimable(self, player: Player, unclaimed: AchievementSet) -> AchievementSet:
+        """The unclaimed scoring achievements the player meets the condition of."""
+        return AchievementSet.from_mask(
+            LEVEL_MASKS[self.levels[player.id]] & unclaimed.mask
+        )
+
+    def can_achieve(self, player: Player, unclaimed: AchievementSet) -> bool:
+        return bool(LEVEL_MASKS[self.levels[player.id]] & unclaimed.mask)
+
+    def automatic(self, player: Player, unclaimed: AchievementSet) -> AchievementSet:
+        """The unclaimed automatic achievements the player meets the condition of."""
+        return AchievementSet.from_mask(
+            self.automatic_masks[player.id] & unclaimed.mask
+        )
+
+    def any_automatic(self, unclaimed: AchievementSet) -> bool:
+        unclaimed_mask = unclaimed.mask
+        return any(mask & unclaimed_mask for mask in self.automatic_masks.values())
+
+    def _update_level(self, player_id: int):
+        self.levels[player_id] = min(
+            self.scores[player_id] // POINTS_PER_LEVEL,
+            self.top_ages[player_id],
+            MAX_SCORING_LEVEL,
+        )
+
+    def _update_stack(self, player: Player, color: Color):
+        player_id = player.id
+        card_stack = player.board.get(color)
+
+        if card_stack is None or card_stack.is_empty:
+            summary = EMPTY_STACK
+        else:
+            summary = StackSummary(
+                card_stack.symbol_vector,
+                card_stack.splay in WONDER_SPLAYS,
+                card_stack.top_card.age >= UNIVERSE_MIN_AGE,
+            )
+
+        previous = self.stacks[player_id].get(color, EMPTY_STACK)
+        self.stacks[player_id][color] = summary
+
+        symbol_vector = self.symbol_vectors[player_id]
+        for index, (old, new) in enumerate(
+            zip(previous.symbol_vector, summary.symbol_vector)
+        ):
+            symbol_vector[index] += new - old
+
+        self.wonder_splays[player_id] += summary.wonder_splay - previous.wonder_splay
+        self.universe_top_cards[player_id] += (
+            summary.universe_top_card - previous.universe_top_card
+        )
+
+    def _update_automatic(self, player_id: int):
+        symbol_vector = self.symbol_vectors[player_id]
+        mask = 0
+
+        if (
+            self.turn_tucks[player_id] >= MONUMENT_CARDS
+            or self.turn_scores[player_id] >= MONUMENT_CARDS
+        ):
+            mask |= 1 << MONUMENT.index
+        if min(symbol_vector) >= EMPIRE_SYMBOLS:
+            mask |= 1 << EMPIRE.index
+        if self.wonder_splays[player_id] >= WONDER_COLORS:
+            mask |= 1 << WONDER.index
+        if symbol_vector[CLOCK_INDEX] >= WORLD_CLOCKS:
+            mask |= 1 << WORLD.index
+        if self.universe_top_cards[player_id] >= UNIVERSE_TOP_CARDS:
+            mask |= 1 << UNIVERSE.index
+
+        self.automatic_masks[player_id] = mask
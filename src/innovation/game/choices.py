@@ -0,0 +1,79 @@
+from src.innovation.cards.cards import Card
+from itertools import combinations
+from math import comb
+from typing import Iterator, Sequence, Tuple
+
+Choice = Tuple[Card, ...]
+
+
+class CardChoices(Sequence[Choice]):
+    """
+    Every legal choice of between min_cards and max_cards of the given cards, without building them.
+
+    Choices are ordered by size, then lexicographically by position in cards, so with cards in
+    canonical order the n-th choice is the same in every process. Counting is O(1) and any choice
+    can be unranked directly, so choosers can sample or look at the first few choices of prompts
+    that allow exponentially many subsets.
+    """
+
+    def __init__(self, cards: Sequence[Card], min_cards: int, max_cards: int):
+        self.cards = tuple(cards)
+        num_cards = len(self.cards)
+        self.max_cards = min(max_cards, num_cards)
+        self.min_cards = min(min_cards, self.max_cards)
+        # Number of choices of each size, from min_cards to max_cards
+        self._counts = tuple(
+            comb(num_cards, size) for size in range(self.min_cards, self.max_cards + 1)
+        )
+        self._count = sum(self._counts)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Choice]:
+        for size in range(self.min_cards, self.max_cards + 1):
+            yield from combinations(self.cards, size)
+
+    def __getitem__(self, index: int) -> Choice:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("choice index out of range")
+
+        size = self.min_cards
+        for count in self._counts:
+            if index < count:
+                break
+            index -= count
+            size += 1
+
+        return self._unrank(index, size)
+
+    def _unrank(self, index: int, size: int) -> Choice:
+        # Walk the positions in order, skipping past every block of combinations starting lower
+        cards = self.cards
+        num_cards = len(cards)
+        choice = []
+        position = 0
+
+        while size:
+            count = comb(num_cards - position - 1, size - 1)
+            if index < count:
+                choice.append(cards[position])
+                size -= 1
+            else:
+                index -= count
+            position += 1
+
+        return tuple(choice)
+
+    @property
+    def is_forced(self) -> bool:
+        """Whether there is only a single legal choice."""
+        return self._count == 1
+
+    def __repr__(self) -> str:
+        return (
+            f"CardChoices({len(self.cards)} cards, {self.min_cards}..{self.max_cards}, "
+            f"{self._count} choices)"
+        )
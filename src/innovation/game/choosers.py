@@ -0,0 +1,91 @@
+from __future__ import annotations
+from src.innovation.cards.cards import Card, Color, SplayDirection
+from src.innovation.game.choices import CardChoices
+from src.innovation.players.players import Player
+from abc import ABC, abstractmethod
+from random import Random
+from typing import Any, List, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.innovation.game.game_loop import Action
+    from src.innovation.game.gamestate import GameState
+
+
+class Chooser(ABC):
+    """Makes every decision for one player: turn actions and the choices prompted by effects."""
+
+    @abstractmethod
+    def choose_action(
+        self, game_state: GameState, player: Player, actions: List[Action]
+    ) -> Action:
+        pass
+
+    @abstractmethod
+    def choose_cards(
+        self, game_state: GameState, player: Player, choices: CardChoices
+    ) -> Set[Card]:
+        pass
+
+    @abstractmethod
+    def choose_optional(self, game_state: GameState, player: Player, operation) -> bool:
+        pass
+
+    @abstractmethod
+    def choose_player(
+        self, game_state: GameState, player: Player, players: List[Player]
+    ) -> Player:
+        pass
+
+    @abstractmethod
+    def choose_splay(
+        self,
+        game_state: GameState,
+        player: Player,
+        options: List[Tuple[Color, SplayDirection]],
+    ) -> Tuple[Color, SplayDirection]:
+        pass
+
+
+class RandomChooser(Chooser):
+    """Chooses uniformly at random. Options are always offered in a canonical order, so a seeded
+    random chooser plays reproducibly."""
+
+    def __init__(self, rng: Random = None):
+        self.rng = rng if rng is not None else Random()
+
+    def _choice(self, options: List[Any]) -> Any:
+        return options[self.rng.randrange(len(options))]
+
+    def choose_action(self, game_state, player, actions):
+        return self._choice(actions)
+
+    def choose_cards(self, game_state, player, choices):
+        return set(self._choice(choices))
+
+    def choose_optional(self, game_state, player, operation):
+        return self.rng.random() < 0.5
+
+    def choose_player(self, game_state, player, players):
+        return self._choice(players)
+
+    def choose_splay(self, game_state, player, options):
+        return self._choice(options)
+
+
+class FirstChoiceChooser(Chooser):
+    """Always takes the first option offered, a deterministic baseline."""
+
+    def choose_action(self, game_state, player, actions):
+        return actions[0]
+
+    def choose_cards(self, game_state, player, choices):
+        return set(choices[0])
+
+    def choose_optional(self, game_state, player, operation):
+        return True
+
+    def choose_player(self, game_state, player, players):
+        return players[0]
+
+    def choose_splay(self, game_state, player, options):
+        return options[0]
@@ -0,0 +1,619 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import Achievement
+from src.innovation.cards.card_effects import (
+    Achieve,
+    Draw,
+    ExchangeCards,
+    Meld,
+    Opcode,
+    Optional,
+    Return,
+    Score,
+    Splay,
+    TransferCard,
+    Tuck,
+    build_dogma_table,
+    effect_building_blocks,
+)
+from src.innovation.cards.cards import Card, CardLocation, CardSet
+from src.innovation.game.choices import CardChoices
+from src.innovation.game.choosers import Chooser
+from src.innovation.game.gamestate import GameState
+from src.innovation.players.players import Player
+from dataclasses import dataclass, field
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Sequence, Set, Union
+
+# Work stack frame kinds. Frames are tuples whose first element is the kind, see
+# EffectInterpreter.run
+_BLOCK = 0
+_DOGMA = 1
+_CHECK_SHARED = 2
+_DEMAND = 3
+_CHAINED_DOGMA = 4
+_SHARE_BONUS = 5
+_REPLAY = 6
+
+# Number of achievements that wins the game, by number of players
+ACHIEVEMENTS_TO_WIN = {2: 6, 3: 5, 4: 4}
+
+get_index = attrgetter("index")
+
+
+class GameOver(Exception):
+    """Raised when the game ends, unwinding whatever effects were still in progress."""
+
+    def __init__(self, winner: Player = None):
+        super().__init__(winner)
+        # None when the game ended by drawing past the last deck, decided on score
+        self.winner = winner
+
+
+class DecisionType(Enum):
+    CARDS = 1
+    OPTIONAL = 2
+    PLAYER = 3
+    SPLAY = 4
+
+
+@dataclass
+class PendingDecision:
+    """A decision a suspended game is waiting on, answered through EffectInterpreter.resume."""
+
+    decision_type: DecisionType
+    player: Player
+    # CardChoices, the operation of an Optional, the players or the (color, direction) splays
+    # to choose from
+    options: Any
+    # Decisions already made by the suspended frame, replayed when it is resumed
+    answers: List[Any] = field(default_factory=list)
+
+
+class SuspendEffects(Exception):
+    def __init__(self, decision: PendingDecision):
+        super().__init__(decision)
+        self.decision = decision
+
+
+def ask_chooser(
+    chooser: Chooser,
+    game_state: GameState,
+    decision_type: DecisionType,
+    player: Player,
+    options: Any,
+) -> Any:
+    if decision_type == DecisionType.CARDS:
+        return chooser.choose_cards(game_state, player, options)
+    elif decision_type == DecisionType.OPTIONAL:
+        return chooser.choose_optional(game_state, player, options)
+    elif decision_type == DecisionType.PLAYER:
+        return chooser.choose_player(game_state, player, options)
+    else:
+        return chooser.choose_splay(game_state, player, options)
+
+
+@dataclass
+class DogmaActivation:
+    activating_player: Player
+    card: Card
+    # Whether an opponent sharing the dogma changed the game state
+    opponent_shared: bool = False
+
+
+def canonical_order(cards: Iterable[Card]) -> List[Card]:
+    if isinstance(cards, CardSet):
+        return list(cards)
+
+    return sorted(cards, key=get_index)
+
+
+class EffectInterpreter:
+    """
+    Resolves effect building blocks against a GameState.
+
+    Pending work is kept on an explicit stack of frames instead of the python call stack: a
+    building block to execute, a dogma or demand to evaluate for a player, or the bookkeeping of a
+    dogma activation (sharing, chained dogmas and the sharing bonus). Executing a block may push
+    the block returned by its on_completion, so whole effect trees resolve one frame at a time.
+    Every decision is delegated to the Chooser of the deciding player.
+
+    The stack lives on the GameState. Players without a Chooser (None) decide from outside: when
+    one of them has to decide, the frame deciding is put back on the stack, the game is suspended
+    with the decision recorded as game_state.pending_decision and run returns it. Since frames
+    only change the game state once all their decisions are made, resume simply executes the
+    frame again, replaying its earlier decisions followed by the new answer. A suspended game
+    can be serialized with GameState.to_bytes and resumed by an interpreter in another process.
+    """
+
+    def __init__(self, game_state: GameState, choosers: Sequence[Union[Chooser, None]]):
+        self.game_state = game_state
+        # Indexed by player id
+        self.choosers = choosers
+        self.players = sorted(game_state.players, key=attrgetter("id"))
+        if len(self.players) not in ACHIEVEMENTS_TO_WIN:
+            raise ValueError(
+                f"Games are played by {min(ACHIEVEMENTS_TO_WIN)} to "
+                f"{max(ACHIEVEMENTS_TO_WIN)} players, not {len(self.players)}"
+            )
+        self.achievements_to_win = ACHIEVEMENTS_TO_WIN[len(self.players)]
+        self._stack = game_state.pending_effects
+        # Decisions made by the frame being executed, and how many of them were replayed
+        self._answers = []
+        self._num_replayed = 0
+
+        self._frame_handlers = (
+            self._execute_block,
+            self._dogma,
+            self._check_shared,
+            self._demand,
+            self._chained_dogma,
+            self._share_bonus,
+            self._replay,
+        )
+        handlers_by_opcode = {
+            Opcode.DRAW: self._draw,
+            Opcode.RETURN: self._return,
+            Opcode.SCORE: self._score,
+            Opcode.MELD: self._meld,
+            Opcode.TUCK: self._tuck,
+            Opcode.ACHIEVE: self._achieve,
+            Opcode.SPLAY: self._splay,
+            Opcode.TRANSFER_CARD: self._transfer_card,
+            Opcode.EXCHANGE_CARDS: self._exchange_cards,
+            Opcode.OPTIONAL: self._optional,
+        }
+        # Indexed by the opcode of the block
+        self._block_handlers = tuple(
+            handlers_by_opcode[opcode] for opcode in sorted(handlers_by_opcode)
+        )
+
+    def run(self) -> Union[PendingDecision, None]:
+        """Resolve every pending frame. Returns the decision the game is suspended on, if any."""
+        stack = self._stack
+        frame_handlers = self._frame_handlers
+
+        try:
+            while stack:
+                frame = stack.pop()
+
+                try:
+                    frame_handlers[frame[0]](frame)
+                    self.claim_automatic_achievements()
+                except SuspendEffects as suspend:
+                    # Put back the frame itself, its decisions are kept on the pending decision
+                    stack.append(frame[1] if frame[0] == _REPLAY else frame)
+                    self.game_state.pending_decision = suspend.decision
+                    return suspend.decision
+                finally:
+                    self._answers = []
+                    self._num_replayed = 0
+        except GameOver:
+            stack.clear()
+            self.game_state.pending_decision = None
+            raise
+
+    def resume(self, answer: Any) -> Union[PendingDecision, None]:
+        """Answer the decision the game is suspended on and continue resolving effects."""
+        decision = self.game_state.pending_decision
+        if decision is None:
+            raise RuntimeError("The game is not waiting on a decision")
+
+        self.game_state.pending_decision = None
+        answers = decision.answers + [answer]
+
+        # The suspended frame replays its decisions, then the rest of the stack resolves as usual
+        frame = self._stack.pop()
+        self._stack.append((_REPLAY, frame, answers))
+        return self.run()
+
+    def execute(
+        self,
+        block: effect_building_blocks,
+        activating_player: Player,
+        target_player: Player = None,
+    ) -> Union[PendingDecision, None]:
+        """Resolve an effect tree. The target player executes it if given, else the activating player."""
+        self._check_not_suspended()
+        self._stack.append((_BLOCK, block, activating_player, target_player))
+        return self.run()
+
+    def activate_dogma(
+        self, activating_player: Player, card: Card
+    ) -> Union[PendingDecision, None]:
+        """Resolve every effect of a top card, including sharing, demands and the sharing bonus."""
+        self._check_not_suspended()
+        activation = DogmaActivation(activating_player, card)
+        num_players = len(self.players)
+        # Opponents in turn order, starting to the left of the activating player
+        opponents = [
+            self.players[(activating_player.id + offset) % num_players]
+            for offset in range(1, num_players)
+        ]
+        # Sharing and demands are decided on the symbol counts at activation time
+        symbol_vectors = {player: player.symbol_vector for player in self.players}
+        activating_vector = symbol_vectors[activating_player]
+        stack = self._stack
+
+        dogma_table = card.dogma_table
+        if dogma_table is None:
+            # Cards built outside the registry get their table on the fly
+            dogma_table = build_dogma_table(card.effects or ())
+
+        stack.append((_SHARE_BONUS, activation))
+
+        for is_demand, symbol_index, effect, chained_dogma in reversed(dogma_table):
+            symbol_count = activating_vector[symbol_index]
+
+            if is_demand:
+                demand_results = []
+                stack.append(
+                    (_CHAINED_DOGMA, chained_dogma, activating_player, demand_results)
+                )
+
+                for player in reversed(opponents):
+                    if symbol_vectors[player][symbol_index] < symbol_count:
+                        stack.append(
+                            (_DEMAND, effect, activating_player, player, demand_results)
+                        )
+            else:
+                stack.append((_DOGMA, effect, activating_player, activation))
+
+                for player in reversed(opponents):
+                    if symbol_vectors[player][symbol_index] >= symbol_count:
+                        stack.append((_DOGMA, effect, player, activation))
+
+        return self.run()
+
+    def draw_card(
+        self,
+        player: Player,
+        age: int,
+        card_destination: CardLocation = CardLocation.HAND,
+        tuck: bool = False,
+    ) -> Card:
+        card = self.game_state.draw(player, age, card_destination, tuck)
+        if card is None:
+            raise GameOver()
+
+        return card
+
+    def achieve(self, player: Player, achievement: Achievement):
+        if achievement not in self.game_state.unclaimed_achievements:
+            return
+
+        self.game_state.achieve(player, achievement)
+
+        if len(player.achievements) >= self.achievements_to_win:
+            raise GameOver(player)
+
+    def claim_automatic_achievements(self):
+        """Award every unclaimed automatic achievement whose condition a player meets, in player
+        order."""
+        game_state = self.game_state
+        if not game_state.achievement_tracker.any_automatic(
+            game_state.unclaimed_achievements
+        ):
+            return
+
+        for player in self.players:
+            for achievement in game_state.automatic_achievements(player):
+                self.achieve(player, achievement)
+
+    def _check_not_suspended(self):
+        if self.game_state.is_suspended:
+            raise RuntimeError("The game is waiting on a decision, see resume")
+
+    # Decisions
+
+    def _decide(self, decision_type: DecisionType, player: Player, options: Any) -> Any:
+        answers = self._answers
+
+        if self._num_replayed < len(answers):
+            answer = answers[self._num_replayed]
+        else:
+            chooser = self.choosers[player.id]
+            if chooser is None:
+                raise SuspendEffects(
+                    PendingDecision(decision_type, player, options, list(answers))
+                )
+
+            answer = ask_chooser(
+                chooser, self.game_state, decision_type, player, options
+            )
+            answers.append(answer)
+
+        self._num_replayed += 1
+        return answer
+
+    # Frame handlers
+
+    def _replay(self, frame: tuple):
+        _, replayed_frame, answers = frame
+
+        self._answers = answers
+        self._frame_handlers[replayed_frame[0]](replayed_frame)
+
+    def _execute_block(self, frame: tuple):
+        _, block, activating_player, target_player = frame
+
+        if block is not None:
+            self._block_handlers[block.opcode](block, activating_player, target_player)
+
+    def _dogma(self, frame: tuple):
+        _, effect, player, activation = frame
+
+        if player is not activation.activating_player:
+            self._stack.append(
+                (_CHECK_SHARED, activation, self.game_state.zobrist_hash)
+            )
+
+        block = effect(self.game_state, player)
+        self._stack.append((_BLOCK, block, player, None))
+
+    def _check_shared(self, frame: tuple):
+        _, activation, zobrist_hash = frame
+
+        if self.game_state.zobrist_hash != zobrist_hash:
+            activation.opponent_shared = True
+
+    def _demand(self, frame: tuple):
+        _, effect, activating_player, target_player, demand_results = frame
+
+        block = effect(self.game_state, activating_player, target_player)
+        demand_results.append(block)
+        self._stack.append((_BLOCK, block, activating_player, target_player))
+
+    def _chained_dogma(self, frame: tuple):
+        _, chained_dogma, activating_player, demand_results = frame
+
+        block = chained_dogma(self.game_state, activating_player, demand_results)
+        self._stack.append((_BLOCK, block, activating_player, None))
+
+    def _share_bonus(self, frame: tuple):
+        _, activation = frame
+        activating_player = activation.activating_player
+
+        if activation.opponent_shared:
+            self.draw_card(activating_player, activating_player.max_age_top_card)
+
+    # Building block handlers
+
+    def _on_completion(
+        self,
+        on_completion: Callable[[Set[Card]], effect_building_blocks],
+        cards: Set[Card],
+        activating_player: Player,
+        target_player: Player,
+    ):
+        # Follow-up effects only happen if the effect did something
+        if on_completion is not None and cards:
+            self._stack.append(
+                (_BLOCK, on_completion(cards), activating_player, target_player)
+            )
+
+    def _choose_cards(
+        self, player: Player, cards: Iterable[Card], min_cards: int, max_cards: int
+    ) -> Set[Card]:
+        num_cards = len(cards)
+
+        # Nothing to choose, skip building the choices
+        if max_cards <= 0 or num_cards == 0:
+            return set()
+        if min_cards >= num_cards:
+            return set(cards)
+
+        choices = CardChoices(canonical_order(cards), min_cards, max_cards)
+        if choices.is_forced:
+            return set(choices[0])
+
+        return self._decide(DecisionType.CARDS, player, choices)
+
+    def _choose_player(self, player: Player, players: Iterable[Player]) -> Player:
+        if len(players) == 1:
+            return next(iter(players))
+
+        return self._decide(
+            DecisionType.PLAYER, player, sorted(players, key=attrgetter("id"))
+        )
+
+    def _draw(self, block: Draw, activating_player: Player, target_player: Player):
+        player = block.target_player
+        draw_location = block.draw_location
+        repeat_effect = block.repeat_effect
+        level = block.level
+        drawn_cards = set()
+
+        for _ in range(block.num_cards):
+            while True:
+                age = player.max_age_top_card if level is None else level
+                card = self.game_state.peek_draw(age)
+                if card is None:
+                    raise GameOver()
+
+                self.draw_card(player, age, draw_location((card,)), block.tuck)
+                drawn_cards.add(card)
+
+                if repeat_effect is None or not repeat_effect((card,)):
+                    break
+
+        self._on_completion(
+            block.on_completion, drawn_cards, activating_player, target_player
+        )
+
+    def _return(self, block: Return, activating_player: Player, target_player: Player):
+        player = target_player or activating_player
+        cards = self._choose_cards(
+            player,
+            block.allowed_cards(self.game_state, activating_player, target_player),
+            block.min_cards,
+            block.max_cards,
+        )
+
+        for card in cards:
+            self.game_state.transfer_card(
+                player, player, card, block.card_location, block.card_destination
+            )
+
+        self._on_completion(
+            block.on_completion, cards, activating_player, target_player
+        )
+
+    def _score(self, block: Score, activating_player: Player, target_player: Player):
+        player = target_player or activating_player
+        cards = self._choose_cards(
+            player,
+            block.allowed_cards(self.game_state, activating_player, target_player),
+            block.min_cards,
+            block.max_cards,
+        )
+
+        for card in cards:
+            self.game_state.score(player, card, block.card_location)
+
+        self._on_completion(
+            block.on_completion, cards, activating_player, target_player
+        )
+
+    def _meld(self, block: Meld, activating_player: Player, target_player: Player):
+        player = target_player or activating_player
+        cards = self._choose_cards(
+            player,
+            block.allowed_cards(self.game_state, activating_player, target_player),
+            block.min_cards,
+            block.max_cards,
+        )
+
+        for card in cards:
+            self.game_state.meld(player, card, block.card_location)
+
+        self._on_completion(
+            block.on_completion, cards, activating_player, target_player
+        )
+
+    def _tuck(self, block: Tuck, activating_player: Player, target_player: Player):
+        player = target_player or activating_player
+        cards = self._choose_cards(
+            player,
+            block.allowed_cards(self.game_state, activating_player, target_player),
+            block.min_cards,
+            block.max_cards,
+        )
+
+        for card in cards:
+            self.game_state.tuck(player, card)
+
+        self._on_completion(
+            block.on_completion, cards, activating_player, target_player
+        )
+
+    def _achieve(
+        self, block: Achieve, activating_player: Player, target_player: Player
+    ):
+        self.achieve(target_player or activating_player, block.achievement)
+
+    def _splay(self, block: Splay, activating_player: Player, target_player: Player):
+        player = block.target_player
+        board = player.board
+        options = [
+            (color, splay_direction)
+            for color in sorted(block.allowed_colors, key=attrgetter("value"))
+            if color in board and board[color].can_splay
+            for splay_direction in sorted(
+                block.allowed_directions, key=attrgetter("value")
+            )
+            if board[color].splay != splay_direction
+        ]
+
+        if not options:
+            return
+
+        color, splay_direction = (
+            options[0]
+            if len(options) == 1
+            else self._decide(DecisionType.SPLAY, player, options)
+        )
+        self.game_state.splay(player, color, splay_direction)
+
+    def _transfer_card(
+        self, block: TransferCard, activating_player: Player, target_player: Player
+    ):
+        giving_player = block.giving_player
+        if not block.allowed_receiving_players:
+            return
+
+        receiving_player = self._choose_player(
+            giving_player, block.allowed_receiving_players
+        )
+        cards = self._choose_cards(
+            giving_player,
+            block.allowed_cards(self.game_state, activating_player, target_player),
+            block.num_cards,
+            block.num_cards,
+        )
+
+        for card in cards:
+            self.game_state.transfer_card(
+                giving_player,
+                receiving_player,
+                card,
+                block.card_location,
+                block.card_destination,
+            )
+
+        self._on_completion(
+            block.on_completion, cards, activating_player, target_player
+        )
+
+    def _exchange_cards(
+        self, block: ExchangeCards, activating_player: Player, target_player: Player
+    ):
+        player = target_player or activating_player
+        giving_player = self._choose_player(player, block.allowed_giving_player)
+        receiving_player = self._choose_player(player, block.allowed_receiving_player)
+
+        # Both sides are chosen before anything moves
+        giving_cards = self._choose_cards(
+            giving_player,
+            block.allowed_giving_cards(
+                self.game_state, giving_player, receiving_player
+            ),
+            block.num_cards_giving,
+            block.num_cards_giving,
+        )
+        receiving_cards = self._choose_cards(
+            receiving_player,
+            block.allowed_receiving_cards(
+                self.game_state, giving_player, receiving_player
+            ),
+            block.num_cards_receiving,
+            block.num_cards_receiving,
+        )
+
+        for card in giving_cards:
+            self.game_state.transfer_card(
+                giving_player,
+                receiving_player,
+                card,
+                block.giving_location,
+                block.receiving_location,
+            )
+
+        for card in receiving_cards:
+            self.game_state.transfer_card(
+                receiving_player,
+                giving_player,
+                card,
+                block.receiving_location,
+                block.giving_location,
+            )
+
+    def _optional(
+        self, block: Optional, activating_player: Player, target_player: Player
+    ):
+        player = target_player or activating_player
+
+        if self._decide(DecisionType.OPTIONAL, player, block.operation):
+            self._stack.append(
+                (_BLOCK, block.operation, activating_player, target_player)
+            )
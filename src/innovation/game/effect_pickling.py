@@ -0,0 +1,61 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import Achievement, AchievementSet
+from src.innovation.cards.cards import Card, CardSet
+from src.innovation.players.players import Player
+from io import BytesIO
+from typing import TYPE_CHECKING
+import pickle
+
+if TYPE_CHECKING:
+    from src.innovation.game.gamestate import GameState
+
+# Pickling of in-flight effects: building blocks, the Rules they hold and interpreter frames.
+#
+# Effects refer to live game objects. Those are written as persistent ids instead of copies:
+# players by id, and registered cards and achievements by registry index. Loading resolves them
+# against the game state the effects are resumed on, so the pickles stay small and the loaded
+# effects act on that game state's players.
+
+_PLAYER = 0
+_CARD = 1
+_ACHIEVEMENT = 2
+
+
+class EffectPickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        if isinstance(obj, Player):
+            return _PLAYER, obj.id
+        if isinstance(obj, Card) and obj.index is not None:
+            return _CARD, obj.index
+        if isinstance(obj, Achievement) and obj.index is not None:
+            return _ACHIEVEMENT, obj.index
+
+        return None
+
+
+class EffectUnpickler(pickle.Unpickler):
+    def __init__(self, file, game_state: GameState):
+        super().__init__(file)
+        self.players = {player.id: player for player in game_state.players}
+
+    def persistent_load(self, pid):
+        kind, key = pid
+
+        if kind == _PLAYER:
+            return self.players[key]
+        if kind == _CARD:
+            return CardSet.members[key]
+        if kind == _ACHIEVEMENT:
+            return AchievementSet.members[key]
+
+        raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+
+
+def dumps_effects(effects) -> bytes:
+    buffer = BytesIO()
+    EffectPickler(buffer, pickle.HIGHEST_PROTOCOL).dump(effects)
+    return buffer.getvalue()
+
+
+def loads_effects(data: bytes, game_state: GameState):
+    return EffectUnpickler(BytesIO(data), game_state).load()
@@ -0,0 +1,194 @@
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.cards import CardSet, CardStack, Color, SplayDirection
+from src.innovation.players.players import Player
+from src.innovation.utils.indexed_set import IndexedSet
+from src.innovation.utils.rng import RngStream
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+from random import Random
+from typing import Deque, Dict, Iterable, Tuple, Type
+import pickle
+import struct
+
+# Compact binary encoding of game state zones.
+#
+# Cards and achievements are identified by their registry index, so the encoding only depends on
+# the shared registries. Unordered zones (hands, score piles, achievements) are written as their
+# little endian bitmask over the registry, a fixed number of bytes that decodes straight into the
+# mask of a CardSet or AchievementSet. Ordered zones are a one byte count followed by one byte
+# indices, bottom to top. A board stack is preceded by its splay direction, with 0 marking a
+# color the player has no stack for.
+#
+# The header holds the format version, the number of draw decks and players, and the Zobrist
+# hash, which would otherwise have to be recomputed from scratch on every decode. It is followed
+# by the ages of the draw decks, their sizes and then all of their cards, and by the mask of the
+# unclaimed achievements. Every player is followed by the number of cards they tucked and scored
+# this turn, see game.achievement_tracker.
+#
+# The players are followed by the random stream of the game: a one byte kind, then for an
+# RngStream its path and state (see utils.rng), and for any other Random its pickle. Path keys
+# can be any int, such as a negative master seed, so each is a one byte length followed by the
+# key as a signed little endian int.
+#
+# A game suspended in the middle of an effect is followed by its pending effects and decision,
+# pickled by game.effect_pickling. Anything after the random stream is that section.
+
+FORMAT_VERSION = 6
+HEADER = struct.Struct("<BBBQ")
+TURN_COUNTS = struct.Struct("<HH")
+NO_RNG = 0
+RNG_STREAM = 1
+PICKLED_RNG = 2
+# Key, counter, whether there is a cached gauss value and that value
+RNG_STATE = struct.Struct("<QQ?d")
+PICKLE_LENGTH = struct.Struct("<I")
+NO_STACK = 0
+# Indexed by splay value, NO_STACK is never looked up
+SPLAY_DIRECTIONS = (None, *SplayDirection)
+COLORS = tuple(Color)
+
+get_index = attrgetter("index")
+get_id = attrgetter("id")
+
+
+def write_indices(buffer: bytearray, members: Iterable) -> None:
+    indices = bytes(map(get_index, members))
+    buffer.append(len(indices))
+    buffer += indices
+
+
+def read_indices(data: memoryview, offset: int) -> Tuple[memoryview, int]:
+    end = offset + 1 + data[offset]
+    return data[offset + 1 : end], end
+
+
+def zone_mask(members: Iterable, set_type: Type[IndexedSet]) -> int:
+    return members.mask if isinstance(members, set_type) else set_type(members).mask
+
+
+def write_draw_decks(buffer: bytearray, draw_decks: Dict[int, Deque]) -> None:
+    buffer += bytes(draw_decks)
+    buffer += bytes(map(len, draw_decks.values()))
+    buffer += bytes(map(get_index, chain.from_iterable(draw_decks.values())))
+
+
+def read_draw_decks(
+    data: memoryview, offset: int, num_decks: int
+) -> Tuple[Dict[int, Deque], int]:
+    get_card = CardSet.members.__getitem__
+    ages = data[offset : offset + num_decks]
+    sizes = data[offset + num_decks : offset + 2 * num_decks]
+    offset += 2 * num_decks
+    draw_decks = {}
+
+    for age, size in zip(ages, sizes):
+        if size:
+            draw_decks[age] = deque(map(get_card, data[offset : offset + size]))
+            offset += size
+        else:
+            draw_decks[age] = deque()
+
+    return draw_decks, offset
+
+
+def encode_player(buffer: bytearray, player: Player) -> None:
+    # The hand, score pile and achievement masks are written as one little endian int
+    card_mask_bits = 8 * CardSet.mask_num_bytes
+    buffer.append(player.id)
+    buffer += (
+        zone_mask(player.hand, CardSet)
+        | zone_mask(player.score_pile, CardSet) << card_mask_bits
+        | zone_mask(player.achievements, AchievementSet) << 2 * card_mask_bits
+    ).to_bytes(2 * CardSet.mask_num_bytes + AchievementSet.mask_num_bytes, "little")
+    # In color order. Color values run from 1, and _value_ skips the enum property lookup.
+    stacks = [None] * len(COLORS)
+    for color, card_stack in player.board.items():
+        stacks[color._value_ - 1] = card_stack
+
+    for card_stack in stacks:
+        if card_stack is None:
+            buffer.append(NO_STACK)
+        else:
+            buffer.append(card_stack.splay._value_)
+            write_indices(buffer, card_stack.stack)
+
+
+def decode_player(data: memoryview, offset: int) -> Tuple[Player, int]:
+    get_card = CardSet.members.__getitem__
+    card_mask_bits = 8 * CardSet.mask_num_bytes
+    card_mask = (1 << card_mask_bits) - 1
+    player_id = data[offset]
+    board_start = (
+        offset + 1 + 2 * CardSet.mask_num_bytes + AchievementSet.mask_num_bytes
+    )
+    masks = int.from_bytes(data[offset + 1 : board_start], "little")
+    offset = board_start
+    board = {}
+
+    for color in COLORS:
+        splay = data[offset]
+        if splay == NO_STACK:
+            offset += 1
+        else:
+            size = data[offset + 1]
+            offset += 2
+            board[color] = CardStack(
+                deque(map(get_card, data[offset : offset + size])),
+                SPLAY_DIRECTIONS[splay],
+            )
+            offset += size
+
+    player = Player.from_zones(
+        player_id,
+        board,
+        CardSet.from_mask(masks & card_mask),
+        CardSet.from_mask(masks >> card_mask_bits & card_mask),
+        AchievementSet.from_mask(masks >> 2 * card_mask_bits),
+    )
+    return player, offset
+
+
+def write_rng(buffer: bytearray, rng: Random) -> None:
+    if rng is None:
+        buffer.append(NO_RNG)
+    elif type(rng) is RngStream:
+        key, counter, gauss_next = rng.getstate()
+        buffer.append(RNG_STREAM)
+        buffer.append(len(rng.path))
+        for path_key in rng.path:
+            encoded = path_key.to_bytes(
+                path_key.bit_length() // 8 + 1, "little", signed=True
+            )
+            buffer.append(len(encoded))
+            buffer += encoded
+        buffer += RNG_STATE.pack(key, counter, gauss_next is not None, gauss_next or 0)
+    else:
+        pickled = pickle.dumps(rng, pickle.HIGHEST_PROTOCOL)
+        buffer.append(PICKLED_RNG)
+        buffer += PICKLE_LENGTH.pack(len(pickled))
+        buffer += pickled
+
+
+def read_rng(data: memoryview, offset: int) -> Tuple[Random, int]:
+    kind = data[offset]
+    offset += 1
+
+    if kind == NO_RNG:
+        return None, offset
+
+    if kind == RNG_STREAM:
+        path = []
+        offset += 1
+        for _ in range(data[offset - 1]):
+            end = offset + 1 + data[offset]
+            path.append(int.from_bytes(data[offset + 1 : end], "little", signed=True))
+            offset = end
+        path = tuple(path)
+        key, counter, has_gauss, gauss_next = RNG_STATE.unpack_from(data, offset)
+        rng = RngStream.restore(path, (key, counter, gauss_next if has_gauss else None))
+        return rng, offset + RNG_STATE.size
+
+    (length,) = PICKLE_LENGTH.unpack_from(data, offset)
+    offset += PICKLE_LENGTH.size
+    return pickle.loads(data[offset : offset + length]), offset + length
@@ -0,0 +1,128 @@
+from src.innovation.cards.achievements import Achievement
+from src.innovation.cards.cards import Card
+from src.innovation.game.choosers import Chooser
+from src.innovation.game.effect_interpreter import (
+    EffectInterpreter,
+    GameOver,
+    PendingDecision,
+)
+from src.innovation.game.gamestate import GameState
+from src.innovation.players.players import Player
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Sequence, Tuple, Union
+
+# Ends games that are still running after this many turns, decided on score
+MAX_TURNS = 1000
+
+
+class ActionType(Enum):
+    DRAW = 1
+    MELD = 2
+    ACHIEVE = 3
+    DOGMA = 4
+
+
+@dataclass(frozen=True)
+class Action:
+    action_type: ActionType
+    card: Card = None
+    achievement: Achievement = None
+
+
+DRAW_ACTION = Action(ActionType.DRAW)
+
+
+@dataclass(frozen=True)
+class GameResult:
+    # None if the game ended in a tie
+    winner: int
+    # Indexed by player id
+    scores: Tuple[int, ...]
+    num_turns: int
+    achievement_victory: bool
+
+
+def legal_actions(game_state: GameState, player: Player) -> List[Action]:
+    actions = [DRAW_ACTION]
+    actions.extend(Action(ActionType.MELD, card=card) for card in player.hand)
+    actions.extend(
+        Action(ActionType.ACHIEVE, achievement=achievement)
+        for achievement in game_state.claimable_achievements(player)
+    )
+    actions.extend(
+        Action(ActionType.DOGMA, card=card) for card in player.top_cards if card.effects
+    )
+
+    return actions
+
+
+def perform_action(
+    interpreter: EffectInterpreter, player: Player, action: Action
+) -> Union[PendingDecision, None]:
+    """Returns the decision the game is suspended on if a player without a chooser must decide."""
+    action_type = action.action_type
+
+    if action_type == ActionType.DRAW:
+        interpreter.draw_card(player, player.max_age_top_card)
+    elif action_type == ActionType.MELD:
+        interpreter.game_state.meld(player, action.card)
+        interpreter.claim_automatic_achievements()
+    elif action_type == ActionType.ACHIEVE:
+        interpreter.achieve(player, action.achievement)
+    else:
+        return interpreter.activate_dogma(player, action.card)
+
+
+def decide_winner(players: Sequence[Player]) -> int:
+    """The player with the highest score wins, ties are broken by the number of achievements."""
+
+    def ranking(player: Player) -> Tuple[int, int]:
+        return player.score, len(player.achievements)
+
+    best = max(ranking(player) for player in players)
+    winners = [player for player in players if ranking(player) == best]
+
+    return winners[0].id if len(winners) == 1 else None
+
+
+def play_game(
+    game_state: GameState, choosers: Sequence[Chooser], max_turns: int = MAX_TURNS
+) -> GameResult:
+    """Play a game to completion, with choosers (indexed by player id) making every decision."""
+    interpreter = EffectInterpreter(game_state, choosers)
+    players = interpreter.players
+    winner = None
+    achievement_victory = False
+    num_turns = 0
+
+    try:
+        for turn in range(max_turns):
+            num_turns = turn + 1
+            player = players[turn % len(players)]
+            chooser = choosers[player.id]
+            game_state.start_turn()
+            # The first player only gets a single action on their first turn
+            num_actions = 1 if turn == 0 else 2
+
+            for _ in range(num_actions):
+                actions = legal_actions(game_state, player)
+                perform_action(
+                    interpreter,
+                    player,
+                    chooser.choose_action(game_state, player, actions),
+                )
+    except GameOver as game_over:
+        if game_over.winner is not None:
+            winner = game_over.winner.id
+            achievement_victory = True
+
+    if not achievement_victory:
+        winner = decide_winner(players)
+
+    return GameResult(
+        winner,
+        tuple(player.score for player in players),
+        num_turns,
+        achievement_victory,
+    )
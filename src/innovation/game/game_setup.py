@@ -1,34 +1,221 @@
 from src.innovation.cards.achievement_registry import GLOBAL_ACHIEVEMENTS_REGISTRY
+from src.innovation.cards.achievements import AchievementSet
 from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
-from src.innovation.cards.cards import Card
+from src.innovation.cards.cards import Card, CardLocation, CardSet, MAX_AGE
 from src.innovation.players.players import Player
 from src.innovation.game.gamestate import GameState
+from src.innovation.game.zobrist import SHARED, check_player_ids, zobrist_keys
+from src.innovation.utils.rng import (
+    GOLDEN_GAMMA,
+    MASK_64,
+    RngStream,
+    derive_seed,
+    splitmix64,
+)
 from collections import deque
-from random import shuffle
-from typing import Dict, Deque
+from collections.abc import Sequence
+from functools import lru_cache
+from random import Random
+from typing import Dict, Deque, List, Tuple, Union
+import random
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
 
-def initialize_gamestate(num_players: int) -> GameState:
-    draw_decks = initialize_draw_decks()
-    unclaimed_achievements = set(GLOBAL_ACHIEVEMENTS_REGISTRY.registry.values())
+# Cards dealt to every player's hand from the age 1 deck
+STARTING_HAND_SIZE = 2
+
+
+def initialize_gamestate(num_players: int, rng: Random = None) -> GameState:
+    """Set up a game shuffled by rng, which the game state keeps. Without one, the game gets its
+    own stream seeded from the module level random."""
+    if rng is None:
+        rng = RngStream(random.getrandbits(64))
+
+    draw_decks = initialize_draw_decks(rng)
+    unclaimed_achievements = AchievementSet(
+        GLOBAL_ACHIEVEMENTS_REGISTRY.registry.values()
+    )
     players = {
-        Player({}, {draw_decks[1].pop(), draw_decks[1].pop()}, set(), set())
-        for _ in range(num_players)
+        Player(
+            player_id,
+            {},
+            CardSet([draw_decks[1].pop(), draw_decks[1].pop()]),
+            CardSet(),
+            AchievementSet(),
+        )
+        for player_id in range(num_players)
     }
 
-    game_state = GameState(draw_decks, unclaimed_achievements, players)
+    game_state = GameState(draw_decks, unclaimed_achievements, players, rng=rng)
 
     return game_state
 
 
-def initialize_draw_decks() -> Dict[int, Deque[Card]]:
+@lru_cache(maxsize=None)
+def cards_by_age() -> Dict[int, Tuple[Card, ...]]:
+    """The registered cards of every age, in registry order."""
     cards = GLOBAL_CARD_REGISTRY.registry.values()
+    return {
+        age: tuple(card for card in cards if card.age == age)
+        for age in range(1, MAX_AGE + 1)
+    }
+
+
+def initialize_draw_decks(rng: Random) -> Dict[int, Deque[Card]]:
     draw_decks = {}
 
-    for age in range(1, 10):
-        cards_in_age = [card for card in cards if card.age == age]
-        shuffle(cards_in_age)
+    for age, cards in cards_by_age().items():
+        cards_in_age = list(cards)
+        rng.shuffle(cards_in_age)
 
         draw_decks[age] = deque(cards_in_age)
 
     return draw_decks
+
+
+# Batch setup.
+#
+# The decks of a batch are shuffled all at once: every card of every game gets a 64 bit sort key,
+# a splitmix64 hash of the game's seed and the card's index, and each deck is its cards sorted by
+# key. Keys are computed for the whole batch with NumPy when it is available (a pure python
+# fallback gives the same decks), and a game only depends on the master seed and its game index.
+
+
+def _deck_permutations_python(
+    game_seeds: List[int], card_indices: Tuple[int, ...]
+) -> List[List[int]]:
+    permutations = []
+
+    for game_seed in game_seeds:
+        keys = [
+            splitmix64(game_seed + (card_index + 1) * GOLDEN_GAMMA & MASK_64)
+            for card_index in card_indices
+        ]
+        permutations.append(sorted(range(len(keys)), key=keys.__getitem__))
+
+    return permutations
+
+
+def _deck_permutations_numpy(
+    game_seeds: List[int], card_indices: Tuple[int, ...]
+) -> List[List[int]]:
+    gamma = np.uint64(GOLDEN_GAMMA)
+    offsets = (np.array(card_indices, dtype=np.uint64) + np.uint64(1)) * gamma
+    values = np.array(game_seeds, dtype=np.uint64)[:, None] + offsets[None, :]
+
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    keys = values ^ (values >> np.uint64(31))
+
+    return np.argsort(keys, axis=1, kind="stable").tolist()
+
+
+def deck_permutations(
+    game_seeds: List[int], cards: Tuple[Card, ...]
+) -> List[List[int]]:
+    """For every game, the order of the given cards in its deck, bottom to top."""
+    card_indices = tuple(card.index for card in cards)
+
+    if not card_indices:
+        return [[] for _ in game_seeds]
+    if np is not None:
+        return _deck_permutations_numpy(game_seeds, card_indices)
+
+    return _deck_permutations_python(game_seeds, card_indices)
+
+
+@lru_cache(maxsize=None)
+def _initial_zobrist_hash() -> int:
+    # Every card in the draw decks and every achievement unclaimed, nothing dealt yet
+    keys = zobrist_keys()
+    zobrist_hash = 0
+
+    for card in CardSet.members:
+        zobrist_hash ^= keys.card_key(card.index, CardLocation.DECK, SHARED)
+    for achievement in AchievementSet.members:
+        zobrist_hash ^= keys.achievement_keys[SHARED][achievement.index]
+
+    return zobrist_hash
+
+
+class GameStateBatch(Sequence):
+    """
+    Freshly set up games, materialized on access. Every access builds a new GameState.
+
+    Game i of the batch is game first_game_index + i of the master seed, so any game of a batch
+    can be set up again on its own with initialize_gamestates(1, num_players, seed, index).
+    """
+
+    def __init__(
+        self, num_games: int, num_players: int, seed: int, first_game_index: int
+    ):
+        check_player_ids(range(num_players))
+        self.num_players = num_players
+        self.seed = seed
+        self.game_indices = range(first_game_index, first_game_index + num_games)
+
+        game_seeds = [derive_seed(seed, game_index) for game_index in self.game_indices]
+        self._decks = {
+            age: (cards, deck_permutations(game_seeds, cards))
+            for age, cards in cards_by_age().items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.game_indices)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[GameState, List[GameState]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        game_index = self.game_indices[index]
+        if index < 0:
+            index += len(self)
+
+        draw_decks = {
+            age: deque(map(cards.__getitem__, permutations[index]))
+            for age, (cards, permutations) in self._decks.items()
+        }
+
+        keys = zobrist_keys()
+        deck_keys = keys.card_keys[(CardLocation.DECK, SHARED)]
+        zobrist_hash = _initial_zobrist_hash()
+        players = set()
+
+        for player_id in range(self.num_players):
+            hand_keys = keys.card_keys[(CardLocation.HAND, player_id)]
+            hand_mask = 0
+
+            for _ in range(STARTING_HAND_SIZE):
+                card_index = draw_decks[1].pop().index
+                hand_mask |= 1 << card_index
+                zobrist_hash ^= deck_keys[card_index] ^ hand_keys[card_index]
+
+            players.add(
+                Player(
+                    player_id,
+                    {},
+                    CardSet.from_mask(hand_mask),
+                    CardSet(),
+                    AchievementSet(),
+                )
+            )
+
+        return GameState(
+            draw_decks,
+            AchievementSet.from_mask((1 << len(AchievementSet.members)) - 1),
+            players,
+            zobrist_hash,
+            rng=RngStream(self.seed, game_index),
+        )
+
+
+def initialize_gamestates(
+    num_games: int, num_players: int, seed: int = 0, first_game_index: int = 0
+) -> GameStateBatch:
+    """Set up num_games games at once, see GameStateBatch."""
+    return GameStateBatch(num_games, num_players, seed, first_game_index)
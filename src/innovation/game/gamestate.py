@@ -1,8 +1,34 @@
-from src.innovation.cards.achievements import Achievement
-from src.innovation.cards.cards import Card
+from __future__ import annotations
+from src.innovation.cards.achievements import Achievement, AchievementSet
+from src.innovation.cards.cards import (
+    Card,
+    CardLocation,
+    CardSet,
+    CardStack,
+    Color,
+    SplayDirection,
+)
+from src.innovation.game import effect_pickling, encoding
+from src.innovation.game.achievement_tracker import AchievementTracker
+from src.innovation.game.zobrist import (
+    SHARED,
+    check_player_ids,
+    compute_zobrist_hash,
+    zobrist_keys,
+)
 from src.innovation.players.players import Player
-from dataclasses import dataclass
-from typing import Deque, Dict, Set
+from collections import deque
+from copy import copy
+from dataclasses import dataclass, field
+from random import Random
+from typing import Any, Deque, Dict, List, Set
+
+# Undo journal entry kinds, see GameState.rollback
+_ADD_CARD = 0
+_REMOVE_CARD = 1
+_SPLAY = 2
+_ACHIEVE = 3
+_START_TURN = 4
 
 
 @dataclass
@@ -10,3 +36,476 @@ class GameState:
     draw_decks: Dict[int, Deque[Card]]
     unclaimed_achievements: Set[Achievement]
     players: Set[Player]
+    # Incrementally maintained by the primitives below, see game.zobrist
+    zobrist_hash: int = field(default=None, repr=False, compare=False)
+    # Bit age is set while the draw deck of that age has cards. Maintained by the primitives below.
+    nonempty_decks: int = field(default=0, init=False, repr=False, compare=False)
+    # Source of every random event of the game, such as shuffles
+    rng: Random = field(default=None, repr=False, compare=False)
+    # Achievement eligibility of every player, maintained by the primitives below
+    achievement_tracker: AchievementTracker = field(
+        default=None, repr=False, compare=False
+    )
+    # Work stack of the EffectInterpreter, effects still to resolve in a game suspended mid-effect
+    pending_effects: List[tuple] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # The PendingDecision the pending effects are waiting on
+    pending_decision: Any = field(default=None, init=False, repr=False, compare=False)
+    # Undo journal of the primitives applied since the first mark, None while not journaling
+    _journal: List[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.zobrist_hash is None:
+            # Forks and decoded states carry the hash of a state that was checked already
+            check_player_ids(player.id for player in self.players)
+
+        self.unclaimed_achievements = AchievementSet.coerce(self.unclaimed_achievements)
+        if self.achievement_tracker is None:
+            self.achievement_tracker = AchievementTracker(self.players)
+
+        if self.zobrist_hash is None:
+            self.zobrist_hash = compute_zobrist_hash(self)
+
+        for age, draw_deck in self.draw_decks.items():
+            if draw_deck:
+                self.nonempty_decks |= 1 << age
+
+    @property
+    def is_suspended(self) -> bool:
+        """Whether the game is waiting on a decision in the middle of resolving effects."""
+        return self.pending_decision is not None
+
+    def fork(self) -> GameState:
+        # The card catalog is immutable and shared, only the mutable containers are copied
+        forked = GameState(
+            {age: deque(draw_deck) for age, draw_deck in self.draw_decks.items()},
+            self.unclaimed_achievements.copy(),
+            {player.fork() for player in self.players},
+            self.zobrist_hash,
+            copy(self.rng),
+            self.achievement_tracker.copy(),
+        )
+
+        if self.is_suspended:
+            # Pending effects refer to players, rebind them to the forked ones
+            forked._load_pending(self._dump_pending())
+
+        return forked
+
+    def _dump_pending(self) -> bytes:
+        return effect_pickling.dumps_effects(
+            (self.pending_effects, self.pending_decision)
+        )
+
+    def _load_pending(self, data: bytes):
+        pending_effects, self.pending_decision = effect_pickling.loads_effects(
+            data, self
+        )
+        self.pending_effects[:] = pending_effects
+
+    def to_bytes(self) -> bytes:
+        """Encode the state compactly as registry indices, see game.encoding."""
+        buffer = bytearray(
+            encoding.HEADER.pack(
+                encoding.FORMAT_VERSION,
+                len(self.draw_decks),
+                len(self.players),
+                self.zobrist_hash,
+            )
+        )
+
+        encoding.write_draw_decks(buffer, self.draw_decks)
+        buffer += encoding.zone_mask(
+            self.unclaimed_achievements, AchievementSet
+        ).to_bytes(AchievementSet.mask_num_bytes, "little")
+
+        for player in sorted(self.players, key=encoding.get_id):
+            encoding.encode_player(buffer, player)
+            buffer += encoding.TURN_COUNTS.pack(
+                *self.achievement_tracker.turn_counts(player.id)
+            )
+
+        encoding.write_rng(buffer, self.rng)
+
+        if self.is_suspended:
+            buffer += self._dump_pending()
+
+        return bytes(buffer)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> GameState:
+        data = memoryview(data)
+        version, num_decks, num_players, zobrist_hash = encoding.HEADER.unpack_from(
+            data
+        )
+        if version != encoding.FORMAT_VERSION:
+            raise ValueError(f"Unsupported game state encoding version {version}")
+
+        draw_decks, offset = encoding.read_draw_decks(
+            data, encoding.HEADER.size, num_decks
+        )
+        achievements_end = offset + AchievementSet.mask_num_bytes
+        unclaimed_achievements_mask = int.from_bytes(
+            data[offset:achievements_end], "little"
+        )
+        offset = achievements_end
+        players = set()
+        turn_counts = {}
+
+        for _ in range(num_players):
+            player, offset = encoding.decode_player(data, offset)
+            players.add(player)
+            turn_counts[player.id] = encoding.TURN_COUNTS.unpack_from(data, offset)
+            offset += encoding.TURN_COUNTS.size
+
+        rng, offset = encoding.read_rng(data, offset)
+        game_state = GameState(
+            draw_decks,
+            AchievementSet.from_mask(unclaimed_achievements_mask),
+            players,
+            zobrist_hash,
+            rng,
+            # Rescanning every stack is most of the decoding time, leave it to the first query
+            AchievementTracker.deferred(players, turn_counts),
+        )
+
+        if offset < len(data):
+            game_state._load_pending(data[offset:])
+
+        return game_state
+
+    def mark(self) -> int:
+        """Start (or continue) journaling and return a mark that rollback can return to."""
+        if self._journal is None:
+            self._journal = []
+
+        return len(self._journal)
+
+    def rollback(self, mark: int):
+        """Undo every primitive applied since the given mark, restoring the exact prior state."""
+        journal = self._journal
+
+        while len(journal) > mark:
+            kind, zobrist_hash, player, *args = journal.pop()
+
+            if kind == _ADD_CARD:
+                self._undo_add_card(player, *args)
+            elif kind == _REMOVE_CARD:
+                self._undo_remove_card(player, *args)
+            elif kind == _SPLAY:
+                color, splay_direction = args
+                player.board[color].splay = splay_direction
+                player.changed()
+                self.achievement_tracker.splayed(player, color)
+            elif kind == _START_TURN:
+                for player_id, turn_counts in args[0].items():
+                    self.achievement_tracker.set_turn_counts(player_id, *turn_counts)
+            else:
+                (achievement,) = args
+                player.achievements.remove(achievement)
+                self.unclaimed_achievements.add(achievement)
+
+            self.zobrist_hash = zobrist_hash
+
+    def stop_journaling(self):
+        self._journal = None
+
+    def start_turn(self):
+        """Reset the per turn counts of the automatic achievements (cards tucked and scored)."""
+        tracker = self.achievement_tracker
+
+        if self._journal is not None:
+            turn_counts = {
+                player.id: tracker.turn_counts(player.id) for player in self.players
+            }
+            self._journal.append((_START_TURN, self.zobrist_hash, None, turn_counts))
+
+        tracker.start_turn()
+
+    def claimable_achievements(self, player: Player) -> AchievementSet:
+        """The unclaimed scoring achievements the player can claim with an achieve action."""
+        return self.achievement_tracker.claimable(player, self.unclaimed_achievements)
+
+    def can_achieve(self, player: Player) -> bool:
+        return self.achievement_tracker.can_achieve(player, self.unclaimed_achievements)
+
+    def automatic_achievements(self, player: Player) -> AchievementSet:
+        """The unclaimed automatic achievements the player meets the condition of."""
+        return self.achievement_tracker.automatic(player, self.unclaimed_achievements)
+
+    # Primitive game actions. All changes to the state should go through these so that the
+    # derived data kept on GameState stays in sync.
+
+    def draw_age(self, age: int) -> int:
+        """The age of the first non-empty deck of at least the given age, None if there is none
+        (drawing it ends the game)."""
+        decks = self.nonempty_decks >> max(age, 0) << max(age, 0)
+        if decks:
+            return (decks & -decks).bit_length() - 1
+
+    def peek_draw(self, age: int) -> Card:
+        """The card draw would take for the given age, None if every deck of that age or higher is empty."""
+        draw_age = self.draw_age(age)
+        if draw_age is not None:
+            return self.draw_decks[draw_age][-1]
+
+    def draw(
+        self,
+        player: Player,
+        age: int,
+        card_destination: CardLocation = CardLocation.HAND,
+        tuck: bool = False,
+    ) -> Card:
+        """Draw the top card of the first non-empty deck of at least the given age."""
+        card = self.peek_draw(age)
+        if card is None:
+            return None
+
+        self._remove_card(player, card, CardLocation.DECK)
+        # Drawing into the score pile is drawing and scoring
+        self._add_card(
+            player,
+            card,
+            card_destination,
+            tuck=tuck,
+            scored=card_destination == CardLocation.SCORE_PILE,
+        )
+
+        return card
+
+    def meld(
+        self,
+        player: Player,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ):
+        self.transfer_card(player, player, card, card_location, CardLocation.BOARD)
+
+    def tuck(
+        self,
+        player: Player,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ):
+        self._remove_card(player, card, card_location)
+        self._add_card(player, card, CardLocation.BOARD, tuck=True)
+
+    def score(
+        self,
+        player: Player,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ):
+        self._remove_card(player, card, card_location)
+        self._add_card(player, card, CardLocation.SCORE_PILE, scored=True)
+
+    def return_card(
+        self,
+        player: Player,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ):
+        self.transfer_card(player, player, card, card_location, CardLocation.DECK)
+
+    def transfer_card(
+        self,
+        giving_player: Player,
+        receiving_player: Player,
+        card: Card,
+        card_location: CardLocation,
+        card_destination: CardLocation,
+    ):
+        self._remove_card(giving_player, card, card_location)
+        self._add_card(receiving_player, card, card_destination)
+
+    def splay(self, player: Player, color: Color, splay_direction: SplayDirection):
+        card_stack = player.board[color]
+        splay_keys = zobrist_keys().splay_keys[player.id][color]
+
+        if self._journal is not None:
+            self._journal.append(
+                (_SPLAY, self.zobrist_hash, player, color, card_stack.splay)
+            )
+
+        self.zobrist_hash ^= splay_keys[card_stack.splay] ^ splay_keys[splay_direction]
+        card_stack.splay = splay_direction
+        player.changed()
+        self.achievement_tracker.splayed(player, color)
+
+    def achieve(self, player: Player, achievement: Achievement):
+        achievement_keys = zobrist_keys().achievement_keys
+
+        if self._journal is not None:
+            self._journal.append((_ACHIEVE, self.zobrist_hash, player, achievement))
+
+        self.unclaimed_achievements.remove(achievement)
+        player.achievements.add(achievement)
+        self.zobrist_hash ^= (
+            achievement_keys[SHARED][achievement.index]
+            ^ achievement_keys[player.id][achievement.index]
+        )
+
+    def _add_card(
+        self,
+        player: Player,
+        card: Card,
+        card_destination: CardLocation,
+        tuck: bool = False,
+        scored: bool = False,
+    ):
+        keys = zobrist_keys()
+        to_board = card_destination == CardLocation.BOARD
+        created_stack = to_board and card.color not in player.board
+        # Only cards going to the board are tucked, whatever the draw asked for
+        tucked = (
+            tuck
+            and to_board
+            and not created_stack
+            and not player.board[card.color].is_empty
+        )
+
+        if self._journal is not None:
+            self._journal.append(
+                (
+                    _ADD_CARD,
+                    self.zobrist_hash,
+                    player,
+                    card,
+                    card_destination,
+                    tucked,
+                    created_stack,
+                    tuck,
+                    scored,
+                )
+            )
+
+        self.zobrist_hash ^= keys.card_key(card.index, card_destination, player.id)
+
+        if card_destination == CardLocation.HAND:
+            player.hand.add(card)
+        elif card_destination == CardLocation.SCORE_PILE:
+            player.score_pile.add(card)
+        elif card_destination == CardLocation.DECK:
+            # Returned cards go to the bottom of their deck
+            self.draw_decks[card.age].appendleft(card)
+            self.nonempty_decks |= 1 << card.age
+        else:
+            card_stack = player.board.setdefault(
+                card.color, CardStack(deque(), SplayDirection.NONE)
+            )
+            top_card_keys = keys.top_card_keys[player.id]
+
+            if tucked:
+                card_stack.tuck(card)
+            else:
+                if not card_stack.is_empty:
+                    self.zobrist_hash ^= top_card_keys[card_stack.top_card.index]
+                card_stack.meld(card)
+                self.zobrist_hash ^= top_card_keys[card.index]
+
+        player.changed()
+        self.achievement_tracker.card_added(player, card, card_destination)
+        self.achievement_tracker.count_card(player, card_destination, tuck, scored)
+
+    def _remove_card(self, player: Player, card: Card, card_location: CardLocation):
+        keys = zobrist_keys()
+        zobrist_hash = self.zobrist_hash
+        deck_position = None
+        unsplay = False
+
+        if card_location == CardLocation.HAND:
+            player.hand.remove(card)
+        elif card_location == CardLocation.SCORE_PILE:
+            player.score_pile.remove(card)
+        elif card_location == CardLocation.DECK:
+            draw_deck = self.draw_decks[card.age]
+            if draw_deck and draw_deck[-1] is card:
+                deck_position = len(draw_deck) - 1
+                draw_deck.pop()
+            else:
+                deck_position = draw_deck.index(card)
+                del draw_deck[deck_position]
+            if not draw_deck:
+                self.nonempty_decks &= ~(1 << card.age)
+        else:
+            card_stack = player.board.get(card.color)
+            if card_stack is None or card_stack.top_card != card:
+                raise KeyError(card)
+
+            top_card_keys = keys.top_card_keys[player.id]
+            card_stack.pop_top()
+            self.zobrist_hash ^= top_card_keys[card.index]
+
+            if not card_stack.is_empty:
+                self.zobrist_hash ^= top_card_keys[card_stack.top_card.index]
+
+            # A stack reduced to a single card is no longer splayed
+            unsplay = (
+                not card_stack.can_splay and card_stack.splay != SplayDirection.NONE
+            )
+
+        self.zobrist_hash ^= keys.card_key(card.index, card_location, player.id)
+        player.changed()
+        self.achievement_tracker.card_removed(player, card, card_location)
+
+        if self._journal is not None:
+            self._journal.append(
+                (_REMOVE_CARD, zobrist_hash, player, card, card_location, deck_position)
+            )
+
+        if unsplay:
+            self.splay(player, card.color, SplayDirection.NONE)
+
+    def _undo_add_card(
+        self,
+        player: Player,
+        card: Card,
+        card_destination: CardLocation,
+        tucked: bool,
+        created_stack: bool,
+        tuck: bool,
+        scored: bool,
+    ):
+        if card_destination == CardLocation.HAND:
+            player.hand.remove(card)
+        elif card_destination == CardLocation.SCORE_PILE:
+            player.score_pile.remove(card)
+        elif card_destination == CardLocation.DECK:
+            draw_deck = self.draw_decks[card.age]
+            draw_deck.popleft()
+            if not draw_deck:
+                self.nonempty_decks &= ~(1 << card.age)
+        else:
+            card_stack = player.board[card.color]
+            if tucked:
+                card_stack.pop_bottom()
+            else:
+                card_stack.pop_top()
+
+            if created_stack:
+                del player.board[card.color]
+
+        player.changed()
+        self.achievement_tracker.card_removed(player, card, card_destination)
+        self.achievement_tracker.count_card(player, card_destination, tuck, scored, -1)
+
+    def _undo_remove_card(
+        self,
+        player: Player,
+        card: Card,
+        card_location: CardLocation,
+        deck_position: int,
+    ):
+        if card_location == CardLocation.HAND:
+            player.hand.add(card)
+        elif card_location == CardLocation.SCORE_PILE:
+            player.score_pile.add(card)
+        elif card_location == CardLocation.DECK:
+            self.draw_decks[card.age].insert(deck_position, card)
+            self.nonempty_decks |= 1 << card.age
+        else:
+            player.board[card.color].meld(card)
+
+        player.changed()
+        self.achievement_tracker.card_added(player, card, card_location)
@@ -0,0 +1,376 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import Achievement, AchievementSet
+from src.innovation.cards.cards import (
+    Card,
+    CardLocation,
+    CardSet,
+    CardStack,
+    Color,
+    MAX_AGE,
+    SplayDirection,
+    SymbolType,
+    SymbolVector,
+    get_symbol_contributions,
+    symbol_vector_to_dict,
+)
+from src.innovation.game.gamestate import GameState
+from src.innovation.players.players import Player
+from collections import deque
+from dataclasses import dataclass, replace
+from operator import add
+from typing import Dict, Tuple
+
+# Persistent counterparts of GameState, Player and CardStack for search.
+#
+# Every structure is immutable and every action returns a new state. Only the path from the root
+# to the changed zone is copied: players, board stacks and draw decks that an action does not
+# touch are shared with the parent state. The fan-out at every level is small and fixed
+# (at most 4 players, 5 colors, 10 ages), so plain tuples serve as the persistent vectors,
+# and card zones are stored as immutable CardSet bitmasks.
+
+COLORS = tuple(Color)
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+
+
+@dataclass(frozen=True)
+class PersistentCardStack:
+    # Bottom card first, top card last
+    cards: Tuple[Card, ...] = ()
+    splay: SplayDirection = SplayDirection.NONE
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.cards
+
+    @property
+    def top_card(self) -> Card:
+        if self.cards:
+            return self.cards[-1]
+
+    @property
+    def can_splay(self) -> bool:
+        return len(self.cards) >= 2
+
+    @property
+    def symbol_vector(self) -> SymbolVector:
+        symbol_vector = (0,) * len(SymbolType)
+
+        for card in self.cards[:-1]:
+            covered = get_symbol_contributions(card).covered[self.splay]
+            symbol_vector = tuple(map(add, symbol_vector, covered))
+
+        if self.cards:
+            top = get_symbol_contributions(self.cards[-1]).top
+            symbol_vector = tuple(map(add, symbol_vector, top))
+
+        return symbol_vector
+
+    def meld(self, card: Card) -> PersistentCardStack:
+        return PersistentCardStack(self.cards + (card,), self.splay)
+
+    def tuck(self, card: Card) -> PersistentCardStack:
+        return PersistentCardStack((card,) + self.cards, self.splay)
+
+    def pop_top(self) -> Tuple[PersistentCardStack, Card]:
+        return PersistentCardStack(self.cards[:-1], self.splay), self.cards[-1]
+
+    def with_splay(self, splay: SplayDirection) -> PersistentCardStack:
+        return PersistentCardStack(self.cards, splay)
+
+    @staticmethod
+    def from_card_stack(card_stack: CardStack) -> PersistentCardStack:
+        return PersistentCardStack(tuple(card_stack.stack), card_stack.splay)
+
+    def to_card_stack(self) -> CardStack:
+        return CardStack(deque(self.cards), self.splay)
+
+
+EMPTY_STACK = PersistentCardStack()
+EMPTY_BOARD = (EMPTY_STACK,) * len(COLORS)
+
+
+@dataclass(frozen=True)
+class PersistentPlayer:
+    id: int
+    # One stack per Color, in Color order
+    board: Tuple[PersistentCardStack, ...] = EMPTY_BOARD
+    hand_mask: int = 0
+    score_pile_mask: int = 0
+    achievements_mask: int = 0
+
+    @property
+    def hand(self) -> CardSet:
+        return CardSet.from_mask(self.hand_mask)
+
+    @property
+    def score_pile(self) -> CardSet:
+        return CardSet.from_mask(self.score_pile_mask)
+
+    @property
+    def achievements(self) -> AchievementSet:
+        return AchievementSet.from_mask(self.achievements_mask)
+
+    @property
+    def score(self) -> int:
+        return self.score_pile.age_total
+
+    @property
+    def top_cards(self) -> CardSet:
+        return CardSet(
+            card_stack.top_card for card_stack in self.board if card_stack.cards
+        )
+
+    @property
+    def symbol_vector(self) -> SymbolVector:
+        symbol_vector = (0,) * len(SymbolType)
+
+        for card_stack in self.board:
+            if card_stack.cards:
+                symbol_vector = tuple(map(add, symbol_vector, card_stack.symbol_vector))
+
+        return symbol_vector
+
+    @property
+    def symbol_count(self) -> Dict[SymbolType, int]:
+        return symbol_vector_to_dict(self.symbol_vector)
+
+    def stack(self, color: Color) -> PersistentCardStack:
+        return self.board[COLOR_INDEX[color]]
+
+    def with_stack(
+        self, color: Color, card_stack: PersistentCardStack
+    ) -> PersistentPlayer:
+        index = COLOR_INDEX[color]
+        board = self.board[:index] + (card_stack,) + self.board[index + 1 :]
+        return replace(self, board=board)
+
+    @staticmethod
+    def from_player(player: Player) -> PersistentPlayer:
+        board = tuple(
+            (
+                PersistentCardStack.from_card_stack(player.board[color])
+                if color in player.board
+                else EMPTY_STACK
+            )
+            for color in COLORS
+        )
+        return PersistentPlayer(
+            player.id,
+            board,
+            CardSet(player.hand).mask,
+            CardSet(player.score_pile).mask,
+            AchievementSet(player.achievements).mask,
+        )
+
+    def to_player(self) -> Player:
+        return Player(
+            self.id,
+            {
+                color: card_stack.to_card_stack()
+                for color, card_stack in zip(COLORS, self.board)
+                if card_stack.cards
+            },
+            self.hand,
+            self.score_pile,
+            self.achievements,
+        )
+
+
+@dataclass(frozen=True)
+class PersistentGameState:
+    # Draw decks indexed by age - 1, top card last
+    draw_decks: Tuple[Tuple[Card, ...], ...]
+    unclaimed_achievements_mask: int
+    # Indexed by player id
+    players: Tuple[PersistentPlayer, ...]
+
+    @property
+    def unclaimed_achievements(self) -> AchievementSet:
+        return AchievementSet.from_mask(self.unclaimed_achievements_mask)
+
+    def draw(
+        self,
+        player_id: int,
+        age: int,
+        card_destination: CardLocation = CardLocation.HAND,
+    ) -> Tuple[PersistentGameState, Card]:
+        """Draw the top card of the first non-empty deck of at least the given age."""
+        draw_age = next(
+            (
+                deck_age
+                for deck_age in range(max(age, 1), len(self.draw_decks) + 1)
+                if self.draw_decks[deck_age - 1]
+            ),
+            None,
+        )
+        if draw_age is None:
+            return self, None
+
+        draw_deck = self.draw_decks[draw_age - 1]
+        card = draw_deck[-1]
+        game_state = self._with_draw_deck(draw_age, draw_deck[:-1])
+
+        return game_state._add_card(player_id, card, card_destination), card
+
+    def meld(
+        self,
+        player_id: int,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ) -> PersistentGameState:
+        return self.transfer_card(
+            player_id, player_id, card, card_location, CardLocation.BOARD
+        )
+
+    def tuck(
+        self,
+        player_id: int,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ) -> PersistentGameState:
+        game_state = self._remove_card(player_id, card, card_location)
+        player = game_state.players[player_id]
+        card_stack = player.stack(card.color).tuck(card)
+
+        return game_state._with_player(player.with_stack(card.color, card_stack))
+
+    def score(
+        self,
+        player_id: int,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ) -> PersistentGameState:
+        return self.transfer_card(
+            player_id, player_id, card, card_location, CardLocation.SCORE_PILE
+        )
+
+    def return_card(
+        self,
+        player_id: int,
+        card: Card,
+        card_location: CardLocation = CardLocation.HAND,
+    ) -> PersistentGameState:
+        return self.transfer_card(
+            player_id, player_id, card, card_location, CardLocation.DECK
+        )
+
+    def transfer_card(
+        self,
+        giving_player_id: int,
+        receiving_player_id: int,
+        card: Card,
+        card_location: CardLocation,
+        card_destination: CardLocation,
+    ) -> PersistentGameState:
+        return self._remove_card(giving_player_id, card, card_location)._add_card(
+            receiving_player_id, card, card_destination
+        )
+
+    def splay(
+        self, player_id: int, color: Color, splay_direction: SplayDirection
+    ) -> PersistentGameState:
+        player = self.players[player_id]
+        card_stack = player.stack(color).with_splay(splay_direction)
+
+        return self._with_player(player.with_stack(color, card_stack))
+
+    def achieve(self, player_id: int, achievement: Achievement) -> PersistentGameState:
+        player = self.players[player_id]
+        achievement_bit = 1 << achievement.index
+
+        return replace(
+            self._with_player(
+                replace(
+                    player, achievements_mask=player.achievements_mask | achievement_bit
+                )
+            ),
+            unclaimed_achievements_mask=self.unclaimed_achievements_mask
+            & ~achievement_bit,
+        )
+
+    def _add_card(
+        self, player_id: int, card: Card, card_destination: CardLocation
+    ) -> PersistentGameState:
+        if card_destination == CardLocation.DECK:
+            # Returned cards go to the bottom of their deck
+            return self._with_draw_deck(
+                card.age, (card,) + self.draw_decks[card.age - 1]
+            )
+
+        player = self.players[player_id]
+        card_bit = 1 << card.index
+
+        if card_destination == CardLocation.HAND:
+            player = replace(player, hand_mask=player.hand_mask | card_bit)
+        elif card_destination == CardLocation.SCORE_PILE:
+            player = replace(player, score_pile_mask=player.score_pile_mask | card_bit)
+        else:
+            player = player.with_stack(card.color, player.stack(card.color).meld(card))
+
+        return self._with_player(player)
+
+    def _remove_card(
+        self, player_id: int, card: Card, card_location: CardLocation
+    ) -> PersistentGameState:
+        if card_location == CardLocation.DECK:
+            draw_deck = self.draw_decks[card.age - 1]
+            index = draw_deck.index(card)
+            return self._with_draw_deck(
+                card.age, draw_deck[:index] + draw_deck[index + 1 :]
+            )
+
+        player = self.players[player_id]
+        card_bit = 1 << card.index
+
+        if card_location == CardLocation.HAND:
+            if not player.hand_mask & card_bit:
+                raise KeyError(card)
+            player = replace(player, hand_mask=player.hand_mask & ~card_bit)
+        elif card_location == CardLocation.SCORE_PILE:
+            if not player.score_pile_mask & card_bit:
+                raise KeyError(card)
+            player = replace(player, score_pile_mask=player.score_pile_mask & ~card_bit)
+        else:
+            card_stack = player.stack(card.color)
+            if card_stack.top_card != card:
+                raise KeyError(card)
+            card_stack, _ = card_stack.pop_top()
+
+            # A stack reduced to a single card is no longer splayed, as in GameState
+            if not card_stack.can_splay and card_stack.splay != SplayDirection.NONE:
+                card_stack = card_stack.with_splay(SplayDirection.NONE)
+
+            player = player.with_stack(card.color, card_stack)
+
+        return self._with_player(player)
+
+    def _with_player(self, player: PersistentPlayer) -> PersistentGameState:
+        players = self.players[: player.id] + (player,) + self.players[player.id + 1 :]
+        return replace(self, players=players)
+
+    def _with_draw_deck(
+        self, age: int, draw_deck: Tuple[Card, ...]
+    ) -> PersistentGameState:
+        draw_decks = self.draw_decks[: age - 1] + (draw_deck,) + self.draw_decks[age:]
+        return replace(self, draw_decks=draw_decks)
+
+    @staticmethod
+    def from_game_state(game_state: GameState) -> PersistentGameState:
+        return PersistentGameState(
+            tuple(
+                tuple(game_state.draw_decks.get(age, ()))
+                for age in range(1, MAX_AGE + 1)
+            ),
+            AchievementSet(game_state.unclaimed_achievements).mask,
+            tuple(
+                PersistentPlayer.from_player(player)
+                for player in sorted(game_state.players, key=lambda p: p.id)
+            ),
+        )
+
+    def to_game_state(self) -> GameState:
+        return GameState(
+            {age: deque(deck) for age, deck in enumerate(self.draw_decks, start=1)},
+            self.unclaimed_achievements,
+            {player.to_player() for player in self.players},
+        )
@@ -0,0 +1,186 @@
+"""
+Self-play: complete games between bots, spread over a pool of worker processes.
+
+Every game is set up and played from (master seed, game index) alone, so a batch plays the same
+for any number of workers and any single game can be replayed on its own. Chunks of games are
+set up together, see initialize_gamestates.
+
+Run with: python -m src.innovation.game.self_play --games 10000 --players 3 --workers 8
+"""
+
+from src.innovation.game.choosers import Chooser, FirstChoiceChooser, RandomChooser
+from src.innovation.game.game_loop import MAX_TURNS, play_game
+from src.innovation.game.game_setup import initialize_gamestates
+from src.innovation.game.gamestate import GameState
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+import argparse
+import os
+import time
+
+BOTS: Dict[str, Callable[[Random], Chooser]] = {
+    "random": RandomChooser,
+    "first": lambda rng: FirstChoiceChooser(),
+}
+
+
+class GameRecord(NamedTuple):
+    game_index: int
+    # -1 if the game ended in a tie
+    winner: int
+    num_turns: int
+    achievement_victory: bool
+    # Indexed by player id
+    scores: Tuple[int, ...]
+
+
+def play_set_up_game(
+    bots: Sequence[str], game_state: GameState, game_index: int, max_turns: int
+) -> GameRecord:
+    # Every seat gets its own stream, so changing one bot leaves the others' draws unchanged
+    choosers = [
+        BOTS[bot](game_state.rng.split(1, seat)) for seat, bot in enumerate(bots)
+    ]
+
+    result = play_game(game_state, choosers, max_turns)
+
+    return GameRecord(
+        game_index,
+        -1 if result.winner is None else result.winner,
+        result.num_turns,
+        result.achievement_victory,
+        result.scores,
+    )
+
+
+def play_seeded_game(
+    bots: Sequence[str], master_seed: int, game_index: int, max_turns: int = MAX_TURNS
+) -> GameRecord:
+    game_state = initialize_gamestates(1, len(bots), master_seed, game_index)[0]
+    return play_set_up_game(bots, game_state, game_index, max_turns)
+
+
+def play_chunk(
+    bots: Sequence[str], master_seed: int, game_indices: range, max_turns: int
+) -> List[GameRecord]:
+    game_states = initialize_gamestates(
+        len(game_indices), len(bots), master_seed, game_indices.start
+    )
+    return [
+        play_set_up_game(bots, game_state, game_index, max_turns)
+        for game_state, game_index in zip(game_states, game_indices)
+    ]
+
+
+def chunks(num_games: int, chunk_size: int) -> Iterator[range]:
+    for start in range(0, num_games, chunk_size):
+        yield range(start, min(start + chunk_size, num_games))
+
+
+def run_games(
+    num_games: int,
+    bots: Sequence[str],
+    master_seed: int = 0,
+    num_workers: int = None,
+    chunk_size: int = 64,
+    max_turns: int = MAX_TURNS,
+) -> List[GameRecord]:
+    """Play num_games games, returning their records in game index order."""
+    unknown_bots = set(bots) - BOTS.keys()
+    if unknown_bots:
+        raise ValueError(
+            f"Unknown bots {sorted(unknown_bots)}, choose from {sorted(BOTS)}"
+        )
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    if num_workers <= 1:
+        return play_chunk(bots, master_seed, range(num_games), max_turns)
+
+    records = []
+    # Workers build the card registry once, when importing this module, and reuse it for every
+    # chunk. Chunks keep the per game inter process traffic down to a compact record.
+    with ProcessPoolExecutor(num_workers) as executor:
+        futures = [
+            executor.submit(play_chunk, bots, master_seed, game_indices, max_turns)
+            for game_indices in chunks(num_games, chunk_size)
+        ]
+        for future in futures:
+            records.extend(future.result())
+
+    return records
+
+
+def summarize(records: Sequence[GameRecord], num_players: int, elapsed: float) -> str:
+    num_games = len(records)
+    wins = [0] * num_players
+    ties = 0
+
+    for record in records:
+        if record.winner < 0:
+            ties += 1
+        else:
+            wins[record.winner] += 1
+
+    lines = [
+        f"games            {num_games}",
+        f"games/s          {num_games / elapsed:,.0f}",
+        f"average turns    {sum(r.num_turns for r in records) / num_games:.1f}",
+        f"by achievements  {sum(r.achievement_victory for r in records) / num_games:.1%}",
+        f"ties             {ties / num_games:.1%}",
+    ]
+    lines.extend(
+        f"player {player_id} wins    {player_wins / num_games:.1%}"
+        for player_id, player_wins in enumerate(wins)
+    )
+    return "\n".join(lines)
+
+
+def write_records(path: str, records: Sequence[GameRecord]):
+    with open(path, "w") as output:
+        output.write("game_index,winner,num_turns,achievement_victory,scores\n")
+        for record in records:
+            scores = " ".join(map(str, record.scores))
+            output.write(
+                f"{record.game_index},{record.winner},{record.num_turns},"
+                f"{int(record.achievement_victory)},{scores}\n"
+            )
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=2, choices=(2, 3, 4))
+    parser.add_argument(
+        "--bots",
+        default="random",
+        help=f"Comma separated bot per seat, or one for every seat: {', '.join(BOTS)}",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--output", help="Write one CSV record per game to this file")
+    args = parser.parse_args(argv)
+
+    bots = args.bots.split(",")
+    if len(bots) == 1:
+        bots = bots * args.players
+    if len(bots) != args.players:
+        parser.error(f"--bots needs 1 or {args.players} bots")
+
+    start = time.perf_counter()
+    records = run_games(
+        args.games, bots, args.seed, args.workers, args.chunk_size, args.max_turns
+    )
+    elapsed = time.perf_counter() - start
+
+    print(summarize(records, args.players, elapsed))
+    if args.output:
+        write_records(args.output, records)
+
+
+if __name__ == "__main__":
+    main()
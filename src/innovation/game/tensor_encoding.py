@@ -0,0 +1,316 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.cards import (
+    CardLocation,
+    CardSet,
+    Color,
+    SplayDirection,
+    SymbolType,
+    get_symbol_contributions,
+)
+from src.innovation.game.gamestate import GameState
+from src.innovation.game.zobrist import MAX_PLAYERS, PLAYER_ZONES
+from src.innovation.players.player_store import PlayerStore
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Sequence, Tuple
+import numpy as np
+
+# Batched NumPy observations of many game states.
+#
+# Python only gathers what the players already hold: the hand, score pile and achievement
+# bitmasks, and per board stack its splay and its one byte card indices (bottom to top). The
+# masks of the whole batch are written back to back as little endian bytes and unpacked at once
+# with np.unpackbits, and the board cards are scattered into the presence rows with one fancy
+# index. Splays are expanded into one-hots, symbol counts sum the per card symbol contribution
+# tables over the top and covered cards, and scores are the score pile presence dotted with the
+# card ages.
+#
+# Players kept in a PlayerStore need no Python at all: encode_player_store reads the masks, stack
+# sizes, splays and board bytes of every slot straight from the store buffers.
+
+COLORS = tuple(Color)
+SPLAYS = tuple(SplayDirection)
+
+HAND_ZONE = PLAYER_ZONES.index(CardLocation.HAND)
+BOARD_ZONE = PLAYER_ZONES.index(CardLocation.BOARD)
+SCORE_PILE_ZONE = PLAYER_ZONES.index(CardLocation.SCORE_PILE)
+
+get_index = attrgetter("index")
+
+
+@lru_cache(maxsize=None)
+def card_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Card ages, top symbol contributions and covered symbol contributions per splay."""
+    # Built on first use, after the card registry has been indexed
+    cards = CardSet.members
+    contributions = [get_symbol_contributions(card) for card in cards]
+
+    ages = np.array([card.age for card in cards], dtype=np.int16)
+    top = np.array([contribution.top for contribution in contributions], dtype=np.int16)
+    covered = np.array(
+        [
+            [contribution.covered[splay] for contribution in contributions]
+            for splay in SPLAYS
+        ],
+        dtype=np.int16,
+    )
+    return ages, top, covered
+
+
+@dataclass
+class GameStateTensors:
+    """Observation arrays for a batch of game states, indexed by [game, player id, ...]."""
+
+    # Players present in the game
+    player_mask: np.ndarray
+    # Card presence, indexed by [game, player, zone in PLAYER_ZONES order, card index]
+    card_presence: np.ndarray
+    # Splay one-hots, indexed by [game, player, color, splay in SplayDirection order]
+    splays: np.ndarray
+    # Player.symbol_vector, in SymbolType order
+    symbol_counts: np.ndarray
+    scores: np.ndarray
+    # Claimed achievements, indexed by [game, player, achievement index]
+    achievements: np.ndarray
+
+    @staticmethod
+    def allocate(batch_size: int, num_players: int = MAX_PLAYERS) -> GameStateTensors:
+        num_cards = len(CardSet.members)
+        return GameStateTensors(
+            np.zeros((batch_size, num_players), dtype=bool),
+            np.zeros(
+                (batch_size, num_players, len(PLAYER_ZONES), num_cards), dtype=np.uint8
+            ),
+            np.zeros(
+                (batch_size, num_players, len(COLORS), len(SPLAYS)), dtype=np.uint8
+            ),
+            np.zeros((batch_size, num_players, len(SymbolType)), dtype=np.int16),
+            np.zeros((batch_size, num_players), dtype=np.int16),
+            np.zeros(
+                (batch_size, num_players, len(AchievementSet.members)), dtype=np.uint8
+            ),
+        )
+
+    @property
+    def batch_size(self) -> int:
+        return self.player_mask.shape[0]
+
+    @property
+    def num_players(self) -> int:
+        return self.player_mask.shape[1]
+
+
+def unpack_masks(masks: bytes, shape: Tuple[int, ...], num_members: int) -> np.ndarray:
+    """Unpack little-endian masks laid out back to back into 0/1 presence rows."""
+    masks = np.frombuffer(masks, dtype=np.uint8).reshape(shape)
+    return np.unpackbits(masks, axis=-1, bitorder="little")[..., :num_members]
+
+
+def encode_game_states(
+    game_states: Sequence[GameState], tensors: GameStateTensors = None
+) -> GameStateTensors:
+    """Fill the first len(game_states) rows of tensors (allocated if not given)."""
+    if tensors is None:
+        tensors = GameStateTensors.allocate(len(game_states))
+
+    batch_size = len(game_states)
+    num_players = tensors.num_players
+    num_colors = len(COLORS)
+    card_mask_bytes = CardSet.mask_num_bytes
+    achievement_mask_bytes = AchievementSet.mask_num_bytes
+
+    # Per player slot (game * num_players + player id)
+    slots = []
+    hand_masks = []
+    score_pile_masks = []
+    achievement_masks = []
+    # Per board stack, its (slot * num_colors + color index) * len(SPLAYS) + splay index and its
+    # size, and the cards of every stack
+    stack_keys = []
+    stack_sizes = bytearray()
+    board_cards = bytearray()
+
+    for game, game_state in enumerate(game_states):
+        for player in game_state.players:
+            if player.id >= num_players:
+                # The slot would be one of the next game's
+                raise ValueError(
+                    f"Player {player.id} of game {game} does not fit tensors of "
+                    f"{num_players} players"
+                )
+            slot = game * num_players + player.id
+            slots.append(slot)
+            hand_masks.append(player.hand.mask)
+            score_pile_masks.append(player.score_pile.mask)
+            achievement_masks.append(player.achievements.mask)
+            # Enum values run from 1 in declaration order, _value_ skips the property lookup
+            first_key = (slot * num_colors - 1) * len(SPLAYS) - 1
+
+            for color, card_stack in player.board.items():
+                stack = card_stack.stack
+                stack_keys.append(
+                    first_key + color._value_ * len(SPLAYS) + card_stack.splay._value_
+                )
+                stack_sizes.append(len(stack))
+                board_cards += bytes(map(get_index, stack))
+
+    ages, top_symbols, covered_symbols = card_tables()
+    num_slots = len(slots)
+    slots = np.array(slots, dtype=np.intp)
+    rows = np.zeros(
+        (batch_size * num_players,) + tensors.card_presence.shape[2:], dtype=np.uint8
+    )
+    zone_masks = b"".join(
+        [mask.to_bytes(card_mask_bytes, "little") for mask in hand_masks]
+        + [mask.to_bytes(card_mask_bytes, "little") for mask in score_pile_masks]
+    )
+    zone_presence = unpack_masks(
+        zone_masks, (2, num_slots, card_mask_bytes), rows.shape[-1]
+    )
+    rows[slots, HAND_ZONE] = zone_presence[0]
+    rows[slots, SCORE_PILE_ZONE] = zone_presence[1]
+
+    # Board cards, each with the stack it belongs to and whether it is the top card
+    stack_keys = np.array(stack_keys, dtype=np.intp)
+    stack_slots, stack_splays = np.divmod(stack_keys, len(SPLAYS))
+    stack_slots //= num_colors
+    card_indices = np.frombuffer(board_cards, dtype=np.uint8)
+    stack_sizes = np.frombuffer(stack_sizes, dtype=np.uint8)
+    card_stacks = np.repeat(np.arange(len(stack_sizes)), stack_sizes)
+    card_slots = stack_slots[card_stacks]
+    rows[card_slots, BOARD_ZONE, card_indices] = 1
+
+    is_top = np.zeros(len(card_indices), dtype=bool)
+    is_top[np.cumsum(stack_sizes, dtype=np.intp)[stack_sizes > 0] - 1] = True
+    is_covered = ~is_top
+    card_symbols = top_symbols[card_indices]
+    card_symbols[is_covered] = covered_symbols[
+        stack_splays[card_stacks[is_covered]], card_indices[is_covered]
+    ]
+    symbol_counts = np.zeros(
+        (batch_size * num_players, len(SymbolType)), dtype=np.int16
+    )
+    np.add.at(symbol_counts, card_slots, card_symbols)
+    splays = np.zeros((batch_size * num_players * num_colors, 1), dtype=np.uint8)
+    splays[stack_keys // len(SPLAYS), 0] = stack_splays
+
+    player_mask = np.zeros(batch_size * num_players, dtype=bool)
+    player_mask[slots] = True
+    achievements = np.zeros(
+        (batch_size * num_players, tensors.achievements.shape[-1]), dtype=np.uint8
+    )
+    achievements[slots] = unpack_masks(
+        b"".join(
+            [
+                mask.to_bytes(achievement_mask_bytes, "little")
+                for mask in achievement_masks
+            ]
+        ),
+        (num_slots, achievement_mask_bytes),
+        achievements.shape[-1],
+    )
+
+    tensors.player_mask[:batch_size] = player_mask.reshape(batch_size, num_players)
+    tensors.card_presence[:batch_size] = rows.reshape(
+        (batch_size, num_players) + rows.shape[1:]
+    )
+    tensors.splays[:batch_size] = (splays == np.arange(len(SPLAYS))).reshape(
+        batch_size, num_players, num_colors, len(SPLAYS)
+    )
+    tensors.symbol_counts[:batch_size] = symbol_counts.reshape(
+        batch_size, num_players, -1
+    )
+    tensors.scores[:batch_size] = (
+        rows[:, SCORE_PILE_ZONE].reshape(batch_size, num_players, -1) @ ages
+    )
+    tensors.achievements[:batch_size] = achievements.reshape(
+        batch_size, num_players, -1
+    )
+
+    return tensors
+
+
+def encode_player_store(
+    store: PlayerStore, tensors: GameStateTensors = None
+) -> GameStateTensors:
+    """
+    Fill the first store.num_games rows of tensors from the buffers of a PlayerStore, without
+    any Python work per player. Every slot of the store counts as a player.
+    """
+    if tensors is None:
+        tensors = GameStateTensors.allocate(store.num_games)
+
+    num_games, num_players = store.num_games, store.num_players
+    if num_players > tensors.num_players:
+        raise ValueError(
+            f"A store of {num_players} players does not fit tensors of "
+            f"{tensors.num_players} players"
+        )
+    num_cards = len(CardSet.members)
+    shape = (num_games, num_players)
+    ages, top_symbols, covered_symbols = card_tables()
+
+    # Color and position within the color run of every byte of a board
+    board_colors = np.repeat(
+        np.arange(len(COLORS)),
+        np.diff([*store.color_offsets.values(), store.board_size]),
+    )
+    board_positions = (
+        np.arange(store.board_size)
+        - np.array(list(store.color_offsets.values()))[board_colors]
+    )
+
+    stack_cards = np.frombuffer(store.stack_cards, dtype=np.uint8).reshape(
+        shape + (store.board_size,)
+    )
+    stack_sizes = np.frombuffer(store.stack_sizes, dtype=np.uint8).reshape(
+        shape + (len(COLORS),)
+    )
+    # Splay values run from 1, with 0 (no stack) showing as an unsplayed empty stack
+    splays = np.frombuffer(store.splays, dtype=np.uint8).reshape(shape + (len(COLORS),))
+    splay_indices = np.maximum(splays.astype(np.intp) - 1, 0)
+
+    # Only the bytes of the board holding a card, with their stack size and splay
+    sizes = stack_sizes[..., board_colors]
+    games, players, positions = np.nonzero(board_positions < sizes)
+    card_indices = stack_cards[games, players, positions]
+    colors = board_colors[positions]
+    is_top = board_positions[positions] == sizes[games, players, positions] - 1
+    card_symbols = covered_symbols[splay_indices[games, players, colors], card_indices]
+    card_symbols[is_top] = top_symbols[card_indices[is_top]]
+    symbol_counts = np.zeros(shape + (len(SymbolType),), dtype=np.int16)
+    np.add.at(symbol_counts, (games, players), card_symbols)
+
+    tensors.card_presence[:num_games] = 0
+    card_presence = tensors.card_presence[:num_games, :num_players]
+    card_presence[:, :, HAND_ZONE] = unpack_masks(
+        store.hands, shape + (store.card_mask_bytes,), num_cards
+    )
+    card_presence[:, :, SCORE_PILE_ZONE] = unpack_masks(
+        store.score_piles, shape + (store.card_mask_bytes,), num_cards
+    )
+    card_presence[games, players, BOARD_ZONE, card_indices] = 1
+
+    tensors.player_mask[:num_games] = False
+    tensors.player_mask[:num_games, :num_players] = True
+    # Unsplayed, as for the players missing from a game in encode_game_states
+    tensors.splays[:num_games] = np.arange(len(SPLAYS)) == 0
+    tensors.splays[:num_games, :num_players] = splay_indices[..., None] == np.arange(
+        len(SPLAYS)
+    )
+    tensors.symbol_counts[:num_games] = 0
+    tensors.symbol_counts[:num_games, :num_players] = symbol_counts
+    tensors.scores[:num_games] = 0
+    tensors.scores[:num_games, :num_players] = (
+        card_presence[:, :, SCORE_PILE_ZONE] @ ages
+    )
+    tensors.achievements[:num_games] = 0
+    tensors.achievements[:num_games, :num_players] = unpack_masks(
+        store.achievements,
+        shape + (store.achievement_mask_bytes,),
+        tensors.achievements.shape[-1],
+    )
+
+    return tensors
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.cards import CardLocation, CardSet, Color, SplayDirection
+from functools import lru_cache
+from random import Random
+from typing import Iterable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.innovation.game.gamestate import GameState
+
+MAX_PLAYERS = 4
+ZOBRIST_SEED = 0x1A2B3C4D
+
+PLAYER_ZONES = (CardLocation.HAND, CardLocation.BOARD, CardLocation.SCORE_PILE)
+# Owner slot used for zones that do not belong to a player (the draw decks, unclaimed achievements)
+SHARED = MAX_PLAYERS
+
+
+def check_player_ids(player_ids: Iterable[int]):
+    """Raise a ValueError unless every player id has its own keys, see ZobristKeys."""
+    player_ids = sorted(player_ids)
+    if player_ids and not 0 <= player_ids[0] <= player_ids[-1] < MAX_PLAYERS:
+        raise ValueError(
+            f"Games are played by at most {MAX_PLAYERS} players, with ids 0 to "
+            f"{MAX_PLAYERS - 1}, not {player_ids}"
+        )
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for every (card, zone, owner), board top card, splay and achievement owner.
+
+    The hash of a game state is the XOR of the keys of every fact that holds in it, so moving a
+    card or changing a splay only needs the XOR of the keys that stop and start holding. The order
+    of covered cards within a board stack and of cards within a draw deck are not hashed.
+    """
+
+    def __init__(self, num_cards: int, num_achievements: int, seed: int = ZOBRIST_SEED):
+        rng = Random(seed)
+
+        def random_keys(size: int) -> List[int]:
+            return [rng.getrandbits(64) for _ in range(size)]
+
+        self.card_keys = {
+            (location, owner): random_keys(num_cards)
+            for owner in range(MAX_PLAYERS)
+            for location in PLAYER_ZONES
+        }
+        self.card_keys[(CardLocation.DECK, SHARED)] = random_keys(num_cards)
+        self.top_card_keys = [random_keys(num_cards) for _ in range(MAX_PLAYERS)]
+        # Unsplayed stacks contribute nothing, so absent and empty stacks hash the same
+        self.splay_keys = [
+            {
+                color: {
+                    splay: 0 if splay == SplayDirection.NONE else rng.getrandbits(64)
+                    for splay in SplayDirection
+                }
+                for color in Color
+            }
+            for _ in range(MAX_PLAYERS)
+        ]
+        self.achievement_keys = [
+            random_keys(num_achievements) for _ in range(MAX_PLAYERS + 1)
+        ]
+
+    def card_key(self, card_index: int, location: CardLocation, owner: int) -> int:
+        if location == CardLocation.DECK:
+            owner = SHARED
+
+        return self.card_keys[(location, owner)][card_index]
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys() -> ZobristKeys:
+    # Built on first use, after the card and achievement registries have been indexed
+    return ZobristKeys(len(CardSet.members), len(AchievementSet.members))
+
+
+def compute_zobrist_hash(game_state: GameState) -> int:
+    keys = zobrist_keys()
+    zobrist_hash = 0
+
+    for draw_deck in game_state.draw_decks.values():
+        for card in draw_deck:
+            zobrist_hash ^= keys.card_key(card.index, CardLocation.DECK, SHARED)
+
+    for achievement in game_state.unclaimed_achievements:
+        zobrist_hash ^= keys.achievement_keys[SHARED][achievement.index]
+
+    for player in game_state.players:
+        for card in player.hand:
+            zobrist_hash ^= keys.card_key(card.index, CardLocation.HAND, player.id)
+
+        for card in player.score_pile:
+            zobrist_hash ^= keys.card_key(
+                card.index, CardLocation.SCORE_PILE, player.id
+            )
+
+        for achievement in player.achievements:
+            zobrist_hash ^= keys.achievement_keys[player.id][achievement.index]
+
+        for color, card_stack in player.board.items():
+            zobrist_hash ^= keys.splay_keys[player.id][color][card_stack.splay]
+
+            for card in card_stack.stack:
+                zobrist_hash ^= keys.card_key(card.index, CardLocation.BOARD, player.id)
+
+            if not card_stack.is_empty:
+                zobrist_hash ^= keys.top_card_keys[player.id][card_stack.top_card.index]
+
+    return zobrist_hash
@@ -0,0 +1,347 @@
+from __future__ import annotations
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.cards import (
+    Card,
+    CardSet,
+    CardStack,
+    Color,
+    SplayDirection,
+    SymbolType,
+    SymbolVector,
+    get_symbol_contributions,
+    symbol_vector_to_dict,
+)
+from src.innovation.players.players import Player
+from collections import deque
+from collections.abc import MutableMapping
+from operator import add
+from typing import Dict, Iterator, List, Set, Tuple
+import weakref
+
+# Struct of arrays storage for the players of many games.
+#
+# Every (game, player) pair owns a slot. The zones of all slots live in a few flat bytearrays:
+# hands, score piles and achievements as little endian bitmasks over the registry indices, and
+# every board as one byte card indices, with a fixed run of bytes per color sized to hold all of
+# that color's cards. Stack sizes and splays take one byte per slot and color, with a splay of 0
+# marking a color the player has no stack for (as in game.encoding).
+#
+# StoredPlayer is a Player whose zones are views over its slot, so the property API and the
+# GameState primitives work on it unchanged. The buffers support the buffer protocol, so they can
+# be wrapped without copying, e.g. numpy.frombuffer(store.stack_sizes, dtype=numpy.uint8).
+
+COLORS = tuple(Color)
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+NO_STACK = 0
+SPLAY_DIRECTIONS = {splay.value: splay for splay in SplayDirection}
+
+
+class StoredCardSet(CardSet):
+    """A CardSet whose mask is kept in a slice of a PlayerStore buffer."""
+
+    __slots__ = ("_buffer", "_start", "_end")
+
+    # Derived sets are plain CardSets
+    from_mask = CardSet.from_mask
+
+    def __init__(self, buffer: bytearray, start: int, end: int):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._invalidate_age_total()
+
+    @property
+    def mask(self) -> int:
+        return int.from_bytes(self._buffer[self._start : self._end], "little")
+
+    @mask.setter
+    def mask(self, mask: int):
+        self._buffer[self._start : self._end] = mask.to_bytes(
+            self._end - self._start, "little"
+        )
+
+
+class StoredAchievementSet(AchievementSet):
+    """An AchievementSet whose mask is kept in a slice of a PlayerStore buffer."""
+
+    __slots__ = ("_buffer", "_start", "_end")
+
+    from_mask = AchievementSet.from_mask
+
+    def __init__(self, buffer: bytearray, start: int, end: int):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    mask = StoredCardSet.mask
+
+
+class StoredCardStack:
+    """A board stack kept in a PlayerStore, with the API of CardStack."""
+
+    __slots__ = ("_store", "_size_index", "_start")
+
+    def __init__(self, store: PlayerStore, slot: int, color: Color):
+        self._store = store
+        self._size_index = slot * len(COLORS) + COLOR_INDEX[color]
+        self._start = slot * store.board_size + store.color_offsets[color]
+
+    @property
+    def stack(self) -> Tuple[Card, ...]:
+        """The cards of the stack, bottom to top."""
+        size = self._store.stack_sizes[self._size_index]
+        indices = self._store.stack_cards[self._start : self._start + size]
+        return tuple(map(CardSet.members.__getitem__, indices))
+
+    @property
+    def splay(self) -> SplayDirection:
+        return SPLAY_DIRECTIONS[self._store.splays[self._size_index]]
+
+    @splay.setter
+    def splay(self, splay: SplayDirection):
+        self._store.splays[self._size_index] = splay.value
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._store.stack_sizes[self._size_index]
+
+    @property
+    def top_card(self) -> Card:
+        size = self._store.stack_sizes[self._size_index]
+        if size:
+            return CardSet.members[self._store.stack_cards[self._start + size - 1]]
+
+    @property
+    def can_splay(self) -> bool:
+        return self._store.stack_sizes[self._size_index] >= 2
+
+    @property
+    def symbol_vector(self) -> SymbolVector:
+        # Rescans the stack rather than keeping running counts like CardStack, which would take
+        # len(SplayDirection) * len(SymbolType) more bytes per stack. Player.symbol_vector is
+        # memoized, so this runs once per board per change.
+        symbol_vector = (0,) * len(SymbolType)
+        cards = self.stack
+        splay = self.splay
+
+        for card in cards[:-1]:
+            covered = get_symbol_contributions(card).covered[splay]
+            symbol_vector = tuple(map(add, symbol_vector, covered))
+
+        if cards:
+            top = get_symbol_contributions(cards[-1]).top
+            symbol_vector = tuple(map(add, symbol_vector, top))
+
+        return symbol_vector
+
+    @property
+    def symbol_count(self) -> Dict[SymbolType, int]:
+        return symbol_vector_to_dict(self.symbol_vector)
+
+    def fork(self) -> CardStack:
+        return CardStack(deque(self.stack), self.splay)
+
+    def meld(self, card: Card):
+        store = self._store
+        size = store.stack_sizes[self._size_index]
+        store.stack_cards[self._start + size] = card.index
+        store.stack_sizes[self._size_index] = size + 1
+
+    def tuck(self, card: Card):
+        store = self._store
+        start = self._start
+        size = store.stack_sizes[self._size_index]
+        store.stack_cards[start + 1 : start + size + 1] = store.stack_cards[
+            start : start + size
+        ]
+        store.stack_cards[start] = card.index
+        store.stack_sizes[self._size_index] = size + 1
+
+    def pop_top(self) -> Card:
+        card = self.top_card
+        self._store.stack_sizes[self._size_index] -= 1
+        return card
+
+    def pop_bottom(self) -> Card:
+        store = self._store
+        start = self._start
+        size = store.stack_sizes[self._size_index]
+        card = CardSet.members[store.stack_cards[start]]
+        store.stack_cards[start : start + size - 1] = store.stack_cards[
+            start + 1 : start + size
+        ]
+        store.stack_sizes[self._size_index] = size - 1
+        return card
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (StoredCardStack, CardStack)):
+            return tuple(self.stack) == tuple(other.stack) and self.splay == other.splay
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"StoredCardStack(stack={list(self.stack)!r}, splay={self.splay})"
+
+
+class StoredBoard(MutableMapping):
+    """The board of a PlayerStore slot, mapping the colors the player has a stack for."""
+
+    __slots__ = ("_store", "_slot", "_stacks")
+
+    def __init__(self, store: PlayerStore, slot: int):
+        self._store = store
+        self._slot = slot
+        self._stacks = [StoredCardStack(store, slot, color) for color in COLORS]
+
+    def _has_stack(self, color: Color) -> bool:
+        index = self._slot * len(COLORS) + COLOR_INDEX[color]
+        return self._store.splays[index] != NO_STACK
+
+    def __getitem__(self, color: Color) -> StoredCardStack:
+        if color not in COLOR_INDEX or not self._has_stack(color):
+            raise KeyError(color)
+
+        return self._stacks[COLOR_INDEX[color]]
+
+    def __setitem__(self, color: Color, card_stack: CardStack):
+        cards = list(card_stack.stack)
+        stored_stack = self._stacks[COLOR_INDEX[color]]
+        start = stored_stack._start
+
+        self._store.stack_cards[start : start + len(cards)] = bytes(
+            card.index for card in cards
+        )
+        self._store.stack_sizes[stored_stack._size_index] = len(cards)
+        stored_stack.splay = card_stack.splay
+
+    def __delitem__(self, color: Color):
+        stored_stack = self[color]
+        self._store.stack_sizes[stored_stack._size_index] = 0
+        self._store.splays[stored_stack._size_index] = NO_STACK
+
+    def __iter__(self) -> Iterator[Color]:
+        return (color for color in COLORS if self._has_stack(color))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def setdefault(self, color: Color, default: CardStack = None) -> StoredCardStack:
+        # Hand out the stored stack rather than the default, so changes to it are kept
+        if color not in self:
+            self[color] = default
+
+        return self[color]
+
+
+class StoredPlayer(Player):
+    """A Player view over a PlayerStore slot. Use PlayerStore.player to get one."""
+
+    # Views are cached in a WeakValueDictionary
+    __slots__ = ("__weakref__",)
+
+    def __init__(self, store: PlayerStore, game_index: int, player_id: int):
+        slot = store.slot(game_index, player_id)
+        card_bytes = store.card_mask_bytes
+        achievement_bytes = store.achievement_mask_bytes
+
+        self.id = player_id
+        self.board = StoredBoard(store, slot)
+        self.hand = StoredCardSet(
+            store.hands, slot * card_bytes, (slot + 1) * card_bytes
+        )
+        self.score_pile = StoredCardSet(
+            store.score_piles, slot * card_bytes, (slot + 1) * card_bytes
+        )
+        self.achievements = StoredAchievementSet(
+            store.achievements,
+            slot * achievement_bytes,
+            (slot + 1) * achievement_bytes,
+        )
+        self.version = 0
+        self._memo = {}
+
+
+class PlayerStore:
+    """
+    The players of num_games games of num_players players each, in flat buffers (see above).
+
+    Players are written into their slot with store and read back as StoredPlayer views. Views are
+    shared while alive, so every change to a slot goes through the same memoized properties.
+    """
+
+    def __init__(self, num_games: int, num_players: int):
+        self.num_games = num_games
+        self.num_players = num_players
+        num_slots = num_games * num_players
+
+        self.color_offsets: Dict[Color, int] = {}
+        board_size = 0
+        for color in COLORS:
+            self.color_offsets[color] = board_size
+            board_size += sum(1 for card in CardSet.members if card.color == color)
+        self.board_size = board_size
+
+        self.card_mask_bytes = CardSet.mask_num_bytes
+        self.achievement_mask_bytes = AchievementSet.mask_num_bytes
+
+        self.hands = bytearray(num_slots * self.card_mask_bytes)
+        self.score_piles = bytearray(num_slots * self.card_mask_bytes)
+        self.achievements = bytearray(num_slots * self.achievement_mask_bytes)
+        self.stack_cards = bytearray(num_slots * board_size)
+        self.stack_sizes = bytearray(num_slots * len(COLORS))
+        self.splays = bytearray(num_slots * len(COLORS))
+
+        self._views = weakref.WeakValueDictionary()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(map(len, self.buffers))
+
+    @property
+    def buffers(self) -> List[bytearray]:
+        return [
+            self.hands,
+            self.score_piles,
+            self.achievements,
+            self.stack_cards,
+            self.stack_sizes,
+            self.splays,
+        ]
+
+    def slot(self, game_index: int, player_id: int) -> int:
+        if not 0 <= game_index < self.num_games or not (
+            0 <= player_id < self.num_players
+        ):
+            raise IndexError(f"No player {player_id} in game {game_index}")
+
+        return game_index * self.num_players + player_id
+
+    def player(self, game_index: int, player_id: int) -> StoredPlayer:
+        key = self.slot(game_index, player_id)
+        player = self._views.get(key)
+
+        if player is None:
+            player = self._views[key] = StoredPlayer(self, game_index, player_id)
+
+        return player
+
+    def players(self, game_index: int) -> Set[StoredPlayer]:
+        return {
+            self.player(game_index, player_id) for player_id in range(self.num_players)
+        }
+
+    def store(self, game_index: int, player: Player) -> StoredPlayer:
+        """Copy the zones of a player into its slot of the given game."""
+        stored = self.player(game_index, player.id)
+        stored.hand.mask = CardSet(player.hand).mask
+        stored.score_pile.mask = CardSet(player.score_pile).mask
+        stored.achievements.mask = AchievementSet(player.achievements).mask
+
+        for color in COLORS:
+            if color in player.board:
+                stored.board[color] = player.board[color]
+            elif color in stored.board:
+                del stored.board[color]
+
+        stored.changed()
+        return stored
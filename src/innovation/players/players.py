@@ -1,64 +1,144 @@
-from src.innovation.cards.achievements import Achievement
+from __future__ import annotations
+from src.innovation.cards.achievements import Achievement, AchievementSet
 from src.innovation.cards.cards import (
     Card,
+    CardSet,
     CardStack,
     Color,
     SplayDirection,
     SymbolType,
+    SymbolVector,
+    symbol_vector_to_dict,
 )
 from collections import deque
-from dataclasses import dataclass
-from typing import Set, Dict
+from operator import add
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Set, Dict
 
 
-@dataclass
+def memoized_property(function: Callable) -> property:
+    """A property computed once per Player version. Its value must not be mutated."""
+    name = function.__name__
+
+    @wraps(function)
+    def getter(self):
+        memo = self._memo
+        if name in memo:
+            return memo[name]
+
+        value = memo[name] = function(self)
+        return value
+
+    return property(getter)
+
+
+@dataclass(slots=True)
 class Player:
     id: int
     board: Dict[Color, CardStack]
     hand: Set[Card]
     score_pile: Set[Card]
     achievements: Set[Achievement]
+    # Bumped by changed on every change to the hand, board, score pile or splays
+    version: int = field(default=0, init=False, repr=False, compare=False)
+    # Values of the memoized properties at the current version
+    _memo: Dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_zones(
+        cls,
+        id: int,
+        board: Dict[Color, CardStack],
+        hand: CardSet,
+        score_pile: CardSet,
+        achievements: AchievementSet,
+    ) -> Player:
+        """A player of zones that are already index sets, skipping the coercion of __init__."""
+        player = cls.__new__(cls)
+        player.id = id
+        player.board = board
+        player.hand = hand
+        player.score_pile = score_pile
+        player.achievements = achievements
+        player.version = 0
+        player._memo = {}
+        return player
+
+    def __post_init__(self):
+        # Zones made up only of registered cards are stored as bitsets
+        self.hand = CardSet.coerce(self.hand)
+        self.score_pile = CardSet.coerce(self.score_pile)
+        self.achievements = AchievementSet.coerce(self.achievements)
 
     @property
     def score(self) -> int:
+        # CardSet keeps its age total cached until its mask changes
+        if isinstance(self.score_pile, CardSet):
+            return self.score_pile.age_total
+
         return sum(card.age for card in self.score_pile)
 
-    @property
+    @memoized_property
     def top_cards(self) -> Set[Card]:
-        return {
-            card_stack.top_card
-            for card_stack in self.board.values()
-            if not card_stack.is_empty
-        }
+        return CardSet.coerce(
+            {
+                card_stack.top_card
+                for card_stack in self.board.values()
+                if not card_stack.is_empty
+            }
+        )
 
-    @property
+    @memoized_property
     def max_age_top_card(self) -> int:
-        if len(self.top_cards) == 0:
-            return 1
+        return max(
+            (
+                card_stack.top_card.age
+                for card_stack in self.board.values()
+                if not card_stack.is_empty
+            ),
+            default=1,
+        )
 
-        return max(top_card.age for top_card in self.top_cards)
-
-    @property
+    @memoized_property
     def colors_with_cards(self) -> Set[Color]:
         return {
-            color
-            for color in self.board.keys()
-            if color in self.board and not self.board[color].is_empty()
+            color for color, card_stack in self.board.items() if not card_stack.is_empty
         }
 
-    @property
+    @memoized_property
     def splayable_colors(self) -> Set[Color]:
         return {color for color in self.board if self.board[color].can_splay}
 
-    @property
+    @memoized_property
+    def symbol_vector(self) -> SymbolVector:
+        symbol_vector = (0,) * len(SymbolType)
+
+        for card_stack in self.board.values():
+            symbol_vector = tuple(map(add, symbol_vector, card_stack.symbol_vector))
+
+        return symbol_vector
+
+    @memoized_property
     def symbol_count(self) -> Dict[SymbolType, int]:
-        card_stacks = self.board.values()
-        return {
-            symbol_type: sum(
-                stack.symbol_count.get(symbol_type, 0) for stack in card_stacks
-            )
-            for symbol_type in SymbolType
-        }
+        return symbol_vector_to_dict(self.symbol_vector)
+
+    def changed(self):
+        """Invalidate the memoized properties. Called by every change to the player's zones."""
+        self.version += 1
+        self._memo.clear()
+
+    def fork(self) -> Player:
+        # Cards are shared by reference, only the zones holding them are copied
+        return Player(
+            self.id,
+            {color: card_stack.fork() for color, card_stack in self.board.items()},
+            self.hand.copy(),
+            self.score_pile.copy(),
+            self.achievements.copy(),
+        )
 
     def meld(self, card: Card):
         color = card.color
@@ -66,8 +146,9 @@ class Player:
         if color not in self.board:
             self.board[color] = CardStack(deque(), SplayDirection.NONE)
 
-        self.board[color].stack.append(card)
+        self.board[color].meld(card)
         self.hand.remove(card)
+        self.changed()
 
     def __eq__(self, other):
         return isinstance(other, Player) and self.id == other.id
@@ -0,0 +1,224 @@
+from __future__ import annotations
+from src.innovation.utils.registry import Registerable
+from collections.abc import MutableSet, Set as AbstractSet
+from typing import Iterable, Iterator, Tuple, Type
+
+
+class IndexedSet(MutableSet):
+    """
+    A set of registered members stored as an int bitmask over their dense registry indices.
+
+    Subclasses are bound to a single registry with index_members, after which set algebra between
+    two instances is a single integer operation. Mixing in members that were never indexed falls
+    back to a plain python set.
+    """
+
+    __slots__ = ("mask",)
+
+    member_type: Type[Registerable] = Registerable
+    members: Tuple[Registerable, ...] = ()
+    # Bytes needed to hold a mask over every member, at least one
+    mask_num_bytes: int = 1
+
+    def __init__(self, members: Iterable[Registerable] = ()):
+        mask = 0
+
+        for member in members:
+            mask |= 1 << self._index_of(member)
+
+        self.mask = mask
+
+    @classmethod
+    def index_members(cls, members: Iterable[Registerable]):
+        cls.members = tuple(members)
+        cls.mask_num_bytes = max((len(cls.members) + 7) // 8, 1)
+
+        for index, member in enumerate(cls.members):
+            member.index = index
+
+    @classmethod
+    def from_mask(cls, mask: int) -> IndexedSet:
+        indexed_set = cls.__new__(cls)
+        indexed_set.mask = mask
+        return indexed_set
+
+    @classmethod
+    def is_indexed(cls, member) -> bool:
+        return isinstance(member, cls.member_type) and member.index is not None
+
+    @classmethod
+    def coerce(cls, members: Iterable[Registerable]):
+        if isinstance(members, cls):
+            return members
+
+        if all(cls.is_indexed(member) for member in members):
+            return cls(members)
+
+        return members
+
+    @classmethod
+    def _from_iterable(cls, members: Iterable[Registerable]):
+        members = list(members)
+
+        if all(cls.is_indexed(member) for member in members):
+            return cls(members)
+
+        return set(members)
+
+    @classmethod
+    def _index_of(cls, member: Registerable) -> int:
+        if not cls.is_indexed(member):
+            raise TypeError(f"{member!r} is not indexed by {cls.__name__}")
+
+        return member.index
+
+    def __contains__(self, member) -> bool:
+        return self.is_indexed(member) and bool(self.mask >> member.index & 1)
+
+    def __iter__(self) -> Iterator[Registerable]:
+        members = self.members
+        mask = self.mask
+
+        while mask:
+            lowest_bit = mask & -mask
+            yield members[lowest_bit.bit_length() - 1]
+            mask ^= lowest_bit
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return bool(self.mask)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is type(self):
+            return self.mask == other.mask
+
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __le__(self, other) -> bool:
+        if type(other) is type(self):
+            return self.mask & ~other.mask == 0
+
+        return super().__le__(other)
+
+    def __ge__(self, other) -> bool:
+        if type(other) is type(self):
+            return other.mask & ~self.mask == 0
+
+        return super().__ge__(other)
+
+    def __or__(self, other):
+        if type(other) is type(self):
+            return self.from_mask(self.mask | other.mask)
+
+        return super().__or__(other)
+
+    def __and__(self, other):
+        if type(other) is type(self):
+            return self.from_mask(self.mask & other.mask)
+
+        return super().__and__(other)
+
+    def __sub__(self, other):
+        if type(other) is type(self):
+            return self.from_mask(self.mask & ~other.mask)
+
+        return super().__sub__(other)
+
+    def __xor__(self, other):
+        if type(other) is type(self):
+            return self.from_mask(self.mask ^ other.mask)
+
+        return super().__xor__(other)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __ior__(self, other):
+        if type(other) is type(self):
+            self.mask |= other.mask
+            return self
+
+        return super().__ior__(other)
+
+    def __iand__(self, other):
+        if type(other) is type(self):
+            self.mask &= other.mask
+            return self
+
+        return super().__iand__(other)
+
+    def __isub__(self, other):
+        if type(other) is type(self):
+            self.mask &= ~other.mask
+            return self
+
+        return super().__isub__(other)
+
+    def add(self, member: Registerable):
+        self.mask |= 1 << self._index_of(member)
+
+    def discard(self, member: Registerable):
+        if self.is_indexed(member):
+            self.mask &= ~(1 << member.index)
+
+    def remove(self, member: Registerable):
+        if member not in self:
+            raise KeyError(member)
+
+        self.mask &= ~(1 << member.index)
+
+    def clear(self):
+        self.mask = 0
+
+    def copy(self) -> IndexedSet:
+        return self.from_mask(self.mask)
+
+    def union(self, *others: Iterable[Registerable]):
+        result = self
+        for other in others:
+            result = result | _as_set(other)
+        return result if result is not self else self.copy()
+
+    def intersection(self, *others: Iterable[Registerable]):
+        result = self
+        for other in others:
+            result = result & _as_set(other)
+        return result if result is not self else self.copy()
+
+    def difference(self, *others: Iterable[Registerable]):
+        result = self
+        for other in others:
+            result = result - _as_set(other)
+        return result if result is not self else self.copy()
+
+    def update(self, *others: Iterable[Registerable]):
+        for other in others:
+            for member in other:
+                self.add(member)
+
+    def issubset(self, other: Iterable[Registerable]) -> bool:
+        return self <= _as_set(other)
+
+    def issuperset(self, other: Iterable[Registerable]) -> bool:
+        return self >= _as_set(other)
+
+    def __reduce__(self):
+        return type(self).from_mask, (self.mask,)
+
+    def __copy__(self) -> IndexedSet:
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> IndexedSet:
+        return self.copy()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({{{', '.join(repr(member.name) for member in self)}}})"
+
+
+def _as_set(members: Iterable[Registerable]) -> AbstractSet:
+    return members if isinstance(members, AbstractSet) else set(members)
@@ -1,13 +1,15 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from frozendict import frozendict
 from typing import List
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class Registerable(ABC):
     name: str
+    # Dense position within the registry, assigned by IndexedSet.index_members
+    index: int = field(default=None, init=False, repr=False, compare=False)
 
     def __eq__(self, other):
         return isinstance(other, Registerable) and self.name == other.name
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from hashlib import blake2b
+from random import Random
+import os
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def splitmix64(value: int) -> int:
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK_64
+    return value ^ (value >> 31)
+
+
+def derive_seed(*path: int) -> int:
+    """A 64 bit seed determined by the path alone, unrelated to the seeds of any other path."""
+    digest = blake2b(":".join(map(str, path)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class RngStream(Random):
+    """
+    A Random seeded by a path of ints, such as (master seed, game index), that splits into
+    independent child streams by extending the path.
+
+    Streams never share state, so every game of a batch (and every seat within a game) can be
+    reproduced bit for bit from its path, whatever process or order the batch was played in.
+
+    The stream is counter based: its nth output is splitmix64(key + n * GOLDEN_GAMMA), the
+    SplitMix64 sequence of the key derived from the path. The whole state is the key, the
+    counter and Random's cached gauss value, small enough to be part of GameState.to_bytes.
+    """
+
+    def __init__(self, *path: int):
+        self.path = path
+        super().__init__(derive_seed(*path))
+
+    def seed(self, a: int = None, version: int = 2):
+        # Called by Random.__init__. The Mersenne Twister state of Random is left unused.
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        elif not isinstance(a, int):
+            a = derive_seed(a)
+
+        self.key = a & MASK_64
+        self.counter = 0
+        self.gauss_next = None
+
+    def getstate(self) -> tuple:
+        return self.key, self.counter, self.gauss_next
+
+    def setstate(self, state: tuple):
+        self.key, self.counter, self.gauss_next = state
+
+    def next64(self) -> int:
+        self.counter += 1
+        return splitmix64(self.key + self.counter * GOLDEN_GAMMA & MASK_64)
+
+    def random(self) -> float:
+        return (self.next64() >> 11) * 2.0**-53
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 64:
+            if k < 0:
+                raise ValueError("number of bits must be non-negative")
+            return self.next64() >> 64 - k if k else 0
+
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self.next64() << shift
+
+        return bits & (1 << k) - 1
+
+    @classmethod
+    def restore(cls, path: tuple, state: tuple) -> RngStream:
+        """The stream of the given path at a state returned by getstate."""
+        # Skips deriving the key from the path, the state replaces it anyway
+        stream = cls.__new__(cls)
+        stream.path = path
+        stream.setstate(state)
+        return stream
+
+    def split(self, *key: int) -> RngStream:
+        return RngStream(*self.path, *key)
+
+    def __reduce__(self):
+        # Random pickles and copies without its constructor arguments, keep the path
+        return _restore_stream, (self.path, self.getstate())
+
+    def __repr__(self) -> str:
+        return f"RngStream{self.path}"
+
+
+def _restore_stream(path, state) -> RngStream:
+    return RngStream.restore(path, state)
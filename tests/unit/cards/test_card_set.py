@@ -0,0 +1,194 @@
+from src.innovation.cards.achievement_registry import GLOBAL_ACHIEVEMENTS_REGISTRY
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
+from src.innovation.cards.cards import (
+    CardSet,
+    MAX_AGE,
+    Position,
+    Symbol,
+    SymbolType,
+    cards_with_symbol,
+    filter_cards_by_symbol,
+    get_cards_of_age,
+    get_highest_cards,
+    get_lowest_cards,
+)
+from src.innovation.players.players import Player
+from copy import deepcopy
+import pickle
+import pytest
+from mock import Mock
+
+
+def get_cards(*card_names):
+    return [GLOBAL_CARD_REGISTRY.registry.get(card_name) for card_name in card_names]
+
+
+def test_card_indices_are_dense():
+    cards = GLOBAL_CARD_REGISTRY.registry.values()
+    assert sorted(card.index for card in cards) == list(range(len(cards)))
+    assert all(CardSet.members[card.index] is card for card in cards)
+
+
+@pytest.mark.parametrize(
+    "left_names, right_names",
+    [
+        ([], []),
+        (["Archery"], []),
+        (["Archery", "Oars"], ["Oars", "Optics"]),
+        (["Feudalism", "Sailing", "Currency"], ["Archery", "Feudalism", "Sailing"]),
+    ],
+)
+def test_card_set_algebra_matches_set(left_names, right_names):
+    left, right = set(get_cards(*left_names)), set(get_cards(*right_names))
+    left_card_set, right_card_set = CardSet(left), CardSet(right)
+
+    assert left_card_set == left
+    assert left == left_card_set
+    assert len(left_card_set) == len(left)
+    assert set(left_card_set) == left
+    assert bool(left_card_set) == bool(left)
+
+    assert left_card_set | right_card_set == left | right
+    assert left_card_set & right_card_set == left & right
+    assert left_card_set - right_card_set == left - right
+    assert left_card_set ^ right_card_set == left ^ right
+    assert left_card_set - right == left - right
+    assert left - right_card_set == left - right
+    assert left_card_set.union(right) == left.union(right)
+    assert set().union(left_card_set, right_card_set) == left | right
+    assert left_card_set.issubset(right) == left.issubset(right)
+
+    assert isinstance(left_card_set - right_card_set, CardSet)
+    assert all(card in left_card_set for card in left)
+    assert not any(card in left_card_set for card in right - left)
+
+
+def test_card_set_mutation():
+    archery, oars = get_cards("Archery", "Oars")
+    card_set = CardSet()
+
+    card_set.add(archery)
+    card_set.add(oars)
+    card_set.remove(archery)
+    card_set.discard(archery)
+
+    assert card_set == {oars}
+
+    with pytest.raises(KeyError):
+        card_set.remove(archery)
+
+    with pytest.raises(TypeError):
+        card_set.add(Mock())
+
+
+def test_card_set_copies_are_independent():
+    archery, oars = get_cards("Archery", "Oars")
+    card_set = CardSet([archery])
+
+    for copied in (
+        card_set.copy(),
+        deepcopy(card_set),
+        pickle.loads(pickle.dumps(card_set)),
+    ):
+        copied.add(oars)
+        assert copied == {archery, oars}
+        assert card_set == {archery}
+
+
+def test_unindexed_members_fall_back_to_set():
+    mock_card = Mock()
+    card_set = CardSet(get_cards("Archery"))
+
+    assert mock_card not in card_set
+    assert card_set | {mock_card} == set(get_cards("Archery")) | {mock_card}
+    assert CardSet.coerce({mock_card}) == {mock_card}
+    assert not isinstance(CardSet.coerce({mock_card}), CardSet)
+
+
+def test_player_zones_are_card_sets():
+    achievement = GLOBAL_ACHIEVEMENTS_REGISTRY.registry.get("Monument")
+    player = Player(0, {}, set(get_cards("Archery")), set(), {achievement})
+
+    assert isinstance(player.hand, CardSet)
+    assert isinstance(player.score_pile, CardSet)
+    assert isinstance(player.achievements, AchievementSet)
+    assert player.achievements == {achievement}
+
+
+def test_cards_are_indexed_in_age_order():
+    ages = [card.age for card in CardSet.members]
+    assert ages == sorted(ages)
+
+
+@pytest.mark.parametrize(
+    "card_names",
+    [
+        [],
+        ["Archery"],
+        ["Archery", "Oars", "Currency"],
+        ["Optics", "Feudalism", "Sailing", "Calendar"],
+        ["Currency", "Calendar"],
+    ],
+)
+def test_age_queries_match_set(card_names):
+    cards = set(get_cards(*card_names))
+    card_set = CardSet(cards)
+
+    assert get_highest_cards(card_set) == get_highest_cards(cards)
+    assert get_lowest_cards(card_set) == get_lowest_cards(cards)
+    assert card_set.age_total == sum(card.age for card in cards)
+
+    for age in range(1, MAX_AGE + 1):
+        assert get_cards_of_age(card_set, age) == {
+            card for card in cards if card.age == age
+        }
+
+    if cards:
+        assert card_set.highest_age == max(card.age for card in cards)
+        assert card_set.lowest_age == min(card.age for card in cards)
+
+
+def test_player_score_is_running_total():
+    archery, currency, optics = get_cards("Archery", "Currency", "Optics")
+    player = Player(0, {}, set(), {archery}, set())
+    assert player.score == 1
+
+    player.score_pile.add(optics)
+    player.score_pile.add(optics)
+    assert player.score == 4
+
+    player.score_pile.discard(archery)
+    player.score_pile |= CardSet([currency])
+    assert player.score == 5
+
+    player.score_pile.remove(currency)
+    assert player.score == 3
+
+
+@pytest.mark.parametrize("symbol_type", list(SymbolType))
+def test_symbol_index_matches_scan(symbol_type):
+    cards = GLOBAL_CARD_REGISTRY.registry.values()
+    expected = {
+        card
+        for card in cards
+        if any(symbol.symbol_type == symbol_type for symbol in card.symbols)
+    }
+
+    assert CardSet.all_with_symbol(symbol_type) == expected
+    assert all(
+        card.has_symbol_type(symbol_type) == (card in expected) for card in cards
+    )
+
+    for position in Position:
+        assert CardSet.all_with_symbol(symbol_type, position) == {
+            card for card in cards if Symbol(symbol_type, position) in card.symbols
+        }
+
+    hand = CardSet(get_cards("Archery", "Sailing", "Optics", "Feudalism"))
+    assert cards_with_symbol(hand, symbol_type) == cards_with_symbol(
+        set(hand), symbol_type
+    )
+    assert filter_cards_by_symbol(hand, symbol_type, has_symbol=False) == {
+        card for card in hand if card not in expected
+    }
@@ -1,11 +1,19 @@
+from src.innovation.cards.card_effects import Draw, Splay
+from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
 from src.innovation.cards.cards import (
+    CardLocation,
     CardStack,
+    VISIBLE_POSITIONS,
+    SYMBOLS,
     Symbol,
     SymbolType,
     Position,
     SplayDirection,
 )
+from src.innovation.players.players import Player
 from collections import deque
+from copy import deepcopy
+import pickle
 import pytest
 from mock import Mock
 
@@ -130,3 +138,97 @@ def test_symbol_count(cards, splay_direction, expected_symbols):
 def test_can_splay(splay_direction, num_cards, can_splay):
     stack = CardStack(deque([Mock() for _ in range(num_cards)]), splay_direction)
     assert stack.can_splay is can_splay
+
+
+def rescan_symbol_count(stack: CardStack):
+    symbol_count = {symbol_type: 0 for symbol_type in SymbolType}
+    cards = list(stack.stack)
+
+    for index, card in enumerate(cards):
+        for symbol in card.symbols:
+            if (
+                index == len(cards) - 1
+                or symbol.position in VISIBLE_POSITIONS[stack.splay]
+            ):
+                symbol_count[symbol.symbol_type] += 1
+
+    return symbol_count
+
+
+@pytest.mark.parametrize(
+    "operations",
+    [
+        [("meld", "Archery"), ("meld", "Oars"), ("meld", "Construction")],
+        [("tuck", "Archery"), ("tuck", "Oars"), ("meld", "Engineering"), ("pop",)],
+        [("meld", "Archery"), ("pop",), ("tuck", "Oars"), ("pop",)],
+        [
+            ("meld", "Archery"),
+            ("meld", "Oars"),
+            ("splay", SplayDirection.RIGHT),
+            ("tuck", "Metalworking"),
+            ("splay", SplayDirection.UP),
+            ("pop",),
+            ("splay", SplayDirection.LEFT),
+            ("meld", "Optics"),
+        ],
+    ],
+)
+def test_symbol_count_is_maintained_incrementally(operations):
+    stack = CardStack(deque(), SplayDirection.NONE)
+    assert stack.symbol_count == rescan_symbol_count(stack)
+
+    for operation, *args in operations:
+        if operation == "meld":
+            stack.meld(GLOBAL_CARD_REGISTRY.registry.get(args[0]))
+        elif operation == "tuck":
+            stack.tuck(GLOBAL_CARD_REGISTRY.registry.get(args[0]))
+        elif operation == "pop":
+            stack.pop_top()
+        else:
+            stack.splay = args[0]
+
+        for splay_direction in SplayDirection:
+            stack.splay, original_splay = splay_direction, stack.splay
+            assert stack.symbol_count == rescan_symbol_count(stack)
+            stack.splay = original_splay
+
+
+def test_pop_top_returns_top_card():
+    archery = GLOBAL_CARD_REGISTRY.registry.get("Archery")
+    oars = GLOBAL_CARD_REGISTRY.registry.get("Oars")
+    stack = CardStack(deque([archery, oars]), SplayDirection.NONE)
+
+    assert stack.pop_top() == oars
+    assert stack.top_card == archery
+
+
+def test_symbols_are_interned():
+    symbols = [
+        symbol
+        for card in GLOBAL_CARD_REGISTRY.registry.values()
+        for symbol in card.symbols
+    ]
+
+    assert len(SYMBOLS) == len(SymbolType) * len(Position)
+    assert {id(symbol) for symbol in symbols} <= {id(s) for s in SYMBOLS.values()}
+
+    symbol = Symbol(SymbolType.CROWN, Position.BOTTOM_LEFT)
+    assert symbol is SYMBOLS[(SymbolType.CROWN, Position.BOTTOM_LEFT)]
+    assert deepcopy(symbol) is symbol
+    assert pickle.loads(pickle.dumps(symbol)) is symbol
+
+
+def test_game_objects_have_no_instance_dict():
+    archery = GLOBAL_CARD_REGISTRY.registry.get("Archery")
+    card_stack = CardStack(deque([archery]), SplayDirection.NONE)
+    player = Player(0, {archery.color: card_stack}, set(), set(), set())
+
+    for instance in (
+        archery,
+        archery.symbols[0],
+        card_stack,
+        player,
+        Draw(player, lambda cards: CardLocation.HAND),
+        Splay(player, set(), set()),
+    ):
+        assert not hasattr(instance, "__dict__")
@@ -0,0 +1,45 @@
+from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
+from src.innovation.game.choices import CardChoices
+from itertools import combinations
+import pytest
+
+CARDS = list(GLOBAL_CARD_REGISTRY.registry.values())[:6]
+
+
+@pytest.mark.parametrize(
+    "num_cards, min_cards, max_cards",
+    [
+        (6, 1, 6),
+        (6, 0, 3),
+        (6, 2, 2),
+        (4, 0, 0),
+        (4, 3, 10),
+        (0, 1, 3),
+    ],
+)
+def test_card_choices(num_cards, min_cards, max_cards):
+    cards = CARDS[:num_cards]
+    expected = [
+        choice
+        for size in range(min(min_cards, num_cards), min(max_cards, num_cards) + 1)
+        for choice in combinations(cards, size)
+    ]
+    choices = CardChoices(cards, min_cards, max_cards)
+
+    assert len(choices) == len(expected)
+    assert list(choices) == expected
+    assert [choices[index] for index in range(len(choices))] == expected
+    assert choices[-1] == expected[-1]
+
+    with pytest.raises(IndexError):
+        choices[len(choices)]
+
+
+def test_card_choices_are_lazy():
+    cards = list(GLOBAL_CARD_REGISTRY.registry.values())
+    choices = CardChoices(cards, 1, len(cards))
+
+    assert len(choices) == 2 ** len(cards) - 1
+    assert choices[0] == (cards[0],)
+    assert choices[-1] == tuple(cards)
+    assert choices[len(cards)] == (cards[0], cards[1])
@@ -0,0 +1,374 @@
+from src.innovation.cards.card_registry import (
+    GLOBAL_CARD_REGISTRY,
+    AgricultureDogma,
+    AlchemyDogma2,
+    CanalBuildingDogma,
+    MetalWorkingDogma,
+    WheelDogma,
+)
+from src.innovation.cards.achievement_registry import MONUMENT
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.card_effects import Draw
+from src.innovation.cards.cards import CardLocation, CardSet, CardStack, SplayDirection
+from src.innovation.game.choosers import FirstChoiceChooser, RandomChooser
+from src.innovation.game.effect_interpreter import (
+    DecisionType,
+    EffectInterpreter,
+    GameOver,
+    ask_chooser,
+)
+from src.innovation.game.game_loop import legal_actions, perform_action, play_game
+from src.innovation.game.game_setup import initialize_gamestate
+from src.innovation.game.gamestate import GameState
+from src.innovation.game.zobrist import compute_zobrist_hash
+from src.innovation.players.players import Player
+from collections import deque
+from random import Random
+import pytest
+import random
+
+
+def get_cards(*card_names):
+    return [GLOBAL_CARD_REGISTRY.registry.get(card_name) for card_name in card_names]
+
+
+def build_board(*card_names):
+    board = {}
+
+    for card in get_cards(*card_names):
+        board.setdefault(card.color, CardStack(deque(), SplayDirection.NONE))
+        board[card.color].meld(card)
+
+    return board
+
+
+def build_interpreter(players, draw_decks):
+    # Games need two players, the effects under test leave the added opponent alone
+    if len(players) < 2:
+        players = [*players, build_player(len(players))]
+
+    game_state = GameState(
+        {age: deque(get_cards(*deck)) for age, deck in draw_decks.items()},
+        AchievementSet(),
+        set(players),
+    )
+    choosers = [FirstChoiceChooser() for _ in players]
+
+    return EffectInterpreter(game_state, choosers)
+
+
+def build_player(player_id, hand=(), board=(), score_pile=()):
+    return Player(
+        player_id,
+        build_board(*board),
+        CardSet(get_cards(*hand)),
+        CardSet(get_cards(*score_pile)),
+        AchievementSet(),
+    )
+
+
+def test_draw_repeats_while_repeat_effect_holds():
+    player = build_player(0)
+    interpreter = build_interpreter(
+        [player], {1: ["Agriculture", "Masonry", "Archery"]}
+    )
+
+    interpreter.execute(
+        MetalWorkingDogma.dogma_effect(interpreter.game_state, player), player
+    )
+
+    assert player.score_pile == set(get_cards("Archery", "Masonry"))
+    assert player.hand == set(get_cards("Agriculture"))
+
+
+def test_draw_runs_on_completion_chain():
+    player = build_player(0)
+    interpreter = build_interpreter([player], {1: ["Oars", "Sailing", "Pottery"]})
+
+    interpreter.execute(WheelDogma.dogma_effect(interpreter.game_state, player), player)
+
+    assert player.hand == set(get_cards("Pottery", "Sailing"))
+    assert list(interpreter.game_state.draw_decks[1]) == get_cards("Oars")
+
+
+def test_draw_num_cards_and_tuck():
+    player = build_player(0, board=["Archery"])
+    interpreter = build_interpreter([player], {1: ["Oars", "Metalworking", "Tools"]})
+
+    interpreter.execute(
+        Draw(
+            target_player=player,
+            draw_location=lambda _: CardLocation.BOARD,
+            level=1,
+            num_cards=2,
+            tuck=True,
+        ),
+        player,
+    )
+
+    assert list(player.board[get_cards("Archery")[0].color].stack) == get_cards(
+        "Metalworking", "Archery"
+    )
+    assert player.board[get_cards("Tools")[0].color].top_card == get_cards("Tools")[0]
+
+
+def test_tuck_flag_of_draws_to_other_zones_is_ignored():
+    player = build_player(0, board=["Oars"])
+    interpreter = build_interpreter([player], {1: ["Tools", "Sailing"]})
+    mark = interpreter.game_state.mark()
+
+    interpreter.execute(
+        Draw(
+            target_player=player,
+            draw_location=lambda _: CardLocation.HAND,
+            level=1,
+            tuck=True,
+        ),
+        player,
+    )
+    interpreter.game_state.draw(player, 1, CardLocation.SCORE_PILE, tuck=True)
+
+    assert player.hand == set(get_cards("Sailing"))
+    assert player.score_pile == set(get_cards("Tools"))
+    assert interpreter.game_state.achievement_tracker.turn_counts(player.id) == (0, 1)
+    assert interpreter.game_state.zobrist_hash == compute_zobrist_hash(
+        interpreter.game_state
+    )
+
+    interpreter.game_state.rollback(mark)
+    assert not player.hand and not player.score_pile
+
+
+def test_optional_return_then_draw():
+    player = build_player(0, hand=["Writing"])
+    interpreter = build_interpreter([player], {1: [], 2: ["Calendar"]})
+
+    interpreter.execute(
+        AgricultureDogma.dogma_effect(interpreter.game_state, player), player
+    )
+
+    assert not player.hand
+    assert player.score_pile == set(get_cards("Calendar"))
+    assert list(interpreter.game_state.draw_decks[1]) == get_cards("Writing")
+
+
+def test_meld_then_score_the_rest():
+    player = build_player(0, hand=["Archery", "Sailing"])
+    interpreter = build_interpreter([player], {1: []})
+
+    interpreter.execute(
+        AlchemyDogma2.dogma_effect(interpreter.game_state, player), player
+    )
+
+    assert player.top_cards == set(get_cards("Archery"))
+    assert player.score_pile == set(get_cards("Sailing"))
+
+
+def test_exchange_cards():
+    player = build_player(0, hand=["Archery", "Calendar"], score_pile=["Oars", "Tools"])
+    interpreter = build_interpreter([player], {1: []})
+
+    interpreter.execute(
+        CanalBuildingDogma.dogma_effect(interpreter.game_state, player), player
+    )
+
+    assert player.hand == set(get_cards("Archery", "Oars", "Tools"))
+    assert player.score_pile == set(get_cards("Calendar"))
+
+
+@pytest.mark.parametrize(
+    "target_hand, expected_activating_hand",
+    [
+        # A crown is transferred, then the target draws
+        (["Sailing"], []),
+        # Nothing is transferred, so the chained dogma draws for the activating player
+        (["Masonry"], ["Pottery"]),
+    ],
+)
+def test_demand_and_chained_dogma(target_hand, expected_activating_hand):
+    activating_player = build_player(0, board=["Oars"])
+    target_player = build_player(1, hand=target_hand)
+    interpreter = build_interpreter(
+        [activating_player, target_player], {1: ["Pottery"]}
+    )
+
+    interpreter.activate_dogma(activating_player, get_cards("Oars")[0])
+
+    assert activating_player.hand == set(get_cards(*expected_activating_hand))
+    if target_hand == ["Sailing"]:
+        assert activating_player.score_pile == set(get_cards("Sailing"))
+        assert target_player.hand == set(get_cards("Pottery"))
+
+
+def test_sharing_and_sharing_bonus():
+    activating_player = build_player(0, board=["Writing"])
+    # Tools shows as many light bulbs as Writing, so the dogma is shared
+    sharing_player = build_player(1, board=["Tools"])
+    # City States shows none, so it is not
+    other_player = build_player(2, board=["City States"])
+    interpreter = build_interpreter(
+        [activating_player, sharing_player, other_player],
+        {1: ["Archery"], 2: ["Calendar", "Fermenting"]},
+    )
+
+    interpreter.activate_dogma(activating_player, get_cards("Writing")[0])
+
+    assert sharing_player.hand == set(get_cards("Fermenting"))
+    assert activating_player.hand == set(get_cards("Calendar", "Archery"))
+    assert not other_player.hand
+
+
+@pytest.mark.parametrize("num_players", [1, 5])
+def test_unsupported_player_counts_are_rejected(num_players):
+    players = {build_player(player_id) for player_id in range(num_players)}
+
+    # Game states themselves have no Zobrist keys for a fifth player
+    with pytest.raises(ValueError):
+        game_state = GameState({1: deque()}, AchievementSet(), players)
+        EffectInterpreter(game_state, [FirstChoiceChooser()] * num_players)
+
+
+def test_drawing_from_empty_decks_ends_the_game():
+    player = build_player(0)
+    interpreter = build_interpreter([player], {1: [], 2: []})
+
+    with pytest.raises(GameOver) as game_over:
+        interpreter.execute(
+            WheelDogma.dogma_effect(interpreter.game_state, player), player
+        )
+
+    assert game_over.value.winner is None
+
+
+def test_tucking_six_cards_in_a_turn_claims_monument():
+    player = build_player(0)
+    other_player = build_player(1)
+    age_1_cards = [
+        card.name for card in GLOBAL_CARD_REGISTRY.registry.values() if card.age == 1
+    ]
+    interpreter = build_interpreter([player, other_player], {1: age_1_cards})
+    game_state = interpreter.game_state
+    game_state.unclaimed_achievements.add(MONUMENT)
+
+    def draw_and_tuck(num_cards):
+        interpreter.execute(
+            Draw(
+                target_player=player,
+                draw_location=lambda _: CardLocation.BOARD,
+                level=1,
+                num_cards=num_cards,
+                tuck=True,
+            ),
+            player,
+        )
+
+    draw_and_tuck(5)
+    game_state.start_turn()
+    draw_and_tuck(1)
+    assert MONUMENT in game_state.unclaimed_achievements
+
+    draw_and_tuck(5)
+    assert player.achievements == {MONUMENT}
+    assert not game_state.unclaimed_achievements
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_games_run_to_completion(seed):
+    rng = Random(seed)
+    num_players = rng.randint(2, 4)
+    random.seed(seed)
+    game_state = initialize_gamestate(num_players)
+    num_cards = sum(len(deck) for deck in game_state.draw_decks.values()) + sum(
+        len(player.hand) for player in game_state.players
+    )
+
+    result = play_game(
+        game_state, [RandomChooser(Random(rng.random())) for _ in range(num_players)]
+    )
+
+    players = sorted(game_state.players, key=lambda player: player.id)
+    assert result.scores == tuple(player.score for player in players)
+    assert result.winner is None or result.winner in range(num_players)
+    assert game_state.zobrist_hash == compute_zobrist_hash(game_state)
+    assert num_cards == sum(len(deck) for deck in game_state.draw_decks.values()) + sum(
+        len(player.hand)
+        + len(player.score_pile)
+        + sum(len(card_stack.stack) for card_stack in player.board.values())
+        for player in players
+    )
+
+
+def test_suspend_and_resume_from_bytes():
+    player = build_player(0, hand=["Writing"])
+    interpreter = build_interpreter([player], {1: [], 2: ["Calendar"]})
+    interpreter.choosers = [None, None]
+
+    decision = interpreter.execute(
+        AgricultureDogma.dogma_effect(interpreter.game_state, player), player
+    )
+
+    assert decision.decision_type == DecisionType.OPTIONAL
+    assert decision.player is player
+    assert interpreter.game_state.is_suspended
+
+    with pytest.raises(RuntimeError):
+        interpreter.execute(
+            AgricultureDogma.dogma_effect(interpreter.game_state, player), player
+        )
+
+    game_state = GameState.from_bytes(interpreter.game_state.to_bytes())
+    player = min(game_state.players, key=lambda player: player.id)
+
+    assert EffectInterpreter(game_state, [None, None]).resume(True) is None
+    assert not game_state.is_suspended
+    assert not player.hand
+    assert player.score_pile == set(get_cards("Calendar"))
+
+
+def play_suspended_game(seed, serialize):
+    """Play random actions with player 0 deciding from outside, optionally moving the game
+    through to_bytes/from_bytes at every decision. Returns the encoded final state."""
+    random.seed(seed)
+    game_state = initialize_gamestate(3)
+    external_chooser = RandomChooser(Random(seed))
+    choosers = [None] + [RandomChooser(Random(seed + index)) for index in (1, 2)]
+
+    def current_player():
+        return sorted(game_state.players, key=lambda player: player.id)[turn % 3]
+
+    try:
+        for turn in range(60):
+            player = current_player()
+            chooser = choosers[player.id] or external_chooser
+            action = chooser.choose_action(
+                game_state, player, legal_actions(game_state, player)
+            )
+            interpreter = EffectInterpreter(game_state, choosers)
+            decision = perform_action(interpreter, player, action)
+
+            while decision is not None:
+                if serialize:
+                    game_state = GameState.from_bytes(game_state.to_bytes())
+                    interpreter = EffectInterpreter(game_state, choosers)
+                    decision = game_state.pending_decision
+
+                answer = ask_chooser(
+                    external_chooser,
+                    game_state,
+                    decision.decision_type,
+                    decision.player,
+                    decision.options,
+                )
+                decision = interpreter.resume(answer)
+    except GameOver:
+        pass
+
+    assert not game_state.is_suspended
+    return game_state.to_bytes()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_games_resume_identically_after_serialization(seed):
+    assert play_suspended_game(seed, serialize=True) == play_suspended_game(
+        seed, serialize=False
+    )
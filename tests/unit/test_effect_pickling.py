@@ -0,0 +1,80 @@
+from src.innovation.cards.card_registry import ArcheryDemand, GLOBAL_CARD_REGISTRY
+from src.innovation.cards.effect_rules import Rule, bind_rule
+from src.innovation.game.effect_interpreter import EffectInterpreter, GameOver
+from src.innovation.game.effect_pickling import dumps_effects, loads_effects
+from src.innovation.game.game_setup import initialize_gamestate
+from src.innovation.game.gamestate import GameState
+from tests.unit.test_effect_interpreter import FirstChoiceChooser
+from tests.unit.test_gamestate import apply_random_primitives
+from random import Random
+import pytest
+import random
+
+
+def sorted_players(game_state):
+    return sorted(game_state.players, key=lambda player: player.id)
+
+
+def run_effect(game_state, block, activating_player, target_player):
+    choosers = [FirstChoiceChooser() for _ in game_state.players]
+
+    try:
+        EffectInterpreter(game_state, choosers).execute(
+            block, activating_player, target_player
+        )
+    except GameOver:
+        pass
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pickled_effects_resume_on_another_game_state(seed):
+    random.seed(seed)
+    game_state = initialize_gamestate(3)
+    apply_random_primitives(game_state, Random(seed), 60)
+    data = game_state.to_bytes()
+
+    for card in GLOBAL_CARD_REGISTRY.registry.values():
+        for entry in card.dogma_table:
+            original = GameState.from_bytes(data)
+            activating_player, target_player = sorted_players(original)[:2]
+
+            if entry.is_demand:
+                block = entry.effect(original, activating_player, target_player)
+            else:
+                target_player = None
+                block = entry.effect(original, activating_player)
+
+            resumed = GameState.from_bytes(data)
+            resumed_players = sorted_players(resumed)
+            loaded_block = loads_effects(dumps_effects(block), resumed)
+
+            run_effect(original, block, activating_player, target_player)
+            run_effect(
+                resumed,
+                loaded_block,
+                resumed_players[0],
+                target_player and resumed_players[1],
+            )
+
+            assert resumed.to_bytes() == original.to_bytes(), card.name
+
+
+def test_players_are_pickled_by_id():
+    random.seed(0)
+    game_state = initialize_gamestate(2)
+    activating_player, target_player = sorted_players(game_state)
+    block = ArcheryDemand.demand_effect(game_state, activating_player, target_player)
+
+    other_game_state = initialize_gamestate(2)
+    loaded_block = loads_effects(dumps_effects(block), other_game_state)
+
+    assert loaded_block.target_player is sorted_players(other_game_state)[1]
+    # Written as a persistent id, not a copy
+    assert b"Player" not in dumps_effects(block)
+
+
+def test_bind_rule_requires_registered_rule():
+    with pytest.raises(ValueError):
+        bind_rule(ArcheryDemand.transfer_card_rule)
+
+    assert isinstance(bind_rule(ArcheryDemand.on_completion, None, None), Rule)
@@ -0,0 +1,493 @@
+from src.innovation.cards.achievement_registry import MONUMENT, WONDER
+from src.innovation.cards.achievements import AchievementSet
+from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
+from src.innovation.cards.cards import CardLocation, SplayDirection
+from src.innovation.game import game_setup
+from src.innovation.game.game_setup import initialize_gamestate, initialize_gamestates
+from src.innovation.game.gamestate import GameState
+from src.innovation.game.zobrist import MAX_PLAYERS, compute_zobrist_hash
+from src.innovation.players.players import Player
+from src.innovation.utils.rng import RngStream
+from collections import deque
+from random import Random
+import pytest
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4])
+def test_initialize_gamestate(num_players):
+    game_state = initialize_gamestate(num_players)
+
+    assert sorted(player.id for player in game_state.players) == list(
+        range(num_players)
+    )
+    assert all(len(player.hand) == 2 for player in game_state.players)
+    assert len(game_state.unclaimed_achievements) == 14
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4])
+def test_initialize_gamestates(num_players):
+    game_states = initialize_gamestates(20, num_players, seed=3)
+    num_cards = sum(len(cards) for cards in game_setup.cards_by_age().values())
+
+    assert len(game_states) == 20
+    for game_state in game_states:
+        assert game_state.zobrist_hash == compute_zobrist_hash(game_state)
+        assert len(game_state.players) == num_players
+        assert all(len(player.hand) == 2 for player in game_state.players)
+        assert len(game_state.unclaimed_achievements) == 14
+
+        cards = [card for deck in game_state.draw_decks.values() for card in deck]
+        cards.extend(card for player in game_state.players for card in player.hand)
+        assert len(set(cards)) == len(cards) == num_cards
+
+    # Games depend on the seed and their game index alone
+    assert initialize_gamestates(1, num_players, 3, 17)[0] == game_states[17]
+    assert game_states[-1] == game_states[19]
+    assert game_states[0] != game_states[1]
+    assert initialize_gamestates(1, num_players, 4)[0] != game_states[0]
+    assert game_states[15:] == [game_states[index] for index in range(15, 20)]
+    assert game_states[-3::-4] == [game_states[index] for index in (17, 13, 9, 5, 1)]
+
+
+def test_initialize_gamestates_without_numpy(monkeypatch):
+    game_states = list(initialize_gamestates(10, 3, seed=5))
+    monkeypatch.setattr(game_setup, "np", None)
+
+    assert list(initialize_gamestates(10, 3, seed=5)) == game_states
+
+
+def test_games_of_more_players_than_zobrist_keys_are_rejected():
+    with pytest.raises(ValueError):
+        initialize_gamestate(MAX_PLAYERS + 1)
+    with pytest.raises(ValueError):
+        initialize_gamestates(2, MAX_PLAYERS + 1)
+    with pytest.raises(ValueError):
+        GameState({}, set(), {Player(MAX_PLAYERS, {}, set(), set(), set())})
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4])
+def test_fork_copies_mutable_state(num_players):
+    game_state = initialize_gamestate(num_players)
+    player = next(iter(game_state.players))
+    player.meld(next(iter(player.hand)))
+
+    fork = game_state.fork()
+    assert fork == game_state
+
+    forked_player = next(p for p in fork.players if p.id == player.id)
+    forked_card = next(iter(forked_player.hand))
+    forked_player.meld(forked_card)
+    forked_player.score_pile.add(fork.draw_decks[1].pop())
+    fork.unclaimed_achievements.clear()
+
+    assert forked_card in player.hand
+    assert len(player.score_pile) == 0
+    assert len(game_state.draw_decks[1]) == len(fork.draw_decks[1]) + 1
+    assert len(game_state.unclaimed_achievements) == 14
+    assert sum(len(stack.stack) for stack in player.board.values()) == 1
+    assert all(
+        forked_player.board[color] is not card_stack
+        for color, card_stack in player.board.items()
+    )
+
+
+def test_fork_shares_cards():
+    game_state = initialize_gamestate(2)
+    fork = game_state.fork()
+
+    for age, draw_deck in game_state.draw_decks.items():
+        assert all(
+            original is forked
+            for original, forked in zip(draw_deck, fork.draw_decks[age])
+        )
+
+
+def apply_random_primitives(game_state, rng, num_actions):
+    players = sorted(game_state.players, key=lambda player: player.id)
+    achievements = sorted(game_state.unclaimed_achievements, key=lambda a: a.index)
+
+    for _ in range(num_actions):
+        player = rng.choice(players)
+        other_player = rng.choice(players)
+        action = rng.choice(
+            ["draw", "meld", "tuck", "score", "return", "transfer", "splay", "achieve"]
+        )
+        hand = sorted(player.hand, key=lambda card: card.index)
+        top_cards = sorted(player.top_cards, key=lambda card: card.index)
+
+        if action == "draw":
+            game_state.draw(player, rng.randint(1, 3), rng.choice(list(CardLocation)))
+        elif action == "meld" and hand:
+            game_state.meld(player, rng.choice(hand))
+        elif action == "tuck" and hand:
+            game_state.tuck(player, rng.choice(hand))
+        elif action == "score" and hand:
+            game_state.score(player, rng.choice(hand))
+        elif action == "return" and player.score_pile:
+            score_pile = sorted(player.score_pile, key=lambda card: card.index)
+            game_state.return_card(
+                player, rng.choice(score_pile), CardLocation.SCORE_PILE
+            )
+        elif action == "transfer" and top_cards:
+            game_state.transfer_card(
+                player,
+                other_player,
+                rng.choice(top_cards),
+                CardLocation.BOARD,
+                rng.choice([CardLocation.BOARD, CardLocation.SCORE_PILE]),
+            )
+        elif action == "splay" and player.splayable_colors:
+            game_state.splay(
+                player,
+                rng.choice(sorted(player.splayable_colors, key=lambda c: c.value)),
+                rng.choice(list(SplayDirection)),
+            )
+        elif action == "achieve" and achievements:
+            game_state.achieve(player, achievements.pop())
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_zobrist_hash_is_maintained_incrementally(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+
+    for _ in range(10):
+        apply_random_primitives(game_state, rng, 5)
+        assert game_state.zobrist_hash == compute_zobrist_hash(game_state)
+        assert game_state.fork().zobrist_hash == game_state.zobrist_hash
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_claimable_achievements_are_maintained_incrementally(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+
+    for _ in range(20):
+        apply_random_primitives(game_state, rng, 5)
+
+        for player in game_state.players:
+            claimable = {
+                achievement
+                for achievement in game_state.unclaimed_achievements
+                if not achievement.is_automatic and achievement.condition_met(player)
+            }
+            assert game_state.claimable_achievements(player) == claimable
+            assert game_state.can_achieve(player) == bool(claimable)
+
+            # Monument depends on the turn, the others can be checked with a board scan
+            automatic = {
+                achievement
+                for achievement in game_state.unclaimed_achievements
+                if achievement.is_automatic and achievement.condition_met(player)
+            }
+            assert game_state.automatic_achievements(player) - {MONUMENT} == automatic
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_memoized_player_properties_follow_primitives(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+    names = ["top_cards", "max_age_top_card", "colors_with_cards", "splayable_colors"]
+    names += ["symbol_vector", "symbol_count"]
+
+    for _ in range(20):
+        mark = game_state.mark()
+        apply_random_primitives(game_state, rng, 3)
+        if rng.random() < 0.3:
+            game_state.rollback(mark)
+
+        for player in game_state.players:
+            for name in names:
+                recomputed = getattr(Player, name).fget.__wrapped__(player)
+                assert getattr(player, name) == recomputed
+
+
+def test_monument_counts_cards_scored_this_turn():
+    cards = GLOBAL_CARD_REGISTRY.registry.values()
+    player = Player(0, {}, set(list(cards)[:7]), set(), set())
+    game_state = GameState({}, set(AchievementSet.members), {player})
+
+    for card in sorted(player.hand, key=lambda card: card.index)[:5]:
+        game_state.score(player, card)
+    assert MONUMENT not in game_state.automatic_achievements(player)
+
+    mark = game_state.mark()
+    game_state.score(player, next(iter(player.hand)))
+    assert game_state.automatic_achievements(player) == {MONUMENT}
+    decoded = GameState.from_bytes(game_state.to_bytes())
+    assert decoded.automatic_achievements(decoded.players.pop()) == {MONUMENT}
+    assert game_state.fork().automatic_achievements(player) == {MONUMENT}
+
+    game_state.start_turn()
+    assert not game_state.automatic_achievements(player)
+
+    game_state.rollback(mark)
+    assert game_state.achievement_tracker.turn_counts(player.id) == (0, 5)
+
+
+def test_monument_does_not_count_cards_transferred_to_a_score_pile():
+    cards = sorted(GLOBAL_CARD_REGISTRY.registry.values(), key=lambda card: card.index)
+    player = Player(0, {}, set(cards[:6]), set(), set())
+    other_player = Player(1, {}, set(cards[6:12]), set(), set())
+    game_state = GameState(
+        {
+            age: deque(card for card in cards[12:] if card.age == age)
+            for age in (1, 2, 3)
+        },
+        set(AchievementSet.members),
+        {player, other_player},
+    )
+
+    # Demand transfers, and exchanges from the opponent's hand
+    for card in cards[6:12]:
+        game_state.transfer_card(
+            other_player, player, card, CardLocation.HAND, CardLocation.SCORE_PILE
+        )
+    assert game_state.achievement_tracker.turn_counts(player.id) == (0, 0)
+    assert MONUMENT not in game_state.automatic_achievements(player)
+
+    # Drawing and scoring does count
+    game_state.draw(player, 1, CardLocation.SCORE_PILE)
+    game_state.score(player, cards[0])
+    assert game_state.achievement_tracker.turn_counts(player.id) == (0, 2)
+    decoded = GameState.from_bytes(game_state.to_bytes())
+    assert decoded.achievement_tracker.turn_counts(player.id) == (0, 2)
+
+
+def test_wonder_needs_five_colors_splayed_right_or_up():
+    cards_by_color = {}
+    for card in GLOBAL_CARD_REGISTRY.registry.values():
+        cards_by_color.setdefault(card.color, []).append(card)
+
+    hand = [card for cards in cards_by_color.values() for card in cards[:2]]
+    player = Player(0, {}, set(hand), set(), set())
+    game_state = GameState({}, set(AchievementSet.members), {player})
+
+    for card in hand:
+        game_state.meld(player, card)
+    for index, color in enumerate(cards_by_color):
+        splay = SplayDirection.UP if index % 2 else SplayDirection.RIGHT
+        game_state.splay(player, color, splay)
+        assert (WONDER in game_state.automatic_achievements(player)) == (index == 4)
+
+    assert WONDER.condition_met(player)
+
+    game_state.splay(player, next(iter(cards_by_color)), SplayDirection.LEFT)
+    assert WONDER not in game_state.automatic_achievements(player)
+
+
+def test_zobrist_hash_detects_transpositions():
+    game_state = initialize_gamestate(2)
+    player = next(iter(game_state.players))
+    first_card, second_card = sorted(player.hand, key=lambda card: card.index)
+
+    first_path = game_state.fork()
+    first_player = next(p for p in first_path.players if p.id == player.id)
+    first_path.score(first_player, first_card)
+    first_path.score(first_player, second_card)
+
+    second_path = game_state.fork()
+    second_player = next(p for p in second_path.players if p.id == player.id)
+    second_path.score(second_player, second_card)
+    second_path.score(second_player, first_card)
+
+    assert first_path.zobrist_hash == second_path.zobrist_hash
+    assert first_path.zobrist_hash != game_state.zobrist_hash
+
+
+def test_draw_age_skips_exhausted_decks():
+    game_state = initialize_gamestate(2)
+    player = next(iter(game_state.players))
+    ages = sorted(age for age, deck in game_state.draw_decks.items() if deck)
+    last_age = ages[-1]
+
+    assert game_state.draw_age(0) == game_state.draw_age(1) == 1
+    assert game_state.draw_age(last_age + 1) is None
+
+    mark = game_state.mark()
+    while game_state.draw_decks[1]:
+        game_state.draw(player, 1)
+    assert game_state.draw_age(1) == 2
+    assert game_state.peek_draw(1) is game_state.draw_decks[2][-1]
+
+    returned_card = next(card for card in player.hand if card.age == 1)
+    game_state.return_card(player, returned_card)
+    assert game_state.peek_draw(1) is returned_card
+
+    while game_state.draw(player, 1) is not None:
+        pass
+    assert game_state.nonempty_decks == 0
+    assert game_state.draw_age(1) is None
+
+    game_state.rollback(mark)
+    assert game_state.draw_age(1) == 1
+    assert game_state.draw_age(last_age) == last_age
+
+
+def snapshot(game_state):
+    return (
+        {age: list(deck) for age, deck in game_state.draw_decks.items()},
+        set(game_state.unclaimed_achievements),
+        game_state.zobrist_hash,
+        game_state.nonempty_decks,
+        dict(game_state.achievement_tracker.levels),
+        dict(game_state.achievement_tracker.automatic_masks),
+        {
+            player.id: game_state.achievement_tracker.turn_counts(player.id)
+            for player in game_state.players
+        },
+        {
+            player.id: (
+                set(player.hand),
+                set(player.score_pile),
+                set(player.achievements),
+                {
+                    color: (list(stack.stack), stack.splay, stack.symbol_count)
+                    for color, stack in player.board.items()
+                },
+            )
+            for player in game_state.players
+        },
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_rollback_restores_exact_state(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+    apply_random_primitives(game_state, rng, 10)
+
+    snapshots = []
+    for _ in range(5):
+        snapshots.append((game_state.mark(), snapshot(game_state)))
+        apply_random_primitives(game_state, rng, 8)
+        game_state.start_turn()
+
+    for mark, expected_snapshot in reversed(snapshots):
+        game_state.rollback(mark)
+        assert snapshot(game_state) == expected_snapshot
+
+    assert game_state.zobrist_hash == compute_zobrist_hash(game_state)
+
+
+def test_rollback_allows_depth_first_search():
+    game_state = initialize_gamestate(2)
+    player = next(iter(game_state.players))
+    root_snapshot = snapshot(game_state)
+
+    for card in list(player.hand):
+        mark = game_state.mark()
+        game_state.meld(player, card)
+        game_state.draw(player, 1, CardLocation.BOARD)
+        game_state.rollback(mark)
+
+        assert snapshot(game_state) == root_snapshot
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bytes_round_trip(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+    apply_random_primitives(game_state, rng, 40)
+
+    encoded = game_state.to_bytes()
+    decoded = GameState.from_bytes(encoded)
+
+    assert snapshot(decoded) == snapshot(game_state)
+    assert decoded.to_bytes() == encoded
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_decoded_players_match_constructed_ones(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+    apply_random_primitives(game_state, rng, 40)
+
+    for decoded in GameState.from_bytes(game_state.to_bytes()).players:
+        constructed = Player(
+            decoded.id,
+            decoded.board,
+            set(decoded.hand),
+            set(decoded.score_pile),
+            set(decoded.achievements),
+        )
+
+        assert decoded == constructed
+        assert decoded.version == constructed.version
+        for zone in ("hand", "score_pile", "achievements"):
+            assert type(getattr(decoded, zone)) is type(getattr(constructed, zone))
+            assert getattr(decoded, zone).mask == getattr(constructed, zone).mask
+        assert decoded.score == constructed.score
+        assert decoded.symbol_count == constructed.symbol_count
+
+
+@pytest.mark.parametrize("rng", [RngStream(3, 1), RngStream(5).split(2, 0), Random(7)])
+def test_bytes_round_trip_continues_the_random_stream(rng):
+    game_state = initialize_gamestate(3, rng)
+    # Leaves a cached value behind, which is part of the state too
+    rng.gauss(0, 1)
+
+    decoded = GameState.from_bytes(game_state.to_bytes())
+
+    assert type(decoded.rng) is type(rng)
+    assert getattr(decoded.rng, "path", None) == getattr(rng, "path", None)
+    assert decoded.rng.gauss(0, 1) == rng.gauss(0, 1)
+    assert [decoded.rng.getrandbits(64) for _ in range(5)] == [
+        rng.getrandbits(64) for _ in range(5)
+    ]
+
+
+@pytest.mark.parametrize("seed", [-1, -(2**63) - 5, 2**64, 2**70 + 3])
+def test_bytes_round_trip_of_games_from_any_seed(seed):
+    game_state = initialize_gamestates(1, 2, seed)[0]
+
+    decoded = GameState.from_bytes(game_state.to_bytes())
+
+    assert decoded.rng.path == (seed, 0)
+    assert [decoded.rng.getrandbits(64) for _ in range(5)] == [
+        game_state.rng.getrandbits(64) for _ in range(5)
+    ]
+    assert decoded.to_bytes() == game_state.to_bytes()
+
+
+def test_bytes_round_trip_without_random_stream():
+    game_state = initialize_gamestate(2)
+    game_state.rng = None
+
+    assert GameState.from_bytes(game_state.to_bytes()).rng is None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_decoded_tracker_is_built_on_first_use(seed):
+    rng = Random(seed)
+    game_state = initialize_gamestate(rng.randint(2, 4))
+    apply_random_primitives(game_state, rng, 40)
+    game_state.start_turn()
+    player = min(game_state.players, key=lambda player: player.id)
+    if player.hand:
+        game_state.score(player, next(iter(player.hand)))
+
+    decoded = GameState.from_bytes(game_state.to_bytes())
+    assert decoded.achievement_tracker._deferred is not None
+
+    # Primitives, turn starts and rollbacks before the tracker is built
+    actions_seed = rng.random()
+    mark = decoded.mark()
+    apply_random_primitives(decoded, Random(actions_seed), 20)
+    decoded.start_turn()
+    apply_random_primitives(decoded, Random(actions_seed + 1), 20)
+    decoded.rollback(mark)
+    apply_random_primitives(decoded, Random(actions_seed), 20)
+    apply_random_primitives(game_state, Random(actions_seed), 20)
+    assert decoded.achievement_tracker._deferred is not None
+
+    assert snapshot(decoded) == snapshot(game_state)
+    assert decoded.achievement_tracker._deferred is None
+
+
+def test_from_bytes_rejects_unknown_version():
+    encoded = bytearray(initialize_gamestate(2).to_bytes())
+    encoded[0] = 0
+
+    with pytest.raises(ValueError):
+        GameState.from_bytes(bytes(encoded))
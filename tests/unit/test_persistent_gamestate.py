@@ -0,0 +1,186 @@
+from src.innovation.cards.achievement_registry import GLOBAL_ACHIEVEMENTS_REGISTRY
+from src.innovation.cards.card_effects import CardLocation
+from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
+from src.innovation.cards.cards import Color, SplayDirection
+from src.innovation.game.game_setup import initialize_gamestate
+from src.innovation.game.persistent_gamestate import PersistentGameState
+from tests.unit.test_gamestate import apply_random_primitives
+from dataclasses import FrozenInstanceError
+from random import Random
+import pytest
+
+
+@pytest.fixture
+def game_state():
+    return PersistentGameState.from_game_state(initialize_gamestate(3))
+
+
+def test_round_trip(game_state):
+    mutable_game_state = game_state.to_game_state()
+
+    assert PersistentGameState.from_game_state(mutable_game_state) == game_state
+    assert {player.id: player.hand for player in mutable_game_state.players} == {
+        player.id: player.hand for player in game_state.players
+    }
+
+
+def test_states_are_immutable(game_state):
+    with pytest.raises(FrozenInstanceError):
+        game_state.players = ()
+
+    with pytest.raises(FrozenInstanceError):
+        game_state.players[0].hand_mask = 0
+
+
+def test_actions_share_untouched_structure(game_state):
+    card = next(iter(game_state.players[0].hand))
+    child = game_state.meld(0, card)
+
+    assert card in game_state.players[0].hand
+    assert card not in child.players[0].hand
+    assert child.players[0].stack(card.color).top_card == card
+    assert game_state.players[0].stack(card.color).is_empty
+
+    assert child.players[1] is game_state.players[1]
+    assert child.players[2] is game_state.players[2]
+    assert child.draw_decks is game_state.draw_decks
+    assert all(
+        child.players[0].stack(color) is game_state.players[0].stack(color)
+        for color in Color
+        if color != card.color
+    )
+
+
+def test_draw_shares_other_decks(game_state):
+    child, card = game_state.draw(1, 1)
+
+    assert card in child.players[1].hand
+    assert len(child.draw_decks[0]) == len(game_state.draw_decks[0]) - 1
+    assert all(
+        child_deck is parent_deck
+        for child_deck, parent_deck in zip(
+            child.draw_decks[1:], game_state.draw_decks[1:]
+        )
+    )
+    assert child.players[0] is game_state.players[0]
+
+
+def test_draw_skips_empty_decks(game_state):
+    child, card = game_state.draw(0, 3)
+    assert card.age == 3
+
+    child, card = game_state.draw(0, 4)
+    assert card is None
+    assert child is game_state
+
+
+def test_card_moves_between_zones(game_state):
+    archery = GLOBAL_CARD_REGISTRY.registry.get("Archery")
+    metalworking = GLOBAL_CARD_REGISTRY.registry.get("Metalworking")
+    monument = GLOBAL_ACHIEVEMENTS_REGISTRY.registry.get("Monument")
+    game_state = PersistentGameState(
+        game_state.draw_decks,
+        game_state.unclaimed_achievements_mask,
+        tuple(type(player)(player.id, hand_mask=0) for player in game_state.players),
+    )
+
+    game_state = game_state._add_card(0, archery, CardLocation.HAND)
+    game_state = game_state._add_card(0, metalworking, CardLocation.HAND)
+    game_state = game_state.meld(0, archery)
+    game_state = game_state.tuck(0, metalworking)
+    game_state = game_state.splay(0, Color.RED, SplayDirection.UP)
+
+    red_stack = game_state.players[0].stack(Color.RED)
+    assert red_stack.cards == (metalworking, archery)
+    assert red_stack.splay == SplayDirection.UP
+    mutable_player = next(
+        player for player in game_state.to_game_state().players if player.id == 0
+    )
+    assert game_state.players[0].symbol_count == mutable_player.symbol_count
+
+    game_state = game_state.transfer_card(
+        0, 1, archery, CardLocation.BOARD, CardLocation.SCORE_PILE
+    )
+    assert game_state.players[1].score == 1
+    assert game_state.players[0].stack(Color.RED).top_card == metalworking
+
+    game_state = game_state.return_card(1, archery, CardLocation.SCORE_PILE)
+    assert game_state.draw_decks[0][0] == archery
+    assert game_state.players[1].score == 0
+
+    game_state = game_state.achieve(2, monument)
+    assert monument in game_state.players[2].achievements
+    assert monument not in game_state.unclaimed_achievements
+
+
+class MirroredGameState:
+    """Applies every primitive to a GameState and to the PersistentGameState it started as."""
+
+    def __init__(self, game_state, on_primitive):
+        self.game_state = game_state
+        self.persistent = PersistentGameState.from_game_state(game_state)
+        self.on_primitive = on_primitive
+
+    @property
+    def players(self):
+        return self.game_state.players
+
+    @property
+    def unclaimed_achievements(self):
+        return self.game_state.unclaimed_achievements
+
+    def draw(self, player, age, card_destination):
+        card = self.game_state.draw(player, age, card_destination)
+        self.persistent, persistent_card = self.persistent.draw(
+            player.id, age, card_destination
+        )
+        assert persistent_card == card
+        self.on_primitive(self)
+
+    def splay(self, player, color, splay_direction):
+        self.game_state.splay(player, color, splay_direction)
+        self.persistent = self.persistent.splay(player.id, color, splay_direction)
+        self.on_primitive(self)
+
+    def transfer_card(self, giving_player, receiving_player, card, *locations):
+        self.game_state.transfer_card(giving_player, receiving_player, card, *locations)
+        self.persistent = self.persistent.transfer_card(
+            giving_player.id, receiving_player.id, card, *locations
+        )
+        self.on_primitive(self)
+
+    def __getattr__(self, name):
+        # meld, tuck, score, return_card and achieve take the player first
+        def primitive(player, *args):
+            getattr(self.game_state, name)(player, *args)
+            self.persistent = getattr(self.persistent, name)(player.id, *args)
+            self.on_primitive(self)
+
+        return primitive
+
+
+def assert_boards_match(mirrored):
+    for player in mirrored.game_state.players:
+        persistent_player = mirrored.persistent.players[player.id]
+        splays = {
+            color: card_stack.splay
+            for color, card_stack in player.board.items()
+            if not card_stack.is_empty
+        }
+
+        assert splays == {
+            color: persistent_player.stack(color).splay
+            for color in Color
+            if not persistent_player.stack(color).is_empty
+        }
+        assert persistent_player.symbol_count == player.symbol_count
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_primitives_match_game_state(seed):
+    game_state = initialize_gamestate(Random(seed).randint(2, 4))
+    mirrored = MirroredGameState(game_state, assert_boards_match)
+
+    apply_random_primitives(mirrored, Random(seed), 150)
+
+    assert PersistentGameState.from_game_state(game_state) == mirrored.persistent
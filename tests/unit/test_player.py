@@ -219,3 +219,42 @@ def test_highest_cards_in_hand(hand, expected_age, expected_num_cards):
     assert all(card.age == list(highest_cards)[0].age for card in highest_cards)
     if expected_age:
         assert list(highest_cards)[0].age == expected_age
+
+
+@pytest.mark.parametrize(
+    "board, expected_colors",
+    [
+        ({}, set()),
+        ({Color.RED: CardStack(deque(), SplayDirection.NONE)}, set()),
+        (
+            {
+                Color.RED: CardStack(deque([Mock()]), SplayDirection.NONE),
+                Color.BLUE: CardStack(deque(), SplayDirection.NONE),
+                Color.GREEN: CardStack(deque([Mock(), Mock()]), SplayDirection.LEFT),
+            },
+            {Color.RED, Color.GREEN},
+        ),
+    ],
+)
+def test_colors_with_cards(board, expected_colors):
+    player = Player(0, board, set(), set(), set())
+    assert player.colors_with_cards == expected_colors
+
+
+def test_derived_properties_are_memoized_until_changed():
+    archery, sailing = [
+        GLOBAL_CARD_REGISTRY.registry.get(name) for name in ("Archery", "Sailing")
+    ]
+    player = Player(0, dict(), {archery, sailing}, set(), set())
+    top_cards = player.top_cards
+    assert not top_cards
+    assert player.top_cards is top_cards
+
+    player.meld(archery)
+    assert player.version == 1
+    assert player.top_cards == {archery}
+
+    player.board[archery.color].meld(sailing)
+    assert player.top_cards == {archery}
+    player.changed()
+    assert player.top_cards == {sailing}
@@ -0,0 +1,88 @@
+from src.innovation.cards.cards import CardSet
+from src.innovation.game.game_setup import initialize_gamestates
+from src.innovation.game.gamestate import GameState
+from src.innovation.game.zobrist import compute_zobrist_hash
+from src.innovation.players.player_store import PlayerStore, StoredPlayer
+from tests.unit.test_gamestate import apply_random_primitives
+from copy import copy
+from random import Random
+import pytest
+
+
+def stored_game_state(store, game_index, game_state):
+    players = {store.store(game_index, player) for player in game_state.players}
+    return GameState(
+        {age: deck.copy() for age, deck in game_state.draw_decks.items()},
+        game_state.unclaimed_achievements.copy(),
+        players,
+        game_state.zobrist_hash,
+        copy(game_state.rng),
+        game_state.achievement_tracker.copy(),
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_primitives_on_stored_players_match_regular_players(seed):
+    rng = Random(seed)
+    num_players = rng.randint(2, 4)
+    game_states = initialize_gamestates(3, num_players, seed)
+    store = PlayerStore(3, num_players)
+
+    for game_index, game_state in enumerate(game_states):
+        apply_random_primitives(game_state, Random(seed), 20)
+        stored = stored_game_state(store, game_index, game_state)
+        assert stored.to_bytes() == game_state.to_bytes()
+        assert compute_zobrist_hash(stored) == game_state.zobrist_hash
+
+        actions_seed = rng.random()
+        apply_random_primitives(game_state, Random(actions_seed), 40)
+        apply_random_primitives(stored, Random(actions_seed), 40)
+        assert stored.to_bytes() == game_state.to_bytes()
+
+        encoded = stored.to_bytes()
+        mark = stored.mark()
+        apply_random_primitives(stored, rng, 20)
+        stored.rollback(mark)
+        assert stored.to_bytes() == encoded
+
+        for player in game_state.players:
+            stored_player = store.player(game_index, player.id)
+            assert stored_player.top_cards == player.top_cards
+            assert stored_player.symbol_vector == player.symbol_vector
+            assert stored_player.score == player.score
+            assert stored_player.splayable_colors == player.splayable_colors
+
+
+def test_slots_are_independent():
+    game_states = initialize_gamestates(2, 2, seed=1)
+    store = PlayerStore(2, 2)
+    stored = [stored_game_state(store, index, game_states[index]) for index in (0, 1)]
+    encoded = stored[1].to_bytes()
+
+    apply_random_primitives(stored[0], Random(0), 30)
+
+    assert stored[1].to_bytes() == encoded
+    assert store.player(0, 0) is next(p for p in stored[0].players if p.id == 0)
+
+
+def test_stored_players_fork_into_regular_players():
+    game_state = initialize_gamestates(1, 3, seed=2)[0]
+    apply_random_primitives(game_state, Random(2), 30)
+    store = PlayerStore(1, 3)
+    stored = stored_game_state(store, 0, game_state)
+
+    fork = stored.fork()
+
+    assert fork.to_bytes() == stored.to_bytes()
+    assert not any(isinstance(player, StoredPlayer) for player in fork.players)
+    assert all(type(player.hand) is CardSet for player in fork.players)
+
+
+def test_store_is_compact():
+    store = PlayerStore(1000, 4)
+
+    # Masks for the zones plus one byte per registered card and per color for the board
+    assert store.nbytes / store.num_games < 4 * (3 * 8 + len(CardSet.members) + 10)
+
+    with pytest.raises(IndexError):
+        store.player(1000, 0)
@@ -1,5 +1,10 @@
 from src.innovation.cards.achievement_registry import GLOBAL_ACHIEVEMENTS_REGISTRY
-from src.innovation.cards.card_registry import GLOBAL_CARD_REGISTRY
+from src.innovation.cards.card_registry import (
+    GLOBAL_CARD_REGISTRY,
+    GLOBAL_SYMBOL_CONTRIBUTIONS,
+)
+from src.innovation.cards.card_effects import BaseDemand
+from src.innovation.cards.cards import SplayDirection, SymbolType, VISIBLE_POSITIONS
 
 
 def test_card_registry_names():
@@ -16,6 +21,28 @@ def test_card_registry_symbols():
         assert len({symbol.position for symbol in symbols}) == 3
 
 
+def test_symbol_contribution_table():
+    cards = GLOBAL_CARD_REGISTRY.registry
+    assert GLOBAL_SYMBOL_CONTRIBUTIONS.keys() == cards.keys()
+
+    for card_name, contributions in GLOBAL_SYMBOL_CONTRIBUTIONS.items():
+        card = cards[card_name]
+        assert card.symbol_contributions is contributions
+
+        for index, symbol_type in enumerate(SymbolType):
+            assert contributions.top[index] == sum(
+                1 for symbol in card.symbols if symbol.symbol_type == symbol_type
+            )
+
+            for splay in SplayDirection:
+                assert contributions.covered[splay][index] == sum(
+                    1
+                    for symbol in card.symbols
+                    if symbol.symbol_type == symbol_type
+                    and symbol.position in VISIBLE_POSITIONS[splay]
+                )
+
+
 def test_all_cards_in_registry_have_effects():
     assert all(len(card.effects) for card in GLOBAL_CARD_REGISTRY.registry.values())
 
@@ -48,3 +75,20 @@ def test_achievement_registry_contents():
         a in GLOBAL_ACHIEVEMENTS_REGISTRY.registry
         for a in expected_scoring_achievements & expected_non_scoring_achievements
     )
+
+
+def test_dogma_tables():
+    cards = GLOBAL_CARD_REGISTRY.registry
+    for card in cards.values():
+        effects = [effect for effect in card.effects or () if effect is not None]
+        assert len(card.dogma_table) == len(effects)
+
+        for entry, effect in zip(card.dogma_table, effects):
+            assert list(SymbolType)[entry.symbol_index] == effect.symbol
+            assert entry.is_demand == isinstance(effect, BaseDemand)
+
+            if entry.is_demand:
+                assert entry.effect == effect.demand_effect
+                assert entry.chained_dogma == effect.chained_dogma
+            else:
+                assert entry.effect == effect.dogma_effect
@@ -0,0 +1,42 @@
+from src.innovation.game.game_setup import initialize_gamestates
+from src.innovation.game.gamestate import GameState
+from src.innovation.game.self_play import (
+    main,
+    play_seeded_game,
+    play_set_up_game,
+    run_games,
+)
+import pytest
+
+
+def test_records_do_not_depend_on_the_number_of_workers():
+    bots = ["random", "random", "first"]
+    records = run_games(12, bots, master_seed=7, num_workers=1)
+
+    assert [record.game_index for record in records] == list(range(12))
+    assert run_games(12, bots, master_seed=7, num_workers=2, chunk_size=5) == records
+    # Any game of the batch replays on its own
+    assert play_seeded_game(bots, 7, 9) == records[9]
+
+
+def test_decoded_games_play_the_same():
+    bots = ["random", "random"]
+    game_state = initialize_gamestates(1, len(bots), seed=3, first_game_index=4)[0]
+    decoded = GameState.from_bytes(game_state.to_bytes())
+
+    assert play_set_up_game(bots, decoded, 4, 200) == play_seeded_game(bots, 3, 4, 200)
+
+
+def test_unknown_bot():
+    with pytest.raises(ValueError):
+        run_games(1, ["random", "unknown"], num_workers=1)
+
+
+def test_main_writes_records(tmp_path, capsys):
+    output = tmp_path / "records.csv"
+    main(["--games", "5", "--players", "3", "--workers", "1", "--output", str(output)])
+
+    assert "games/s" in capsys.readouterr().out
+    lines = output.read_text().splitlines()
+    assert len(lines) == 6
+    assert lines[0] == "game_index,winner,num_turns,achievement_victory,scores"
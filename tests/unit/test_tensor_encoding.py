@@ -0,0 +1,112 @@
+from src.innovation.cards.cards import CardSet, Color, SplayDirection
+from src.innovation.game.game_setup import initialize_gamestate, initialize_gamestates
+from src.innovation.game.zobrist import MAX_PLAYERS, PLAYER_ZONES
+from src.innovation.players.player_store import PlayerStore
+from tests.unit.test_gamestate import apply_random_primitives
+from random import Random
+import pytest
+
+np = pytest.importorskip("numpy")
+tensor_encoding = pytest.importorskip("src.innovation.game.tensor_encoding")
+
+
+def build_game_states(num_games, seed=0):
+    rng = Random(seed)
+    game_states = []
+
+    for _ in range(num_games):
+        game_state = initialize_gamestate(rng.randint(2, 4))
+        apply_random_primitives(game_state, rng, rng.randint(0, 60))
+        game_states.append(game_state)
+
+    return game_states
+
+
+def zone_cards(player, zone):
+    if zone == PLAYER_ZONES[1]:
+        return {card for stack in player.board.values() for card in stack.stack}
+
+    return set(player.hand) if zone == PLAYER_ZONES[0] else set(player.score_pile)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_encode_game_states_matches_players(seed):
+    game_states = build_game_states(8, seed)
+    tensors = tensor_encoding.encode_game_states(game_states)
+
+    for game, game_state in enumerate(game_states):
+        players = {player.id: player for player in game_state.players}
+
+        for player_id in range(MAX_PLAYERS):
+            player = players.get(player_id)
+            assert tensors.player_mask[game, player_id] == (player is not None)
+
+            if player is None:
+                assert not tensors.card_presence[game, player_id].any()
+                continue
+
+            for zone_index, zone in enumerate(PLAYER_ZONES):
+                presence = tensors.card_presence[game, player_id, zone_index]
+                assert set(np.flatnonzero(presence)) == {
+                    card.index for card in zone_cards(player, zone)
+                }
+
+            for color_index, color in enumerate(Color):
+                splay = (
+                    player.board[color].splay
+                    if color in player.board
+                    else SplayDirection.NONE
+                )
+                one_hot = tensors.splays[game, player_id, color_index]
+                assert list(one_hot) == [int(s == splay) for s in SplayDirection]
+
+            assert tuple(tensors.symbol_counts[game, player_id]) == player.symbol_vector
+            assert tensors.scores[game, player_id] == player.score
+            assert set(np.flatnonzero(tensors.achievements[game, player_id])) == {
+                achievement.index for achievement in player.achievements
+            }
+
+
+def test_encode_game_states_fills_preallocated_rows():
+    tensors = tensor_encoding.GameStateTensors.allocate(6)
+    tensors.card_presence[:] = 1
+
+    first_batch = build_game_states(4, seed=1)
+    assert tensor_encoding.encode_game_states(first_batch, tensors) is tensors
+
+    expected = tensor_encoding.encode_game_states(first_batch)
+    assert np.array_equal(tensors.card_presence[:4], expected.card_presence)
+    assert np.array_equal(tensors.scores[:4], expected.scores)
+    assert tensors.card_presence[4:].all()
+    assert tensors.card_presence.shape[-1] == len(CardSet.members)
+
+
+@pytest.mark.parametrize("num_players", [2, 4])
+def test_encode_player_store_matches_game_states(num_players):
+    game_states = list(initialize_gamestates(6, num_players, seed=num_players))
+    store = PlayerStore(len(game_states), num_players)
+
+    for game_index, game_state in enumerate(game_states):
+        apply_random_primitives(game_state, Random(game_index), 15 * game_index)
+        for player in game_state.players:
+            store.store(game_index, player)
+
+    tensors = tensor_encoding.GameStateTensors.allocate(8)
+    tensors.card_presence[:] = 1
+    assert tensor_encoding.encode_player_store(store, tensors) is tensors
+
+    expected = tensor_encoding.encode_game_states(game_states)
+    for name in ("player_mask", "card_presence", "splays", "symbol_counts", "scores"):
+        assert np.array_equal(getattr(tensors, name)[:6], getattr(expected, name))
+    assert np.array_equal(tensors.achievements[:6], expected.achievements)
+    assert tensors.card_presence[6:].all()
+
+
+def test_games_of_more_players_than_the_tensors_are_rejected():
+    tensors = tensor_encoding.GameStateTensors.allocate(2, num_players=2)
+    game_states = [initialize_gamestate(2), initialize_gamestate(3)]
+
+    with pytest.raises(ValueError):
+        tensor_encoding.encode_game_states(game_states, tensors)
+    with pytest.raises(ValueError):
+        tensor_encoding.encode_player_store(PlayerStore(2, 3), tensors)